@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 from app.database.connection import get_db
 from app.schemas.auth import (
@@ -6,9 +6,12 @@ from app.schemas.auth import (
     RegisterResponse, 
     LoginSchema,
     TokenResponse,
-    UserResponse
+    UserResponse,
+    AvailabilityResponse
 )
+from typing import Optional
 from app.services.auth_service import AuthService
+from app.services.user_availability_service import UserAvailabilityService
 from app.api.dependencies import get_current_user
 from app.models.user import Usuario
 
@@ -45,6 +48,37 @@ async def register(
 
 
 
+@router.get(
+    "/availability",
+    response_model=AvailabilityResponse,
+    summary="Verificar disponibilidad",
+    description="Indica si un username y/o email están libres para registrarse"
+)
+async def check_availability(
+    username: Optional[str] = Query(None, min_length=3, max_length=45),
+    email: Optional[str] = Query(None, max_length=100),
+    db: Session = Depends(get_db)
+):
+    """
+    Verifica si un username y/o email están disponibles (para validar el
+    formulario de registro mientras se escribe).
+    
+    La respuesta es orientativa: el registro vuelve a verificar los datos.
+    
+    Ejemplo de uso:
+        - /api/v1/auth/availability?username=josue
+        - /api/v1/auth/availability?username=josue&email=josue@mail.com
+    """
+    if username is None and email is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Envía username y/o email"
+        )
+    
+    return UserAvailabilityService.check(db, username=username, email=email)
+
+
+
 @router.post(
     "/login",
     response_model=TokenResponse,
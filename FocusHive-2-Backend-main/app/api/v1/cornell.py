@@ -1,11 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Literal, Union
 from app.database.connection import get_db
 from app.api.dependencies import get_current_user
 from app.models.user import Usuario
 from app.models.cornell import CornellNote
-from app.schemas.cornell import CornellCreate, CornellUpdate, CornellResponse
+from app.schemas.cornell import CornellCreate, CornellUpdate, CornellResponse, CornellAutosave, CornellSummary
+from app.schemas.note_delta import NoteAutosaveResponse
+from app.services.note_search_service import NoteSearchService
+from app.services.note_autosave_service import NoteAutosaveService
+from app.utils.note_utils import refresh_note_preview, refresh_note_search_text
 
 router = APIRouter(
     prefix="/method-work/cornell",
@@ -29,30 +33,51 @@ def create_cornell_note(
         cues_section=note_data.cues_section,
         summary_section=note_data.summary_section
     )
+    refresh_note_preview(db_note)
+    refresh_note_search_text(db_note)
     
     db.add(db_note)
     db.commit()
     db.refresh(db_note)
+    NoteSearchService.index_note("cornell", db_note)
     return db_note
 
 
-@router.get("", response_model=List[CornellResponse])
+@router.get("", response_model=Union[List[CornellSummary], List[CornellResponse]])
 def get_cornell_notes(
     skip: int = 0,
     limit: int = 20,
+    fields: Literal["summary", "full"] = Query("full", description="'summary' omite el texto completo de las secciones"),
     db: Session = Depends(get_db),
     current_user: Usuario = Depends(get_current_user)
 ):
-    """Obtiene todas las notas Cornell del usuario autenticado."""
+    """
+    Obtiene todas las notas Cornell del usuario autenticado.
     
-    notes = db.query(CornellNote)\
+    Por defecto devuelve las notas completas (compatibilidad con los clientes
+    existentes). Con fields=summary devuelve solo título, materia, fechas y
+    una vista previa, para listados que no muestran el contenido.
+    """
+    
+    if fields == "full":
+        columns = [CornellNote]
+    else:
+        columns = [
+            CornellNote.note_id, CornellNote.user_id, CornellNote.title, CornellNote.subject,
+            CornellNote.preview,
+            CornellNote.created_at, CornellNote.updated_at
+        ]
+    
+    notes = db.query(*columns)\
         .filter(CornellNote.user_id == current_user.user_id)\
         .order_by(CornellNote.created_at.desc())\
         .offset(skip)\
         .limit(limit)\
         .all()
     
-    return notes
+    if fields == "full":
+        return notes
+    return [CornellSummary.model_validate(row) for row in notes]
 
 
 @router.get("/{note_id}", response_model=CornellResponse)
@@ -105,12 +130,44 @@ def update_cornell_note(
     update_dict = note_data.model_dump(exclude_unset=True)
     for key, value in update_dict.items():
         setattr(note, key, value)
+    note.revision = (note.revision or 0) + 1
+    refresh_note_preview(note)
+    refresh_note_search_text(note)
     
     db.commit()
     db.refresh(note)
+    NoteSearchService.index_note("cornell", note)
     return note
 
 
+@router.patch("/{note_id}", response_model=NoteAutosaveResponse)
+def autosave_cornell_note(
+    note_id: int,
+    changes: CornellAutosave,
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """
+    Autoguardado incremental: aplica cambios de texto (insertar/borrar) por sección
+    sobre `base_revision`. Solo se escriben las secciones modificadas.
+    
+    Responde 409 si el documento cambió desde esa revisión.
+    """
+    result = NoteAutosaveService.apply_changes(
+        db,
+        CornellNote,
+        CornellNote.note_id,
+        note_id,
+        current_user.user_id,
+        changes.base_revision,
+        changes.changes,
+        "Nota Cornell no encontrada"
+    )
+    if result["updated_fields"]:
+        NoteSearchService.reindex_note(db, "cornell", current_user.user_id, note_id)
+    return result
+
+
 @router.delete("/{note_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_cornell_note(
     note_id: int,
@@ -134,4 +191,5 @@ def delete_cornell_note(
     
     db.delete(note)
     db.commit()
+    NoteSearchService.remove_note("cornell", current_user.user_id, note_id)
     return None
\ No newline at end of file
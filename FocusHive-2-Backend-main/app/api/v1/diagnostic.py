@@ -1,17 +1,17 @@
-from fastapi import APIRouter, Depends, status, HTTPException
+from fastapi import APIRouter, Depends, Header, Request, Response, status, HTTPException
+from typing import Optional
 from sqlalchemy.orm import Session
 from app.database.connection import get_db
 from app.api.dependencies import get_current_user
 from app.models.user import Usuario
 from app.schemas.diagnostic import (
     DiagnosticQuestionsResponse,
-    DiagnosticQuestionSchema,
-    DiagnosticOptionSchema,
     SubmitDiagnosticSchema,
     DiagnosticResultResponse,
     DiagnosticStatusSchema
 )
 from app.services.diagnostic_service import DiagnosticService
+from app.services.diagnostic_catalog_service import DiagnosticCatalogService
 
 router = APIRouter(prefix="/diagnostic", tags=["Diagnostic"])
 
@@ -25,45 +25,42 @@ async def get_status(
 
 @router.get("/questions", response_model=DiagnosticQuestionsResponse)
 async def get_questions(
+    request: Request,
     current_user: Usuario = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Obtiene todas las preguntas del diagnóstico"""
-    questions = DiagnosticService.get_all_questions(db)
+    """
+    Obtiene todas las preguntas del diagnóstico.
     
-    questions_data = []
-    for q in questions:
-        options_data = [
-            DiagnosticOptionSchema(
-                option_id=opt.option_id,
-                option_text=opt.option_text
-            )
-            for opt in q.options
-        ]
-        
-        questions_data.append(
-            DiagnosticQuestionSchema(
-                question_id=q.question_id,
-                question_text=q.question_text,
-                question_order=q.question_order,
-                options=options_data
-            )
-        )
+    La respuesta se sirve ya serializada desde memoria y lleva un ETag:
+    si el cliente envía `If-None-Match` con el mismo valor se responde 304.
+    """
+    body, etag = DiagnosticCatalogService.get_questions_payload(db)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
     
-    return DiagnosticQuestionsResponse(
-        total_questions=len(questions_data),
-        questions=questions_data
-    )
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in (tag.strip() for tag in if_none_match.split(",")):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    return Response(content=body, media_type="application/json", headers=headers)
 
 # 🚀 CAMBIO CLAVE: Cambiado status_code de HTTP_201_CREATED a HTTP_200_OK
 @router.post("/submit", response_model=DiagnosticResultResponse, status_code=status.HTTP_200_OK)
 async def submit_diagnostic(
     data: SubmitDiagnosticSchema,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=64),
     current_user: Usuario = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Procesa el diagnóstico y retorna el método recomendado"""
-    result = DiagnosticService.process_diagnostic(db, current_user.user_id, data.answers)
+    """
+    Procesa el diagnóstico y retorna el método recomendado.
+    
+    Si se envía el header `Idempotency-Key`, repetir el envío con la misma
+    clave devuelve el mismo resultado sin volver a procesarlo.
+    """
+    result = DiagnosticService.process_diagnostic(
+        db, current_user.user_id, data.answers, idempotency_key
+    )
     
     return DiagnosticResultResponse(
         message="Diagnóstico completado exitosamente",
@@ -1,11 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
-from typing import List
+from sqlalchemy.exc import IntegrityError
+from typing import List, Literal, Optional, Union
 from app.database.connection import get_db
 from app.api.dependencies import get_current_user
 from app.models.user import Usuario
 from app.models.feynman import FeynmanWork
-from app.schemas.feynman import FeynmanCreate, FeynmanUpdate, FeynmanResponse
+from app.schemas.feynman import (
+    FeynmanCreate, FeynmanUpdate, FeynmanResponse, FeynmanAutosave, FeynmanSummary,
+    FeynmanRevisionPage, FeynmanRevisionOut
+)
+from app.schemas.note_delta import NoteAutosaveResponse
+from app.services.note_search_service import NoteSearchService
+from app.services.note_autosave_service import NoteAutosaveService
+from app.services.feynman_history_service import FeynmanHistoryService
+from app.utils.note_utils import refresh_note_preview, refresh_note_search_text
 
 router = APIRouter(
     prefix="/method-work/feynman",
@@ -29,30 +38,51 @@ def create_feynman_work(
         final_version=work_data.final_version,
         is_completed=False
     )
+    refresh_note_preview(db_work)
+    refresh_note_search_text(db_work)
     
     db.add(db_work)
     db.commit()
     db.refresh(db_work)
+    NoteSearchService.index_note("feynman", db_work)
     return db_work
 
 
-@router.get("", response_model=List[FeynmanResponse])
+@router.get("", response_model=Union[List[FeynmanSummary], List[FeynmanResponse]])
 def get_feynman_works(
     skip: int = 0,
     limit: int = 20,
+    fields: Literal["summary", "full"] = Query("full", description="'summary' omite la explicación, vacíos y versión final"),
     db: Session = Depends(get_db),
     current_user: Usuario = Depends(get_current_user)
 ):
-    """Obtiene todos los trabajos Feynman del usuario autenticado."""
+    """
+    Obtiene todos los trabajos Feynman del usuario autenticado.
+    
+    Por defecto devuelve los trabajos completos (el editor del frontend se
+    llena desde este listado). Con fields=summary devuelve solo tema, estado,
+    fechas y una vista previa, para listados que no muestran el contenido.
+    """
     
-    works = db.query(FeynmanWork)\
+    if fields == "full":
+        columns = [FeynmanWork]
+    else:
+        columns = [
+            FeynmanWork.feynman_id, FeynmanWork.user_id, FeynmanWork.topic, FeynmanWork.is_completed,
+            FeynmanWork.preview,
+            FeynmanWork.created_at, FeynmanWork.updated_at
+        ]
+    
+    works = db.query(*columns)\
         .filter(FeynmanWork.user_id == current_user.user_id)\
         .order_by(FeynmanWork.created_at.desc())\
         .offset(skip)\
         .limit(limit)\
         .all()
     
-    return works
+    if fields == "full":
+        return works
+    return [FeynmanSummary.model_validate(row) for row in works]
 
 
 @router.get("/{feynman_id}", response_model=FeynmanResponse)
@@ -101,16 +131,118 @@ def update_feynman_work(
             detail="Trabajo Feynman no encontrado"
         )
     
+    old_state = FeynmanHistoryService.state_of(work)
+    old_revision = work.revision or 0
+    
     # Actualizar solo los campos proporcionados
     update_dict = work_data.model_dump(exclude_unset=True)
     for key, value in update_dict.items():
         setattr(work, key, value)
+    work.revision = old_revision + 1
+    refresh_note_preview(work)
+    refresh_note_search_text(work)
     
-    db.commit()
+    FeynmanHistoryService.record(
+        db, feynman_id, current_user.user_id, old_revision,
+        old_state, FeynmanHistoryService.state_of(work)
+    )
+    
+    try:
+        db.commit()
+    except IntegrityError:
+        # Otro guardado ya registró esta revisión
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="El trabajo cambió mientras se guardaba; recárgalo antes de guardar"
+        )
     db.refresh(work)
+    NoteSearchService.index_note("feynman", work)
     return work
 
 
+@router.patch("/{feynman_id}", response_model=NoteAutosaveResponse)
+def autosave_feynman_work(
+    feynman_id: int,
+    changes: FeynmanAutosave,
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """
+    Autoguardado incremental: aplica cambios de texto (insertar/borrar) por sección
+    sobre `base_revision`. Solo se escriben las secciones modificadas.
+    
+    Responde 409 si el documento cambió desde esa revisión.
+    """
+    result = NoteAutosaveService.apply_changes(
+        db,
+        FeynmanWork,
+        FeynmanWork.feynman_id,
+        feynman_id,
+        current_user.user_id,
+        changes.base_revision,
+        changes.changes,
+        "Trabajo Feynman no encontrado",
+        on_saved=lambda old, new: FeynmanHistoryService.record(
+            db, feynman_id, current_user.user_id, changes.base_revision, old, new
+        )
+    )
+    if result["updated_fields"]:
+        NoteSearchService.reindex_note(db, "feynman", current_user.user_id, feynman_id)
+    return result
+
+
+@router.get("/{feynman_id}/revisions", response_model=FeynmanRevisionPage)
+def get_feynman_revisions(
+    feynman_id: int,
+    before: Optional[int] = Query(None, ge=0, description="Revisión desde la que continuar (excluida)"),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """Lista el historial de revisiones de un trabajo Feynman (sin su contenido)."""
+    
+    work = db.query(FeynmanWork.feynman_id)\
+        .filter(
+            FeynmanWork.feynman_id == feynman_id,
+            FeynmanWork.user_id == current_user.user_id
+        )\
+        .first()
+    
+    if not work:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Trabajo Feynman no encontrado"
+        )
+    
+    return FeynmanHistoryService.list_revisions(db, feynman_id, before, limit)
+
+
+@router.get("/{feynman_id}/revisions/{revision}", response_model=FeynmanRevisionOut)
+def get_feynman_revision(
+    feynman_id: int,
+    revision: int,
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """Obtiene el contenido de un trabajo Feynman en una revisión pasada."""
+    
+    work = db.query(FeynmanWork)\
+        .filter(
+            FeynmanWork.feynman_id == feynman_id,
+            FeynmanWork.user_id == current_user.user_id
+        )\
+        .first()
+    
+    if not work:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Trabajo Feynman no encontrado"
+        )
+    
+    return FeynmanHistoryService.get_revision(db, work, revision)
+
+
 @router.delete("/{feynman_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_feynman_work(
     feynman_id: int,
@@ -134,4 +266,5 @@ def delete_feynman_work(
     
     db.delete(work)
     db.commit()
+    NoteSearchService.remove_note("feynman", current_user.user_id, feynman_id)
     return None
\ No newline at end of file
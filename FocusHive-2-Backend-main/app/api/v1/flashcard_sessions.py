@@ -1,11 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
-from typing import List
+from sqlalchemy import insert
+from typing import List, Literal
+from datetime import datetime
 from app.database.connection import get_db
 from app.api.dependencies import get_current_user
 from app.models.user import Usuario
 from app.models.flashcard_session import FlashcardStudySession
-from app.schemas.flashcard_session import FlashcardSessionCreate, FlashcardSessionResponse
+from app.models.flashcard_review import FlashcardReview
+from app.models.orm_models import CardCollection, Flashcard
+from app.schemas.flashcard_session import (
+    FlashcardSessionCreate,
+    FlashcardSessionResponse,
+    FlashcardReviewBatchCreate,
+    FlashcardReviewResponse,
+    FlashcardSessionStatsResponse
+)
+from app.services.flashcard_session_stats_service import FlashcardSessionStatsService
+from app.utils.spaced_repetition import SpacedRepetitionScheduler
 
 router = APIRouter(
     prefix="/method-work/flashcard-sessions",
@@ -38,6 +50,92 @@ def create_flashcard_session(
     return db_session
 
 
+@router.post("/reviews", response_model=FlashcardSessionResponse, status_code=status.HTTP_201_CREATED)
+def record_flashcard_reviews(
+    batch: FlashcardReviewBatchCreate,
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """
+    Registra una sesión de estudio completa con el detalle de cada tarjeta repasada.
+    
+    Los eventos se guardan en el registro de repasos con un INSERT multi-fila,
+    los totales de la sesión (fácil/media/difícil) se derivan del lote y cada
+    tarjeta se reprograma con SM-2.
+    """
+    if batch.collection_id is not None:
+        owns_collection = db.query(CardCollection.collection_id).filter(
+            CardCollection.collection_id == batch.collection_id,
+            CardCollection.user_id == current_user.user_id
+        ).first()
+        if not owns_collection:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Colección no encontrada o no tienes acceso"
+            )
+    
+    card_ids = {event.card_id for event in batch.reviews}
+    cards = db.query(Flashcard).filter(
+        Flashcard.card_id.in_(card_ids),
+        Flashcard.card_user == current_user.user_id
+    ).all()
+    cards_by_id = {card.card_id: card for card in cards}
+    
+    missing = sorted(card_ids - cards_by_id.keys())
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Flashcards no encontradas o sin acceso: {missing}"
+        )
+    
+    now = datetime.now()
+    events = sorted(batch.reviews, key=lambda e: e.reviewed_at or now)
+    grades = [event.grade for event in events]
+    
+    try:
+        db_session = FlashcardStudySession(
+            user_id=current_user.user_id,
+            collection_id=batch.collection_id,
+            cards_studied=len(events),
+            cards_easy=grades.count('easy'),
+            cards_medium=grades.count('medium'),
+            cards_hard=grades.count('hard'),
+            duration_minutes=batch.duration_minutes,
+            notes=batch.notes
+        )
+        db.add(db_session)
+        db.flush()
+        
+        db.execute(insert(FlashcardReview), [
+            {
+                "user_id": current_user.user_id,
+                "card_id": event.card_id,
+                "session_id": db_session.session_id,
+                "grade": event.grade,
+                "response_ms": event.response_ms,
+                "reviewed_at": event.reviewed_at or now
+            }
+            for event in events
+        ])
+        
+        # Reprogramar cada tarjeta en orden cronológico
+        for event in events:
+            SpacedRepetitionScheduler.apply_review(
+                cards_by_id[event.card_id], event.grade, event.reviewed_at or now
+            )
+        
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error al registrar los repasos: {str(e)}"
+        )
+    
+    db.refresh(db_session)
+    return db_session
+
+
 @router.get("", response_model=List[FlashcardSessionResponse])
 def get_flashcard_sessions(
     skip: int = 0,
@@ -57,6 +155,20 @@ def get_flashcard_sessions(
     return sessions
 
 
+@router.get("/stats", response_model=FlashcardSessionStatsResponse)
+def get_flashcard_session_stats(
+    granularity: Literal['day', 'week'] = Query('day', description="Agrupar por día o por semana"),
+    periods: int = Query(30, ge=1, le=366, description="Cantidad de periodos (incluye el actual)"),
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """
+    Obtiene los totales de estudio por día o semana: tarjetas estudiadas,
+    reparto fácil/media/difícil y minutos.
+    """
+    return FlashcardSessionStatsService.get_stats(db, current_user.user_id, granularity, periods)
+
+
 @router.get("/{session_id}", response_model=FlashcardSessionResponse)
 def get_flashcard_session(
     session_id: int,
@@ -81,6 +193,25 @@ def get_flashcard_session(
     return session
 
 
+@router.get("/{session_id}/reviews", response_model=List[FlashcardReviewResponse])
+def get_flashcard_session_reviews(
+    session_id: int,
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """Obtiene el detalle de tarjetas repasadas en una sesión."""
+    
+    reviews = db.query(FlashcardReview)\
+        .filter(
+            FlashcardReview.session_id == session_id,
+            FlashcardReview.user_id == current_user.user_id
+        )\
+        .order_by(FlashcardReview.reviewed_at)\
+        .all()
+    
+    return reviews
+
+
 @router.delete("/{session_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_flashcard_session(
     session_id: int,
@@ -102,6 +233,8 @@ def delete_flashcard_session(
             detail="Sesión no encontrada"
         )
     
+    if session.created_at:
+        FlashcardSessionStatsService.invalidate_day(db, current_user.user_id, session.created_at.date())
     db.delete(session)
     db.commit()
     return None
\ No newline at end of file
@@ -1,14 +1,36 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile, status
 from sqlalchemy.orm import Session
-from typing import List
+from sqlalchemy import or_, insert
+from sqlalchemy.exc import SQLAlchemyError
+import csv
+import io
+from typing import List, Optional, Literal, Union
+from datetime import datetime
 from app.database.connection import get_db
 from app.api.dependencies import get_current_user
 from app.models.user import Usuario
 from app.models.pydantic_models import (
-    CollectionCreate, CollectionOut, CollectionOutWithCards,
-    FlashcardCreate, FlashcardOut, FlashcardBase
+    CollectionCreate, CollectionOut, CollectionWithCountOut,
+    CollectionCardsPage, CollectionDigestPage,
+    FlashcardDigestOut,
+    FlashcardCreate, FlashcardOut, FlashcardBase,
+    FlashcardScheduleOut, FlashcardReviewIn,
+    FlashcardImportResult, FlashcardImportLineError,
+    FlashcardSyncOut, FlashcardSearchHit,
+    FlashcardCreatedOut, FlashcardDedupeResult, FlashcardStatsOut
 )
 from app.models.orm_models import CardCollection, Flashcard
+from app.services.flashcard_sync_service import FlashcardSyncService
+from app.services.flashcard_search_service import FlashcardSearchService
+from app.services.flashcard_dedupe_service import FlashcardDedupeService
+from app.services.flashcard_stats_service import FlashcardStatsService
+from app.utils.spaced_repetition import SpacedRepetitionScheduler
+from app.utils.flashcard_utils import card_content_hash, card_fingerprint, fingerprint_columns
+from app.utils.bulk_import import (
+    BULK_INSERT_BATCH_SIZE,
+    MAX_REPORTED_ERRORS,
+    iter_delimited_records
+)
 
 router = APIRouter(
     prefix="/flashcards",
@@ -32,7 +54,8 @@ def create_collection(
         user_id=current_user.user_id,  # ✅ NUEVO: Asociar al usuario
         collection_name=collection_data.collection_name,
         collection_color=collection_data.collection_color,
-        is_active=collection_data.is_active
+        is_active=collection_data.is_active,
+        sync_seq=FlashcardSyncService.next_seq(db, current_user.user_id)
     )
     
     db.add(db_collection)
@@ -41,29 +64,40 @@ def create_collection(
     return db_collection
 
 
-@router.get("/collections", response_model=List[CollectionOut])
+@router.get("/collections", response_model=List[CollectionWithCountOut])
 def get_user_collections(
     db: Session = Depends(get_db),
     current_user: Usuario = Depends(get_current_user)  # ✅ NUEVO: Requiere autenticación
 ):
     """
-    Obtiene todas las colecciones del usuario autenticado (sin tarjetas).
+    Obtiene todas las colecciones del usuario autenticado (sin tarjetas),
+    cada una con su número de tarjetas activas.
     """
-    collections = db.query(CardCollection).filter(
-        CardCollection.user_id == current_user.user_id,  # ✅ NUEVO: Filtrar por usuario
-        CardCollection.is_active == True
-    ).all()
-    return collections
+    rows = FlashcardStatsService.get_collections_with_counts(db, current_user.user_id)
+    return [
+        CollectionWithCountOut(
+            **CollectionOut.model_validate(collection).model_dump(),
+            card_count=card_count
+        )
+        for collection, card_count in rows
+    ]
 
 
-@router.get("/collections/{collection_id}", response_model=CollectionOutWithCards)
+@router.get("/collections/{collection_id}", response_model=Union[CollectionCardsPage, CollectionDigestPage])
 def get_collection_with_cards(
     collection_id: int, 
+    after: Optional[int] = Query(None, ge=0, description="card_id de la última tarjeta recibida"),
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Tarjetas por página (sin límite si se omite)"),
+    fields: Literal["full", "ids"] = Query("full", description="'ids' devuelve solo card_id y hash de contenido"),
     db: Session = Depends(get_db),
     current_user: Usuario = Depends(get_current_user)  # ✅ NUEVO: Requiere autenticación
 ):
     """
-    Obtiene una colección específica del usuario con todas sus tarjetas.
+    Obtiene una colección específica del usuario con sus tarjetas activas.
+    
+    Las tarjetas se cargan con una consulta explícita paginada por card_id
+    (keyset): usar `next_after` de la respuesta como `after` para la siguiente página.
+    Con `fields=ids` solo se devuelven ids y hashes para sincronizar una copia local.
     """
     collection = db.query(CardCollection).filter(
         CardCollection.collection_id == collection_id,
@@ -75,7 +109,51 @@ def get_collection_with_cards(
             status_code=status.HTTP_404_NOT_FOUND, 
             detail="Colección no encontrada o no tienes acceso"
         )
-    return collection
+    
+    columns = [Flashcard] if fields == "full" else [
+        Flashcard.card_id, Flashcard.question, Flashcard.answer,
+        Flashcard.is_reversed, Flashcard.flashcard_color
+    ]
+    query = db.query(*columns).filter(
+        Flashcard.collection == collection_id,
+        Flashcard.is_active == True
+    )
+    
+    if after is not None:
+        query = query.filter(Flashcard.card_id > after)
+    
+    query = query.order_by(Flashcard.card_id)
+    
+    if limit is not None:
+        # Se pide una fila extra para saber si hay otra página
+        rows = query.limit(limit + 1).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+    else:
+        rows = query.all()
+        has_more = False
+    
+    next_after = rows[-1].card_id if has_more else None
+    collection_data = CollectionOut.model_validate(collection).model_dump()
+    
+    if fields == "ids":
+        return CollectionDigestPage(
+            **collection_data,
+            cards=[
+                FlashcardDigestOut(
+                    card_id=row.card_id,
+                    hash=card_content_hash(row.question, row.answer, row.is_reversed, row.flashcard_color)
+                )
+                for row in rows
+            ],
+            next_after=next_after
+        )
+    
+    return CollectionCardsPage(
+        **collection_data,
+        flashcards=[FlashcardOut.model_validate(card) for card in rows],
+        next_after=next_after
+    )
 
 
 @router.put("/collections/{collection_id}", response_model=CollectionOut)
@@ -102,6 +180,7 @@ def update_collection(
     collection.collection_name = collection_data.collection_name
     collection.collection_color = collection_data.collection_color
     collection.is_active = collection_data.is_active
+    collection.sync_seq = FlashcardSyncService.next_seq(db, current_user.user_id)
     
     db.commit()
     db.refresh(collection)
@@ -128,6 +207,12 @@ def delete_collection(
             detail="Colección no encontrada o no tienes acceso"
         )
     
+    seq = FlashcardSyncService.next_seq(db, current_user.user_id)
+    FlashcardSyncService.record_deletes(db, current_user.user_id, seq, "collection", [collection_id])
+    FlashcardSyncService.record_deletes(
+        db, current_user.user_id, seq, "card", [card.card_id for card in db_collection.flashcards]
+    )
+    
     db.delete(db_collection)
     db.commit()
     return None
@@ -137,10 +222,13 @@ def delete_collection(
 # ENDPOINTS PARA FLASHCARDS (DENTRO DE COLECCIÓN)
 # =============================================
 
-@router.post("/collections/{collection_id}/cards", response_model=FlashcardOut, status_code=status.HTTP_201_CREATED)
+@router.post("/collections/{collection_id}/cards", response_model=FlashcardCreatedOut, status_code=status.HTTP_201_CREATED)
 def create_flashcard_in_collection(
     collection_id: int, 
     card_data: FlashcardCreate, 
+    on_duplicate: Literal["flag", "skip", "allow"] = Query(
+        "flag", description="flag: crear e indicar el duplicado; skip: rechazar con 409; allow: no verificar"
+    ),
     db: Session = Depends(get_db),
     current_user: Usuario = Depends(get_current_user)  # ✅ NUEVO: Requiere autenticación
 ):
@@ -159,7 +247,20 @@ def create_flashcard_in_collection(
             detail="Colección no encontrada o no tienes acceso"
         )
 
-    # 2. Crear la flashcard (asociada al usuario actual)
+    # 2. Detectar tarjetas duplicadas o casi duplicadas del usuario
+    fingerprint = card_fingerprint(card_data.question, card_data.answer)
+    duplicate_of = None
+    
+    if on_duplicate != "allow":
+        duplicate_of = FlashcardDedupeService.find_duplicates(db, current_user.user_id, [fingerprint])[0]
+        
+        if duplicate_of is not None and on_duplicate == "skip":
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Ya existe una flashcard similar (card_id={duplicate_of})"
+            )
+
+    # 3. Crear la flashcard (asociada al usuario actual)
     db_card = Flashcard(
         question=card_data.question,
         answer=card_data.answer,
@@ -167,13 +268,192 @@ def create_flashcard_in_collection(
         flashcard_color=card_data.flashcard_color,
         card_user=current_user.user_id,  # ✅ NUEVO: Usar el usuario del token
         collection=collection_id,
-        is_active=True
+        is_active=True,
+        sync_seq=FlashcardSyncService.next_seq(db, current_user.user_id),
+        **fingerprint_columns(fingerprint)
     )
     
     db.add(db_card)
     db.commit()
     db.refresh(db_card)
-    return db_card
+    return FlashcardCreatedOut(
+        **FlashcardOut.model_validate(db_card).model_dump(),
+        duplicate_of=duplicate_of
+    )
+
+
+# Límites de longitud tomados de las columnas de la tabla flashcards
+QUESTION_MAX_LENGTH = Flashcard.__table__.c.question.type.length
+ANSWER_MAX_LENGTH = Flashcard.__table__.c.answer.type.length
+
+# Encabezados reconocidos en la primera fila de un archivo importado
+IMPORT_HEADER_NAMES = {"question", "pregunta", "front", "anverso"}
+
+IMPORT_DELIMITERS = {"auto": None, "csv": ",", "tsv": "\t"}
+
+
+@router.post("/collections/{collection_id}/import", response_model=FlashcardImportResult)
+def import_flashcards(
+    collection_id: int,
+    file: UploadFile = File(..., description="Archivo CSV, TSV o texto exportado de Anki"),
+    format: Literal["auto", "csv", "tsv"] = Query("auto", description="Formato del archivo"),
+    on_duplicate: Literal["skip", "allow"] = Query(
+        "skip", description="skip: omitir tarjetas duplicadas o casi duplicadas; allow: importarlas igual"
+    ),
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """
+    Importa flashcards de forma masiva en una colección del usuario.
+    
+    Cada línea debe tener `pregunta<separador>respuesta`; columnas extra se ignoran.
+    El archivo se procesa línea por línea (memoria constante), las tarjetas válidas
+    se insertan en lotes multi-fila dentro de una sola transacción y las líneas
+    inválidas se reportan sin abortar la importación.
+    """
+    db_collection = db.query(CardCollection).filter(
+        CardCollection.collection_id == collection_id,
+        CardCollection.user_id == current_user.user_id
+    ).first()
+    
+    if not db_collection:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, 
+            detail="Colección no encontrada o no tienes acceso"
+        )
+    
+    inserted = 0
+    failed = 0
+    skipped_duplicates = 0
+    errors: List[FlashcardImportLineError] = []
+    batch = []
+    
+    def report(line: int, detail: str):
+        nonlocal failed
+        failed += 1
+        if len(errors) < MAX_REPORTED_ERRORS:
+            errors.append(FlashcardImportLineError(line=line, detail=detail))
+    
+    def flush_batch():
+        """Descarta duplicados del lote (una consulta por índice) e inserta el resto"""
+        nonlocal inserted, skipped_duplicates, batch
+        rows = batch
+        batch = []
+        
+        if on_duplicate == "skip":
+            fingerprints = [fp for _, fp in rows]
+            duplicates = FlashcardDedupeService.mark_duplicates(db, current_user.user_id, fingerprints)
+            skipped_duplicates += sum(duplicates)
+            rows = [row for row, duplicate in zip(rows, duplicates) if not duplicate]
+        
+        if rows:
+            db.execute(insert(Flashcard), [row for row, _ in rows])
+            inserted += len(rows)
+    
+    stream = io.TextIOWrapper(file.file, encoding="utf-8-sig", errors="replace", newline="")
+    
+    try:
+        # Toda la importación comparte un único número de secuencia
+        seq = FlashcardSyncService.next_seq(db, current_user.user_id)
+        first_row = True
+        
+        for line_number, fields in iter_delimited_records(stream, IMPORT_DELIMITERS[format]):
+            # La cabecera es la primera fila de datos (después de las directivas "#" de Anki)
+            if first_row:
+                first_row = False
+                if fields[0].strip().lower() in IMPORT_HEADER_NAMES:
+                    continue
+            
+            if len(fields) < 2:
+                report(line_number, "Se esperaban al menos 2 columnas (pregunta y respuesta)")
+                continue
+            
+            question = fields[0].strip()
+            answer = fields[1].strip()
+            
+            if not question or not answer:
+                report(line_number, "La pregunta y la respuesta no pueden estar vacías")
+                continue
+            if len(question) > QUESTION_MAX_LENGTH:
+                report(line_number, f"La pregunta supera {QUESTION_MAX_LENGTH} caracteres")
+                continue
+            if len(answer) > ANSWER_MAX_LENGTH:
+                report(line_number, f"La respuesta supera {ANSWER_MAX_LENGTH} caracteres")
+                continue
+            
+            fingerprint = card_fingerprint(question, answer)
+            batch.append(({
+                "question": question,
+                "answer": answer,
+                "is_reversed": False,
+                "card_user": current_user.user_id,
+                "collection": collection_id,
+                "is_active": True,
+                "sync_seq": seq,
+                **fingerprint_columns(fingerprint)
+            }, fingerprint))
+            
+            if len(batch) >= BULK_INSERT_BATCH_SIZE:
+                flush_batch()
+        
+        if batch:
+            flush_batch()
+        
+        db.commit()
+    except SQLAlchemyError as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error al importar flashcards: {str(e)}"
+        )
+    except csv.Error as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Archivo mal formado: {str(e)}"
+        )
+    finally:
+        stream.detach()
+    
+    return FlashcardImportResult(
+        collection_id=collection_id,
+        inserted=inserted,
+        failed=failed,
+        skipped_duplicates=skipped_duplicates,
+        errors=errors
+    )
+
+
+@router.post("/collections/{collection_id}/dedupe", response_model=FlashcardDedupeResult)
+def dedupe_collection(
+    collection_id: int,
+    dry_run: bool = Query(True, description="Solo reportar, sin desactivar tarjetas"),
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """
+    Busca tarjetas duplicadas o casi duplicadas dentro de una colección.
+    Conserva la más antigua de cada grupo y, si dry_run es False, desactiva el resto.
+    """
+    db_collection = db.query(CardCollection).filter(
+        CardCollection.collection_id == collection_id,
+        CardCollection.user_id == current_user.user_id
+    ).first()
+    
+    if not db_collection:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, 
+            detail="Colección no encontrada o no tienes acceso"
+        )
+    
+    groups = FlashcardDedupeService.dedupe_collection(db, current_user.user_id, collection_id, dry_run)
+    
+    return FlashcardDedupeResult(
+        collection_id=collection_id,
+        dry_run=dry_run,
+        duplicates=sum(len(group["duplicate_card_ids"]) for group in groups),
+        groups=groups
+    )
 
 
 @router.get("/cards", response_model=List[FlashcardOut])
@@ -194,6 +474,77 @@ def get_user_flashcards(
     return cards
 
 
+@router.get("/search", response_model=List[FlashcardSearchHit])
+def search_flashcards(
+    q: str = Query(..., min_length=1, max_length=100, description="Texto a buscar (admite prefijos)"),
+    collection_id: Optional[int] = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """
+    Busca flashcards del usuario por pregunta y respuesta, ordenadas por relevancia.
+    Usa un índice de texto completo (sin recorrer la tabla con LIKE).
+    """
+    hits = FlashcardSearchService.search(db, current_user.user_id, q, collection_id, limit)
+    
+    return [
+        FlashcardSearchHit(**FlashcardOut.model_validate(card).model_dump(), score=round(score, 4))
+        for card, score in hits
+    ]
+
+
+@router.get("/due", response_model=List[FlashcardScheduleOut])
+def get_due_flashcards(
+    limit: int = Query(20, ge=1, le=100),
+    collection_id: Optional[int] = None,
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """
+    Obtiene las siguientes flashcards pendientes de repaso (las más vencidas primero).
+    Usa el índice (card_user, due_at), por lo que el costo depende del lote y no del mazo.
+    """
+    query = db.query(Flashcard).filter(
+        Flashcard.card_user == current_user.user_id,
+        or_(Flashcard.due_at.is_(None), Flashcard.due_at <= datetime.now()),
+        Flashcard.is_active == True
+    )
+    
+    if collection_id is not None:
+        query = query.filter(Flashcard.collection == collection_id)
+    
+    return query.order_by(Flashcard.due_at).limit(limit).all()
+
+
+@router.post("/cards/{card_id}/review", response_model=FlashcardScheduleOut)
+def review_flashcard(
+    card_id: int,
+    review_data: FlashcardReviewIn,
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """
+    Registra el repaso de una flashcard y la reprograma según SM-2.
+    """
+    db_card = db.query(Flashcard).filter(
+        Flashcard.card_id == card_id,
+        Flashcard.card_user == current_user.user_id
+    ).first()
+    
+    if not db_card:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, 
+            detail="Flashcard no encontrada o no tienes acceso"
+        )
+    
+    SpacedRepetitionScheduler.apply_review(db_card, review_data.grade)
+    
+    db.commit()
+    db.refresh(db_card)
+    return db_card
+
+
 @router.put("/cards/{card_id}", response_model=FlashcardOut)
 def update_flashcard(
     card_id: int, 
@@ -218,6 +569,10 @@ def update_flashcard(
     update_dict = card_data.model_dump(exclude_unset=True)
     for key, value in update_dict.items():
         setattr(db_card, key, value)
+    if "question" in update_dict or "answer" in update_dict:
+        for key, value in fingerprint_columns(card_fingerprint(db_card.question, db_card.answer)).items():
+            setattr(db_card, key, value)
+    db_card.sync_seq = FlashcardSyncService.next_seq(db, current_user.user_id)
         
     db.commit()
     db.refresh(db_card)
@@ -243,36 +598,44 @@ def delete_flashcard(
             status_code=status.HTTP_404_NOT_FOUND, 
             detail="Flashcard no encontrada o no tienes acceso"
         )
+    
+    seq = FlashcardSyncService.next_seq(db, current_user.user_id)
+    FlashcardSyncService.record_deletes(db, current_user.user_id, seq, "card", [card_id])
         
     db.delete(db_card)
     db.commit()
     return None
 
 
+# =============================================
+# SINCRONIZACIÓN INCREMENTAL
+# =============================================
+
+@router.get("/sync", response_model=FlashcardSyncOut)
+def sync_flashcards(
+    since: int = Query(0, ge=0, description="Último `seq` recibido (0 = sincronización completa)"),
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """
+    Devuelve solo las colecciones y tarjetas que cambiaron después de `since`,
+    junto con los ids eliminados. El cliente guarda el `seq` de la respuesta
+    y lo envía en la siguiente llamada.
+    """
+    return FlashcardSyncService.get_changes(db, current_user.user_id, since)
+
+
 # =============================================
 # ESTADÍSTICAS DE FLASHCARDS
 # =============================================
 
-@router.get("/stats")
+@router.get("/stats", response_model=FlashcardStatsOut)
 def get_flashcard_stats(
     db: Session = Depends(get_db),
     current_user: Usuario = Depends(get_current_user)
 ):
     """
-    Obtiene estadísticas de flashcards del usuario.
+    Obtiene estadísticas de flashcards del usuario: totales, tarjetas por
+    colección y resumen de sesiones de estudio (en una sola consulta agrupada).
     """
-    total_collections = db.query(CardCollection).filter(
-        CardCollection.user_id == current_user.user_id,
-        CardCollection.is_active == True
-    ).count()
-    
-    total_cards = db.query(Flashcard).filter(
-        Flashcard.card_user == current_user.user_id,
-        Flashcard.is_active == True
-    ).count()
-    
-    return {
-        "total_collections": total_collections,
-        "total_cards": total_cards,
-        "user_id": current_user.user_id
-    }
\ No newline at end of file
+    return FlashcardStatsService.get_stats(db, current_user.user_id)
@@ -0,0 +1,30 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from typing import List, Literal, Optional
+from app.database.connection import get_db
+from app.api.dependencies import get_current_user
+from app.models.user import Usuario
+from app.schemas.method_search import NoteSearchHit
+from app.services.note_search_service import NoteSearchService
+
+router = APIRouter(
+    prefix="/method-work",
+    tags=["Búsqueda de notas"],
+)
+
+
+@router.get("/search", response_model=List[NoteSearchHit])
+def search_notes(
+    q: str = Query(..., min_length=1, max_length=200, description="Texto a buscar"),
+    note_type: Optional[Literal['cornell', 'feynman']] = Query(None, alias="type", description="Restringir a un tipo de nota"),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """
+    Busca en las notas Cornell y trabajos Feynman del usuario.
+    
+    Devuelve los resultados ordenados por relevancia con un fragmento
+    del texto donde aparecen los términos resaltados.
+    """
+    return NoteSearchService.search(db, current_user.user_id, q, note_type, limit)
@@ -4,9 +4,14 @@ from sqlalchemy import desc # Importar desc para ordenar
 from app.database.connection import get_db
 from typing import List # Importar List
 # Importar el SessionCreate y SessionUpdate actualizados
-from app.models.pydantic_models import SessionCreate, SessionUpdate, SessionOut
+from app.models.pydantic_models import (
+    SessionCreate, SessionUpdate, SessionOut,
+    LiveSessionStart, LiveSessionFinish, LiveSessionState
+)
 from app.models.study_session import SesionEstudio
 from app.models.user import Usuario
+from app.api.dependencies import get_current_user
+from app.services.live_session_service import LiveSessionService
 
 
 router = APIRouter(
@@ -82,4 +87,66 @@ def get_user_sessions(user_id: int, db: Session = Depends(get_db)):
     # Obtenemos las sesiones del usuario, ordenadas por fecha de inicio descendente
     sessions = db.query(SesionEstudio).filter(SesionEstudio.user_id == user_id).order_by(desc(SesionEstudio.fecha_inicio)).all()
     
-    return sessions
\ No newline at end of file
+    return sessions
+
+
+# =============================================
+# SESIONES EN CURSO (estado en memoria)
+# =============================================
+# El cliente inicia la sesión, envía un heartbeat cada ~30 s y los eventos de
+# pausa/reanudación; nada de eso escribe en la BD. La fila de sesion_estudio
+# se escribe al finalizar (y cada pocos minutos como checkpoint).
+
+@router.post("/live", response_model=LiveSessionState, status_code=status.HTTP_201_CREATED)
+def start_live_session(
+    data: LiveSessionStart,
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """Inicia una sesión de estudio en curso."""
+    return LiveSessionService.start(db, current_user.user_id, data.metodo_id, data.descripcion)
+
+@router.get("/live/{live_id}", response_model=LiveSessionState)
+def get_live_session(
+    live_id: str,
+    current_user: Usuario = Depends(get_current_user)
+):
+    """Estado actual de la sesión (tiempo activo, pausada o no)."""
+    return LiveSessionService.get_state(live_id, current_user.user_id)
+
+@router.post("/live/{live_id}/heartbeat", response_model=LiveSessionState)
+def live_session_heartbeat(
+    live_id: str,
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """Mantiene viva la sesión. Sin heartbeats durante 90 s deja de sumar tiempo."""
+    return LiveSessionService.heartbeat(db, live_id, current_user.user_id)
+
+@router.post("/live/{live_id}/pause", response_model=LiveSessionState)
+def pause_live_session(
+    live_id: str,
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """Pausa la sesión."""
+    return LiveSessionService.pause(db, live_id, current_user.user_id)
+
+@router.post("/live/{live_id}/resume", response_model=LiveSessionState)
+def resume_live_session(
+    live_id: str,
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """Reanuda la sesión."""
+    return LiveSessionService.resume(db, live_id, current_user.user_id)
+
+@router.post("/live/{live_id}/finish", response_model=SessionOut)
+def finish_live_session(
+    live_id: str,
+    data: LiveSessionFinish = LiveSessionFinish(),
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """Finaliza la sesión y la guarda en el historial."""
+    return LiveSessionService.finish(db, live_id, current_user.user_id, data.fue_completada)
@@ -1,21 +1,36 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
+from pydantic import ValidationError
+from sqlalchemy import insert, func, distinct, union_all, literal_column
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 from typing import List
 from datetime import datetime, timedelta
 import json
 
-from app.database.connection import get_db
+from app.database.connection import get_db, SessionLocal
 from app.models.tracking_session import TrackingSession
+from app.models.tracking_archive import TrackingSessionArchive
 from app.models.user_tracking_prefs import UserTrackingPrefs
 from app.schemas.tracking import (
     TrackingSessionCreate, 
     TrackingSessionResponse, 
+    TrackingBulkImportResponse,
+    TrackingBulkRowError,
+    TrackingWeekSummary,
     WeeklyStatsResponse,
     UserPrefsUpdate,
     UserPrefsResponse
 )
 from app.api.v1.auth import get_current_user
 from app.models.user import Usuario
+from app.services.tracking_archive_service import TrackingArchiveService
+from app.utils.bulk_import import (
+    BULK_INSERT_BATCH_SIZE,
+    MAX_REPORTED_ERRORS,
+    format_validation_error,
+    iter_json_records
+)
 
 router = APIRouter(
     prefix="/progress/tracking",
@@ -50,6 +65,82 @@ def create_tracking_session(
     
     return new_session
 
+@router.post("/sessions/bulk", response_model=TrackingBulkImportResponse)
+async def bulk_import_tracking_sessions(
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """
+    Importación masiva de sesiones de seguimiento.
+
+    Acepta un arreglo JSON o NDJSON (un objeto `TrackingSessionCreate` por línea).
+    Cada fila se valida a medida que llega; las filas inválidas se reportan
+    sin abortar el lote (se detallan las primeras MAX_REPORTED_ERRORS; `failed`
+    las cuenta todas). Las válidas se insertan en lotes multi-fila y los
+    logros se evalúan una sola vez al final.
+
+    El cuerpo se lee de forma asíncrona; cada acceso a la BD (sesión síncrona)
+    se ejecuta en el threadpool para no bloquear el event loop.
+    """
+    inserted = 0
+    failed = 0
+    errors: List[TrackingBulkRowError] = []
+    batch = []
+
+    def report(row: int, detail: str):
+        nonlocal failed
+        failed += 1
+        if len(errors) < MAX_REPORTED_ERRORS:
+            errors.append(TrackingBulkRowError(row=row, detail=detail))
+
+    try:
+        async for row_number, record, parse_error in iter_json_records(request.stream()):
+            if parse_error:
+                report(row_number, parse_error)
+                continue
+
+            try:
+                session_data = TrackingSessionCreate.model_validate(record)
+            except ValidationError as e:
+                report(row_number, format_validation_error(e))
+                continue
+
+            batch.append({
+                "user_id": current_user.user_id,
+                "day_of_week": session_data.day_of_week,
+                "hours": session_data.hours,
+                "method": session_data.method,
+                "description": session_data.description
+            })
+
+            if len(batch) >= BULK_INSERT_BATCH_SIZE:
+                await run_in_threadpool(db.execute, insert(TrackingSession), batch)
+                inserted += len(batch)
+                batch = []
+
+        if batch:
+            await run_in_threadpool(db.execute, insert(TrackingSession), batch)
+            inserted += len(batch)
+
+        await run_in_threadpool(db.commit)
+    except SQLAlchemyError as e:
+        await run_in_threadpool(db.rollback)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error al importar sesiones: {str(e)}"
+        )
+
+    # Una sola evaluación de logros para todo el lote
+    if inserted:
+        await run_in_threadpool(check_and_update_achievements, db, current_user.user_id)
+
+    return TrackingBulkImportResponse(
+        inserted=inserted,
+        failed=failed,
+        errors=errors
+    )
+
 @router.get("/sessions", response_model=List[TrackingSessionResponse])
 def get_tracking_sessions(
     days: int = 7,
@@ -58,15 +149,15 @@ def get_tracking_sessions(
     db: Session = Depends(get_db),
     current_user: Usuario = Depends(get_current_user)
 ):
-    """Obtener sesiones de seguimiento (últimos N días)"""
-    cutoff_date = datetime.now() - timedelta(days=days)
-    
-    sessions = db.query(TrackingSession).filter(
-        TrackingSession.user_id == current_user.user_id,
-        TrackingSession.created_at >= cutoff_date
-    ).order_by(TrackingSession.created_at.desc()).offset(skip).limit(limit).all()
+    """Obtener sesiones de seguimiento (últimos N días, incluidas las archivadas)"""
+    cutoff_date = TrackingArchiveService.get_visible_since(
+        db, current_user.user_id, datetime.now() - timedelta(days=days)
+    )
     
-    return sessions
+    sessions = TrackingArchiveService.visible_sessions(db, current_user.user_id, cutoff_date)
+    return db.query(sessions).order_by(
+        sessions.c.created_at.desc(), sessions.c.session_id.desc()
+    ).offset(skip).limit(limit).all()
 
 @router.get("/stats", response_model=WeeklyStatsResponse)
 def get_weekly_stats(
@@ -74,13 +165,13 @@ def get_weekly_stats(
     db: Session = Depends(get_db),
     current_user: Usuario = Depends(get_current_user)
 ):
-    """Obtener estadísticas semanales"""
-    cutoff_date = datetime.now() - timedelta(days=days)
+    """Obtener estadísticas semanales (incluye las sesiones archivadas del rango)"""
+    cutoff_date = TrackingArchiveService.get_visible_since(
+        db, current_user.user_id, datetime.now() - timedelta(days=days)
+    )
     
-    sessions = db.query(TrackingSession).filter(
-        TrackingSession.user_id == current_user.user_id,
-        TrackingSession.created_at >= cutoff_date
-    ).all()
+    visible = TrackingArchiveService.visible_sessions(db, current_user.user_id, cutoff_date)
+    sessions = db.query(visible.c.day_of_week, visible.c.hours, visible.c.method).all()
     
     total_hours = sum(s.hours for s in sessions)
     sessions_count = len(sessions)
@@ -122,12 +213,19 @@ def delete_tracking_session(
     db: Session = Depends(get_db),
     current_user: Usuario = Depends(get_current_user)
 ):
-    """Eliminar una sesión de seguimiento"""
+    """Eliminar una sesión de seguimiento (actual o archivada)"""
     session = db.query(TrackingSession).filter(
         TrackingSession.session_id == session_id,
         TrackingSession.user_id == current_user.user_id
     ).first()
     
+    if not session:
+        # Las sesiones archivadas conservan el mismo session_id
+        session = db.query(TrackingSessionArchive).filter(
+            TrackingSessionArchive.session_id == session_id,
+            TrackingSessionArchive.user_id == current_user.user_id
+        ).first()
+    
     if not session:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -139,19 +237,38 @@ def delete_tracking_session(
     
     return None
 
+def archive_user_sessions_task(user_id: int):
+    """Tarea en segundo plano: archivar las sesiones ocultas tras un reinicio"""
+    db = SessionLocal()
+    try:
+        TrackingArchiveService.archive_user_sessions(db, user_id)
+    finally:
+        db.close()
+
 @router.delete("/sessions", status_code=status.HTTP_204_NO_CONTENT)
 def reset_week(
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: Usuario = Depends(get_current_user)
 ):
-    """Reiniciar semana - eliminar todas las sesiones"""
-    db.query(TrackingSession).filter(
-        TrackingSession.user_id == current_user.user_id
-    ).delete()
-    db.commit()
+    """
+    Reiniciar semana - ocultar todas las sesiones actuales.
+    Solo actualiza la marca de reinicio; las sesiones se archivan en segundo plano.
+    """
+    TrackingArchiveService.reset_week(db, current_user.user_id)
+    background_tasks.add_task(archive_user_sessions_task, current_user.user_id)
     
     return None
 
+@router.get("/history", response_model=List[TrackingWeekSummary])
+def get_tracking_history(
+    weeks: int = 12,
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """Obtener el historial de semanas archivadas (totales por semana ISO)"""
+    return TrackingArchiveService.get_weekly_history(db, current_user.user_id, weeks)
+
 # =============================================
 # PREFERENCIAS DE USUARIO (META Y LOGROS)
 # =============================================
@@ -175,17 +292,30 @@ def check_and_update_achievements(db: Session, user_id: int):
     prefs = get_or_create_prefs(db, user_id)
     achievements = json.loads(prefs.achievements)
     
-    # Obtener todas las sesiones del usuario
-    sessions = db.query(TrackingSession).filter(
-        TrackingSession.user_id == user_id
-    ).all()
+    # Sesiones del usuario desde su último reinicio (actuales y archivadas)
+    hot = db.query(
+        TrackingSession.hours, TrackingSession.method, TrackingSession.day_of_week
+    ).filter(TrackingSession.user_id == user_id)
+    archived = db.query(
+        TrackingSessionArchive.hours, TrackingSessionArchive.method, TrackingSessionArchive.day_of_week
+    ).filter(TrackingSessionArchive.user_id == user_id)
     
-    total_hours = sum(s.hours for s in sessions)
-    used_methods = set(s.method for s in sessions)
-    studied_days = set(s.day_of_week for s in sessions)
+    if prefs.week_reset_at:
+        hot = hot.filter(TrackingSession.created_at >= prefs.week_reset_at)
+        archived = archived.filter(TrackingSessionArchive.created_at >= prefs.week_reset_at)
+    
+    sessions = union_all(hot.statement, archived.statement).subquery()
+    totals = db.query(
+        func.count(literal_column("*")),
+        func.coalesce(func.sum(sessions.c.hours), 0),
+        func.count(distinct(sessions.c.method)),
+        func.count(distinct(sessions.c.day_of_week))
+    ).select_from(sessions).one()
+    
+    sessions_count, total_hours, used_methods_count, studied_days_count = totals
     
     # Primera sesión
-    if len(sessions) >= 1 and "first_session" not in achievements:
+    if sessions_count >= 1 and "first_session" not in achievements:
         achievements.append("first_session")
     
     # Meta semanal
@@ -197,11 +327,11 @@ def check_and_update_achievements(db: Session, user_id: int):
         achievements.append("total_20h")
     
     # Todos los métodos
-    if len(used_methods) >= 4 and "all_methods" not in achievements:
+    if used_methods_count >= 4 and "all_methods" not in achievements:
         achievements.append("all_methods")
     
     # Semana perfecta
-    if len(studied_days) >= 7 and "streak_7" not in achievements:
+    if studied_days_count >= 7 and "streak_7" not in achievements:
         achievements.append("streak_7")
     
     # Guardar
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, status, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, status, Query
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from app.database.connection import get_db
@@ -7,11 +7,15 @@ from app.models.user import Usuario
 from app.schemas.user import (
     UserDetailResponse,
     UserSummaryResponse,
+    UserSearchPage,
+    UserStatsResponse,
     UserUpdateSchema,
     ChangePasswordSchema,
     UserActionResponse
 )
 from app.services.user_service import UserService
+from app.services.user_search_service import UserSearchService
+from app.services.account_deletion_service import AccountDeletionService
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
@@ -43,6 +47,7 @@ async def get_my_profile(
 
 @router.get(
     "/me/stats",
+    response_model=UserStatsResponse,
     summary="Obtener estadísticas propias",
     description="Obtiene estadísticas del usuario autenticado"
 )
@@ -55,12 +60,48 @@ async def get_my_statistics(
     Útil para mostrar en el dashboard.
     
     Requiere: Token de autenticación
+    
+    Incluye sesiones de estudio (y minutos por método), flashcards,
+    notas Cornell y Feynman, horas de seguimiento y logros. Los valores
+    pueden tener unos segundos de retraso (caché por usuario).
     """
-    stats = UserService.get_user_statistics(db, current_user.user_id)
+    stats = UserService.get_user_statistics(db, current_user)
     return stats
 
 
 
+@router.get(
+    "/search",
+    response_model=UserSearchPage,
+    summary="Buscar usuarios",
+    description="Busca usuarios por username o nombre completo, ordenados por relevancia"
+)
+async def search_users(
+    q: str = Query(..., min_length=1, max_length=100, description="Texto a buscar"),
+    limit: int = Query(20, ge=1, le=100, description="Número máximo de resultados"),
+    cursor: Optional[str] = Query(None, description="next_cursor de la página anterior"),
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """
+    Busca usuarios por username o nombre completo.
+    
+    Requiere: Token de autenticación
+    
+    Coincide por prefijo de palabra ("jos" encuentra "josue") y tolera un
+    error de escritura que conserve la mitad de los trigramas ("josie"
+    encuentra "josue"; una transposición al inicio, como "jsoue", no).
+    No busca dentro de las palabras: "sue" no encuentra "josue".
+    Para la siguiente página, enviar el `next_cursor` recibido como `cursor`.
+    
+    Ejemplo de uso:
+        - /api/v1/users/search?q=josue
+        - /api/v1/users/search?q=josue&cursor=12:345
+    """
+    return UserSearchService.search(db, q, limit=limit, cursor=cursor)
+
+
+
 @router.get(
     "/{user_id}",
     response_model=UserDetailResponse,
@@ -252,6 +293,7 @@ async def change_my_password(
     description="Elimina la cuenta del usuario autenticado (Req. Funcional #3)"
 )
 async def delete_my_account(
+    background_tasks: BackgroundTasks,
     current_user: Usuario = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -269,13 +311,16 @@ async def delete_my_account(
         - Flashcards
         - Configuraciones personalizadas
     
+    La cuenta se desactiva de inmediato y los datos se borran en segundo plano.
+    
     Retorna un mensaje de confirmación.
     """
     UserService.delete_user(db, current_user.user_id)
+    background_tasks.add_task(AccountDeletionService.run_in_background, current_user.user_id)
     
     return {
         "message": f"Cuenta de {current_user.username} eliminada exitosamente",
-        "detail": "Todos los datos asociados han sido eliminados"
+        "detail": "La cuenta fue desactivada; los datos asociados se eliminarán en segundo plano"
     }
 
 @router.delete(
@@ -286,6 +331,7 @@ async def delete_my_account(
 )
 async def delete_user_by_id(
     user_id: int,
+    background_tasks: BackgroundTasks,
     current_user: Usuario = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -305,6 +351,7 @@ async def delete_user_by_id(
 
     
     UserService.delete_user(db, user_id)
+    background_tasks.add_task(AccountDeletionService.run_in_background, user_id)
     
     return {
         "message": f"Usuario con ID {user_id} eliminado exitosamente",
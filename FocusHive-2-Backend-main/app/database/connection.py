@@ -3,8 +3,11 @@ from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.config import get_settings
 # Importaciones necesarias para tipos personalizados
-from sqlalchemy.types import TypeDecorator, String 
+from sqlalchemy.types import TypeDecorator, String, Text
 import typing as t
+import base64
+import binascii
+import zlib
 
 # Esto asegura que los datos binarios (como el color) se lean como una cadena de texto
 class ColorString(TypeDecorator):
@@ -17,6 +20,48 @@ class ColorString(TypeDecorator):
             return value.decode('utf-8')
         return value
 
+
+# Textos a partir de este tamaño (bytes UTF-8) se guardan comprimidos
+COMPRESSION_THRESHOLD = 4096
+
+# Marca de formato al inicio del valor guardado: zlib + base64 (versión 1)
+COMPRESSED_PREFIX = "\x1fz1:"
+
+# Comprime de forma transparente los textos largos (notas, explicaciones)
+class CompressedText(TypeDecorator):
+    impl = Text
+    cache_ok = True
+
+    def __init__(self, threshold: int = COMPRESSION_THRESHOLD, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.threshold = threshold
+
+    # Método que se ejecuta al ESCRIBIR en la BD
+    def process_bind_param(self, value: t.Any, dialect: t.Any) -> t.Optional[str]:
+        if value is None:
+            return value
+        data = value.encode('utf-8')
+        # Un texto que empieza con la marca se comprime siempre: guardado tal
+        # cual se leería como comprimido
+        marked = value.startswith(COMPRESSED_PREFIX)
+        if len(data) < self.threshold and not marked:
+            return value
+        encoded = COMPRESSED_PREFIX + base64.b64encode(zlib.compress(data, 6)).decode('ascii')
+        # Si no hay ahorro real (texto poco repetitivo) se guarda tal cual
+        return encoded if len(encoded) < len(data) or marked else value
+
+    # Método que se ejecuta al LEER de la BD (las filas antiguas sin marca se leen igual)
+    def process_result_value(self, value: t.Any, dialect: t.Any) -> t.Optional[str]:
+        if value is not None and isinstance(value, bytes):
+            value = value.decode('utf-8')
+        if value is not None and value.startswith(COMPRESSED_PREFIX):
+            try:
+                return zlib.decompress(base64.b64decode(value[len(COMPRESSED_PREFIX):])).decode('utf-8')
+            except (binascii.Error, zlib.error, UnicodeDecodeError):
+                # Texto guardado tal cual que empezaba con la marca
+                return value
+        return value
+
 settings=get_settings()
 
 engine=create_engine(
@@ -0,0 +1,154 @@
+"""
+Migraciones de esquema para bases de datos ya existentes.
+
+`Base.metadata.create_all` solo crea tablas nuevas: nunca agrega columnas ni
+índices a una tabla que ya existe. Aquí se listan las columnas e índices
+agregados a tablas existentes; `run_migrations` agrega los que falten con
+ALTER TABLE. Es idempotente: se ejecuta al iniciar la app y también se puede
+lanzar a mano con `python -m app.jobs.migrate`.
+
+El DDL de cada columna se genera desde el modelo, así que las columnas
+NOT NULL deben tener `server_default` (para rellenar las filas existentes).
+"""
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.schema import CreateColumn
+from typing import List, Tuple
+
+from app.database.connection import Base
+# Modelos de las tablas migradas (registran sus tablas en Base.metadata)
+from app.models.orm_models import CardCollection, Flashcard  # noqa: F401
+from app.models.tracking_session import TrackingSession  # noqa: F401
+from app.models.user_tracking_prefs import UserTrackingPrefs  # noqa: F401
+from app.models.cornell import CornellNote  # noqa: F401
+from app.models.feynman import FeynmanWork  # noqa: F401
+from app.models.user import Usuario  # noqa: F401
+from app.models.flashcard_session import FlashcardStudySession  # noqa: F401
+
+# (tabla, columna) en el orden en que se agregaron
+COLUMNS: List[Tuple[str, str]] = [
+    # Repaso espaciado SM-2
+    ("flashcards", "interval_days"),
+    ("flashcards", "ease_factor"),
+    ("flashcards", "repetitions"),
+    ("flashcards", "lapses"),
+    ("flashcards", "due_at"),
+    ("flashcards", "last_reviewed_at"),
+    # Reinicio de semana del seguimiento
+    ("user_tracking_prefs", "week_reset_at"),
+    # Sincronización incremental
+    ("card_collections", "sync_seq"),
+    ("flashcards", "sync_seq"),
+    # Huellas de contenido para duplicados (se rellenan con python -m app.jobs.backfill_flashcard_fingerprints)
+    ("flashcards", "content_hash"),
+    ("flashcards", "simhash"),
+    ("flashcards", "lsh_band0"),
+    ("flashcards", "lsh_band1"),
+    ("flashcards", "lsh_band2"),
+    ("flashcards", "lsh_band3"),
+    # Revisión para el autoguardado por deltas
+    ("cornell_notes", "revision"),
+    ("feynman_work", "revision"),
+    # Vista previa y términos indexados de las notas (se rellenan con python -m app.jobs.compress_notes)
+    ("cornell_notes", "preview"),
+    ("cornell_notes", "search_text"),
+    ("feynman_work", "preview"),
+    ("feynman_work", "search_text"),
+    # Borrado de cuentas en segundo plano (cuentas desactivadas)
+    ("usuario", "is_active"),
+]
+
+# (tabla, índice) definidos en __table_args__ y agregados a tablas existentes
+INDEXES: List[Tuple[str, str]] = [
+    ("flashcards", "ix_flashcards_user_due"),
+    ("tracking_sessions", "ix_tracking_sessions_user_created"),
+    ("card_collections", "ix_card_collections_user_seq"),
+    ("flashcards", "ix_flashcards_user_seq"),
+    ("flashcards", "ix_flashcards_user_hash"),
+    ("flashcards", "ix_flashcards_user_band0"),
+    ("flashcards", "ix_flashcards_user_band1"),
+    ("flashcards", "ix_flashcards_user_band2"),
+    ("flashcards", "ix_flashcards_user_band3"),
+    ("cornell_notes", "ft_cornell_notes_search"),
+    ("feynman_work", "ft_feynman_work_search"),
+    ("flashcards", "ft_flashcards_question_answer"),
+    ("flashcard_study_sessions", "ix_flashcard_sessions_user_created"),
+]
+
+# (tabla, índice) reemplazados por otros: se borran si existen
+DROPPED_INDEXES: List[Tuple[str, str]] = [
+    # Cubrían las secciones comprimidas; ahora se indexa search_text
+    ("cornell_notes", "ft_cornell_notes_text"),
+    ("feynman_work", "ft_feynman_work_text"),
+]
+
+
+def _add_column_sql(engine: Engine, table_name: str, column_name: str) -> str:
+    column = Base.metadata.tables[table_name].c[column_name]
+    if not column.nullable and column.server_default is None:
+        raise RuntimeError(f"{table_name}.{column_name} es NOT NULL y no tiene server_default")
+    ddl = CreateColumn(column).compile(dialect=engine.dialect)
+    return f"ALTER TABLE {table_name} ADD COLUMN {ddl}"
+
+
+def _drop_index_sql(engine: Engine, table_name: str, index_name: str) -> str:
+    if engine.dialect.name == "mysql":
+        return f"DROP INDEX {index_name} ON {table_name}"
+    return f"DROP INDEX {index_name}"
+
+
+def run_migrations(engine: Engine) -> List[str]:
+    """
+    Agrega las columnas e índices que falten en tablas existentes y borra
+    los índices reemplazados.
+
+    Returns:
+        Lista de cambios aplicados ("tabla.columna" / "tabla:índice" / "-tabla:índice")
+    """
+    applied = []
+    inspector = inspect(engine)
+    tables = set(inspector.get_table_names())
+
+    existing_columns = {}
+    for table_name, column_name in COLUMNS:
+        if table_name not in tables:
+            # create_all la crea completa
+            continue
+        if table_name not in existing_columns:
+            existing_columns[table_name] = {c["name"] for c in inspector.get_columns(table_name)}
+        if column_name in existing_columns[table_name]:
+            continue
+
+        with engine.begin() as conn:
+            conn.execute(text(_add_column_sql(engine, table_name, column_name)))
+        existing_columns[table_name].add(column_name)
+        applied.append(f"{table_name}.{column_name}")
+
+    existing_indexes = {}
+    for table_name, index_name in INDEXES:
+        if table_name not in tables:
+            continue
+        if table_name not in existing_indexes:
+            existing_indexes[table_name] = {i["name"] for i in inspector.get_indexes(table_name)}
+        if index_name in existing_indexes[table_name]:
+            continue
+
+        index = next(i for i in Base.metadata.tables[table_name].indexes if i.name == index_name)
+        index.create(bind=engine)
+        existing_indexes[table_name].add(index_name)
+        applied.append(f"{table_name}:{index_name}")
+
+    for table_name, index_name in DROPPED_INDEXES:
+        if table_name not in tables:
+            continue
+        if table_name not in existing_indexes:
+            existing_indexes[table_name] = {i["name"] for i in inspector.get_indexes(table_name)}
+        if index_name not in existing_indexes[table_name]:
+            continue
+
+        with engine.begin() as conn:
+            conn.execute(text(_drop_index_sql(engine, table_name, index_name)))
+        existing_indexes[table_name].discard(index_name)
+        applied.append(f"-{table_name}:{index_name}")
+
+    return applied
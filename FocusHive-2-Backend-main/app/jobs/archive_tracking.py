@@ -0,0 +1,29 @@
+"""
+Job periódico: archiva las sesiones de seguimiento frías.
+
+Mueve a `tracking_sessions_archive` las sesiones de semanas ISO cerradas y las
+anteriores al último "reiniciar semana" de cada usuario, en lotes acotados.
+
+Uso (por ejemplo, desde un cron semanal):
+    python -m app.jobs.archive_tracking
+"""
+import time
+
+from app.database.connection import SessionLocal
+from app.services.tracking_archive_service import TrackingArchiveService
+
+
+def main():
+    db = SessionLocal()
+    started = time.monotonic()
+    try:
+        result = TrackingArchiveService.archive_cold_sessions(db)
+    finally:
+        db.close()
+
+    total = sum(result.values())
+    print(f"Sesiones archivadas: {total} ({len(result)} usuarios) en {time.monotonic() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+"""
+Job de una sola vez (o periódico): calcula las huellas de contenido de las
+flashcards creadas antes de la detección de duplicados, en lotes acotados.
+
+Uso:
+    python -m app.jobs.backfill_flashcard_fingerprints
+"""
+import time
+
+from app.database.connection import SessionLocal
+from app.services.flashcard_dedupe_service import FlashcardDedupeService
+
+
+def main():
+    db = SessionLocal()
+    started = time.monotonic()
+    try:
+        updated = FlashcardDedupeService.backfill_fingerprints(db)
+    finally:
+        db.close()
+
+    print(f"Huellas calculadas: {updated} tarjetas en {time.monotonic() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
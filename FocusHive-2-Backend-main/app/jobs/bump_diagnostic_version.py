@@ -0,0 +1,27 @@
+"""
+Invalida el cuestionario de diagnóstico en memoria de todos los procesos.
+
+Los cambios hechos con el ORM ya incrementan la versión automáticamente;
+este job es para cuando las preguntas u opciones se editan con SQL directo.
+
+Uso:
+    python -m app.jobs.bump_diagnostic_version
+"""
+from app.database.connection import SessionLocal
+from app.services.diagnostic_catalog_service import DiagnosticCatalogService
+
+
+def main():
+    db = SessionLocal()
+    try:
+        DiagnosticCatalogService.bump_version(db)
+        db.commit()
+        version = DiagnosticCatalogService.get_version(db)
+    finally:
+        db.close()
+
+    print(f"Versión del cuestionario: {version}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+"""
+Job de una sola vez: comprime las secciones largas de las notas Cornell y
+trabajos Feynman guardadas antes de la compresión, y completa su vista previa
+y los términos indexados para la búsqueda (search_text).
+Trabaja en lotes y se puede interrumpir y volver a ejecutar sin problema.
+
+Uso:
+    python -m app.jobs.compress_notes
+"""
+import time
+
+from app.database.connection import SessionLocal
+from app.services.note_compression_service import NoteCompressionService
+
+
+def main():
+    db = SessionLocal()
+    started = time.monotonic()
+    try:
+        result = NoteCompressionService.compress_all(db)
+    finally:
+        db.close()
+
+    for table, rewritten in result.items():
+        print(f"{table}: {rewritten} notas reescritas")
+    print(f"Migración terminada en {time.monotonic() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,22 @@
+"""
+Job de esquema: agrega a una base de datos existente las columnas e índices
+nuevos de tablas que ya existían (create_all no los agrega). Es idempotente;
+la app también lo ejecuta al iniciar.
+
+Uso:
+    python -m app.jobs.migrate
+"""
+from app.database.connection import engine
+from app.database.migrations import run_migrations
+
+
+def main():
+    applied = run_migrations(engine)
+    for change in applied:
+        print(f"Aplicado: {change}")
+    if not applied:
+        print("Esquema al día")
+
+
+if __name__ == "__main__":
+    main()
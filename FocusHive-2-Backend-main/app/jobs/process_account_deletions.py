@@ -0,0 +1,35 @@
+"""
+Job periódico: completa los borrados de cuentas pendientes, fallidos o que
+quedaron a medias (por ejemplo, si el servidor se reinició durante la tarea
+en segundo plano). Cada borrado continúa desde el paso en que quedó.
+
+Uso (por ejemplo, desde un cron cada pocos minutos):
+    python -m app.jobs.process_account_deletions
+"""
+import time
+
+from app.database.connection import SessionLocal
+from app.services.account_deletion_service import AccountDeletionService
+
+
+def main():
+    db = SessionLocal()
+    started = time.monotonic()
+    done = failed = 0
+    try:
+        for user_id in AccountDeletionService.pending_user_ids(db):
+            try:
+                deletion = AccountDeletionService.run(db, user_id)
+                print(f"Usuario {user_id}: {deletion.rows_deleted} filas borradas")
+                done += 1
+            except Exception as e:
+                print(f"Usuario {user_id}: error ({e})")
+                failed += 1
+    finally:
+        db.close()
+
+    print(f"Borrados completados: {done}, con error: {failed} en {time.monotonic() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
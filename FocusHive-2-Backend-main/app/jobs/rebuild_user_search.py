@@ -0,0 +1,27 @@
+"""
+Job de una sola vez (o de reparación): reconstruye el índice de trigramas de
+la búsqueda de usuarios, por ejemplo para los usuarios registrados antes de
+que existiera el índice. Trabaja en lotes y se puede volver a ejecutar.
+
+Uso:
+    python -m app.jobs.rebuild_user_search
+"""
+import time
+
+from app.database.connection import SessionLocal
+from app.services.user_search_service import UserSearchService
+
+
+def main():
+    db = SessionLocal()
+    started = time.monotonic()
+    try:
+        indexed = UserSearchService.rebuild(db)
+    finally:
+        db.close()
+
+    print(f"Usuarios indexados: {indexed} en {time.monotonic() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Job: recalcula `usuario_metodo.es_recomendado` para todos los usuarios a partir
+de sus respuestas guardadas (por ejemplo, después de ajustar los puntos de
+las opciones o de agregar un método).
+
+Reparte los usuarios en rangos de user_id que se procesan en paralelo en
+procesos separados. El avance se guarda por rango: si el job se interrumpe,
+volver a ejecutarlo con el mismo --run-id retoma donde quedó.
+
+Uso:
+    python -m app.jobs.rescore_diagnostics --workers 4
+    python -m app.jobs.rescore_diagnostics --run-id rescore-2024-05 --chunk-size 1000
+"""
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+from app.database.connection import SessionLocal, engine
+from app.services.diagnostic_rescore_service import DiagnosticRescoreService, RESCORE_CHUNK_SIZE
+
+# Rangos por worker: rangos más chicos reparten mejor la carga
+RANGES_PER_WORKER = 4
+
+
+def _init_worker():
+    # Los procesos hijos no deben reutilizar las conexiones heredadas del padre
+    engine.dispose(close=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recalcula las recomendaciones del diagnóstico")
+    parser.add_argument("--run-id", default=f"rescore-{datetime.now():%Y%m%d}", help="Identificador para retomar el job")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--chunk-size", type=int, default=RESCORE_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        ranges = DiagnosticRescoreService.plan_ranges(db, args.run_id, args.workers * RANGES_PER_WORKER)
+    finally:
+        db.close()
+
+    if not ranges:
+        print(f"[{args.run_id}] No hay rangos pendientes")
+        return
+
+    print(f"[{args.run_id}] {len(ranges)} rangos pendientes con {args.workers} workers")
+    engine.dispose()
+
+    started = time.monotonic()
+    users = responses = 0
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker) as pool:
+        futures = [
+            pool.submit(DiagnosticRescoreService.rescore_range, args.run_id, start, end, args.chunk_size)
+            for start, end in ranges
+        ]
+        for future in as_completed(futures):
+            result = future.result()
+            users += result["users"]
+            responses += result["responses"]
+            rate = result["users"] / result["seconds"] if result["seconds"] else 0
+            print(
+                f"  rango {result['range_start']}: {result['users']} usuarios, "
+                f"{result['responses']} respuestas en {result['seconds']:.1f}s ({rate:.0f} usuarios/s)"
+            )
+
+    elapsed = time.monotonic() - started
+    print(
+        f"[{args.run_id}] {users} usuarios / {responses} respuestas en {elapsed:.1f}s "
+        f"({users / elapsed if elapsed else 0:.0f} usuarios/s)"
+    )
+
+    db = SessionLocal()
+    try:
+        summary = DiagnosticRescoreService.get_run_summary(db, args.run_id)
+    finally:
+        db.close()
+    print(
+        f"[{args.run_id}] Rangos terminados: {summary['ranges_finished']}/{summary['ranges']}, "
+        f"usuarios actualizados en total: {summary['users_done']}"
+    )
+
+
+if __name__ == "__main__":
+    main()
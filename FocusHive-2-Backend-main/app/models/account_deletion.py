@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime
+from sqlalchemy.sql import func
+from app.database.connection import Base
+
+
+class AccountDeletion(Base):
+    """Borrado en segundo plano de una cuenta y su avance (paso actual y filas borradas)"""
+    __tablename__ = "account_deletions"
+
+    # Sin ForeignKey: la fila sobrevive al borrado del usuario como registro
+    user_id = Column(Integer, primary_key=True)
+    status = Column(String(20), default="pending", nullable=False)  # pending | running | done | failed
+    step = Column(String(50), nullable=True)  # Tabla que se está borrando
+    rows_deleted = Column(Integer, default=0, nullable=False)
+    error = Column(Text, nullable=True)
+    requested_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    finished_at = Column(DateTime(timezone=True), nullable=True)
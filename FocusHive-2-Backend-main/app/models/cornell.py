@@ -1,6 +1,6 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index
 from sqlalchemy.sql import func
-from app.database.connection import Base
+from app.database.connection import Base, CompressedText
 
 
 class CornellNote(Base):
@@ -10,11 +10,25 @@ class CornellNote(Base):
     user_id = Column(Integer, ForeignKey("usuario.user_id"), nullable=False)
     title = Column(String(255), nullable=False)
     subject = Column(String(100), nullable=True)
-    notes_section = Column(Text, nullable=True)  # Sección derecha (70%)
+    notes_section = Column(CompressedText, nullable=True)  # Sección derecha (70%)
     cues_section = Column(Text, nullable=True)   # Sección izquierda - palabras clave (30%)
-    summary_section = Column(Text, nullable=True) # Sección inferior - resumen
+    summary_section = Column(CompressedText, nullable=True) # Sección inferior - resumen
+    preview = Column(String(200), nullable=True)  # Inicio del resumen o de las notas (para listados)
+    search_text = Column(Text, nullable=True)  # Términos de las secciones comprimidas (para FULLTEXT)
+    revision = Column(Integer, default=0, nullable=False, server_default="0")  # Se incrementa en cada guardado
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    # Secciones de las que se toma la vista previa, en orden de preferencia
+    PREVIEW_FIELDS = ("summary_section", "notes_section")
+
+    # Secciones comprimidas: se indexan a través de search_text
+    SEARCH_FIELDS = ("notes_section", "summary_section")
+
+    __table_args__ = (
+        # Búsqueda de notas (solo MySQL crea el índice como FULLTEXT)
+        Index("ft_cornell_notes_search", "title", "subject", "cues_section", "search_text", mysql_prefix="FULLTEXT"),
+    )
+
     def __repr__(self):
         return f"<CornellNote(note_id={self.note_id}, title='{self.title}')>"
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database.connection import Base
@@ -40,4 +40,41 @@ class DiagnosticResponse(Base):
     # Relationships
     user = relationship("Usuario")
     question = relationship("DiagnosticQuestion", back_populates="responses")
-    option = relationship("DiagnosticOption", back_populates="responses")
\ No newline at end of file
+    option = relationship("DiagnosticOption", back_populates="responses")
+
+class DiagnosticCatalogVersion(Base):
+    """Versión del cuestionario: se incrementa cuando cambian preguntas u opciones"""
+    __tablename__ = "diagnostic_catalog_version"
+    
+    catalog_id = Column(Integer, primary_key=True, default=1)
+    version = Column(Integer, default=1, nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class DiagnosticRescoreProgress(Base):
+    """Avance del job de recálculo de recomendaciones, por rango de usuarios"""
+    __tablename__ = "diagnostic_rescore_progress"
+    
+    run_id = Column(String(64), primary_key=True)
+    range_start = Column(Integer, primary_key=True)
+    range_end = Column(Integer, nullable=False)  # Excluido
+    last_user_id = Column(Integer, nullable=True)  # Último usuario ya actualizado del rango
+    users_done = Column(Integer, default=0, nullable=False)
+    finished = Column(Boolean, default=False, nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class DiagnosticSubmission(Base):
+    """Envíos del diagnóstico con clave de idempotencia (para no repetir un doble envío)"""
+    __tablename__ = "diagnostic_submissions"
+    
+    submission_id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(Integer, ForeignKey("usuario.user_id"), nullable=False)
+    idempotency_key = Column(String(64), nullable=False)
+    request_hash = Column(String(40), nullable=False)  # Huella de las respuestas enviadas
+    result = Column(Text, nullable=False)  # Resultado en JSON para responder los reintentos
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    __table_args__ = (
+        Index("ux_diagnostic_submissions_user_key", "user_id", "idempotency_key", unique=True),
+    )
@@ -1,7 +1,7 @@
-from sqlalchemy import Column, Integer, String, Boolean, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
-from app.database.connection import Base
+from app.database.connection import Base, CompressedText
 
 
 class FeynmanWork(Base):
@@ -10,12 +10,26 @@ class FeynmanWork(Base):
     feynman_id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     user_id = Column(Integer, ForeignKey("usuario.user_id"), nullable=False)
     topic = Column(String(255), nullable=False)
-    explanation = Column(Text, nullable=True)
-    gaps_identified = Column(Text, nullable=True)
-    final_version = Column(Text, nullable=True)
+    explanation = Column(CompressedText, nullable=True)
+    gaps_identified = Column(CompressedText, nullable=True)
+    final_version = Column(CompressedText, nullable=True)
+    preview = Column(String(200), nullable=True)  # Inicio de la versión final o de la explicación (para listados)
+    search_text = Column(Text, nullable=True)  # Términos de las secciones comprimidas (para FULLTEXT)
     is_completed = Column(Boolean, default=False)
+    revision = Column(Integer, default=0, nullable=False, server_default="0")  # Se incrementa en cada guardado
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    # Secciones de las que se toma la vista previa, en orden de preferencia
+    PREVIEW_FIELDS = ("final_version", "explanation")
+
+    # Secciones comprimidas: se indexan a través de search_text
+    SEARCH_FIELDS = ("explanation", "gaps_identified", "final_version")
+
+    __table_args__ = (
+        # Búsqueda de notas (solo MySQL crea el índice como FULLTEXT)
+        Index("ft_feynman_work_search", "topic", "search_text", mysql_prefix="FULLTEXT"),
+    )
+
     def __repr__(self):
         return f"<FeynmanWork(feynman_id={self.feynman_id}, topic='{self.topic}')>"
\ No newline at end of file
@@ -0,0 +1,30 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
+from sqlalchemy.sql import func
+from app.database.connection import Base, CompressedText
+
+
+class FeynmanRevision(Base):
+    """
+    Historial de un trabajo Feynman: una fila por revisión reemplazada.
+
+    Cada fila guarda un diff inverso (de la revisión siguiente a esta) o,
+    cada N revisiones, una copia completa para acotar la reconstrucción.
+    """
+    __tablename__ = "feynman_revisions"
+
+    revision_id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    feynman_id = Column(Integer, ForeignKey("feynman_work.feynman_id", ondelete="CASCADE"), nullable=False)
+    user_id = Column(Integer, ForeignKey("usuario.user_id"), nullable=False)
+    revision = Column(Integer, nullable=False)  # Revisión cuyo estado se puede reconstruir con esta fila
+    kind = Column(String(10), nullable=False)  # 'snapshot' | 'delta'
+    changed_fields = Column(String(100), nullable=True)  # Campos que cambiaron al pasar a la siguiente revisión
+    data_size = Column(Integer, default=0, nullable=False)  # Tamaño del contenido en caracteres
+    data = Column(CompressedText, nullable=False)  # JSON: copia completa o diff inverso
+    created_at = Column(DateTime(timezone=True), server_default=func.now())  # Momento en que se reemplazó
+
+    __table_args__ = (
+        Index("ux_feynman_revisions_work_revision", "feynman_id", "revision", unique=True),
+    )
+
+    def __repr__(self):
+        return f"<FeynmanRevision(feynman_id={self.feynman_id}, revision={self.revision}, kind='{self.kind}')>"
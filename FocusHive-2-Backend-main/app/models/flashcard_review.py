@@ -0,0 +1,24 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
+from sqlalchemy.sql import func
+from app.database.connection import Base
+
+
+class FlashcardReview(Base):
+    """Registro de solo-inserción: un evento por tarjeta repasada"""
+    __tablename__ = "flashcard_reviews"
+
+    review_id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    user_id = Column(Integer, ForeignKey("usuario.user_id"), nullable=False)
+    card_id = Column(Integer, ForeignKey("flashcards.card_id", ondelete="CASCADE"), nullable=False)
+    session_id = Column(Integer, ForeignKey("flashcard_study_sessions.session_id", ondelete="SET NULL"), nullable=True)
+    grade = Column(String(10), nullable=False)  # 'hard' | 'medium' | 'easy'
+    response_ms = Column(Integer, nullable=True)
+    reviewed_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_flashcard_reviews_user_card", "user_id", "card_id"),
+        Index("ix_flashcard_reviews_session", "session_id"),
+    )
+
+    def __repr__(self):
+        return f"<FlashcardReview(review_id={self.review_id}, card_id={self.card_id}, grade='{self.grade}')>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index
 from sqlalchemy.sql import func
 from app.database.connection import Base
 
@@ -17,5 +17,8 @@ class FlashcardStudySession(Base):
     notes = Column(Text, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    # Historial y estadísticas por usuario se consultan siempre por rango de fechas
+    __table_args__ = (Index("ix_flashcard_sessions_user_created", "user_id", "created_at"),)
+
     def __repr__(self):
         return f"<FlashcardStudySession(session_id={self.session_id}, cards_studied={self.cards_studied})>"
\ No newline at end of file
@@ -0,0 +1,24 @@
+from sqlalchemy import Column, Integer, Date, ForeignKey
+from app.database.connection import Base
+
+
+class FlashcardSessionRollup(Base):
+    """Totales diarios de sesiones de flashcards para días ya cerrados (no cambian)"""
+    __tablename__ = "flashcard_session_rollups"
+
+    user_id = Column(Integer, ForeignKey("usuario.user_id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    sessions = Column(Integer, default=0, nullable=False)
+    cards_studied = Column(Integer, default=0, nullable=False)
+    cards_easy = Column(Integer, default=0, nullable=False)
+    cards_medium = Column(Integer, default=0, nullable=False)
+    cards_hard = Column(Integer, default=0, nullable=False)
+    duration_minutes = Column(Integer, default=0, nullable=False)
+
+
+class FlashcardRollupState(Base):
+    """Último día cerrado ya consolidado en flashcard_session_rollups por usuario"""
+    __tablename__ = "flashcard_rollup_state"
+
+    user_id = Column(Integer, ForeignKey("usuario.user_id"), primary_key=True)
+    rolled_up_until = Column(Date, nullable=False)
@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, ForeignKey, Index
+from sqlalchemy.sql import func
+from app.database.connection import Base
+
+
+class FlashcardSyncState(Base):
+    """Contador de cambios por usuario para la sincronización incremental de flashcards"""
+    __tablename__ = "flashcard_sync_state"
+
+    user_id = Column(Integer, ForeignKey("usuario.user_id"), primary_key=True)
+    last_seq = Column(BigInteger, default=0, nullable=False)
+
+
+class FlashcardTombstone(Base):
+    """Marca de borrado de una colección o tarjeta, para informar a los clientes sincronizados"""
+    __tablename__ = "flashcard_tombstones"
+
+    tombstone_id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(Integer, ForeignKey("usuario.user_id"), nullable=False)
+    entity_type = Column(String(10), nullable=False)  # 'collection' | 'card'
+    entity_id = Column(Integer, nullable=False)
+    sync_seq = Column(BigInteger, nullable=False)
+    deleted_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (Index("ix_flashcard_tombstones_user_seq", "user_id", "sync_seq"),)
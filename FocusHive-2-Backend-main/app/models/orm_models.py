@@ -1,6 +1,7 @@
 from sqlalchemy import (
-    Boolean, Column, Integer, String, ForeignKey, DATETIME, TEXT, func, UniqueConstraint
+    Boolean, Column, Integer, BigInteger, Float, String, ForeignKey, DATETIME, TEXT, func, UniqueConstraint, Index
 )
+from datetime import datetime
 from sqlalchemy.orm import relationship
 from app.database.connection import Base, ColorString 
 
@@ -29,6 +30,9 @@ class CardCollection(Base):
     is_active = Column(Boolean, default=True, nullable=False)
     collection_name = Column(String(50), nullable=False)
     collection_color = Column(ColorString, nullable=False)
+    sync_seq = Column(BigInteger, default=0, nullable=False, server_default="0")  # Último cambio (sincronización incremental)
+
+    __table_args__ = (Index("ix_card_collections_user_seq", "user_id", "sync_seq"),)
 
     # Relaciones
     user = relationship("Usuario", back_populates="card_collections")  # ✅ NUEVO
@@ -48,6 +52,38 @@ class Flashcard(Base):
     collection = Column(Integer, ForeignKey("card_collections.collection_id"), nullable=False)
     flashcard_color = Column(String(45), nullable=True)
 
+    # Estado de repaso espaciado (SM-2)
+    interval_days = Column(Integer, default=0, nullable=False, server_default="0")
+    ease_factor = Column(Float, default=2.5, nullable=False, server_default="2.5")
+    repetitions = Column(Integer, default=0, nullable=False, server_default="0")
+    lapses = Column(Integer, default=0, nullable=False, server_default="0")
+    due_at = Column(DATETIME, default=datetime.now, nullable=True)  # NULL = nunca programada (vence ya)
+    last_reviewed_at = Column(DATETIME, nullable=True)
+
+    sync_seq = Column(BigInteger, default=0, nullable=False, server_default="0")  # Último cambio (sincronización incremental)
+
+    # Huellas de contenido para detectar duplicados (ver app/utils/flashcard_utils.py)
+    content_hash = Column(String(40), nullable=True)
+    simhash = Column(BigInteger, nullable=True)
+    lsh_band0 = Column(Integer, nullable=True)
+    lsh_band1 = Column(Integer, nullable=True)
+    lsh_band2 = Column(Integer, nullable=True)
+    lsh_band3 = Column(Integer, nullable=True)
+
+    __table_args__ = (
+        # Cola de repaso: siguientes tarjetas vencidas de un usuario
+        Index("ix_flashcards_user_due", "card_user", "due_at"),
+        Index("ix_flashcards_user_seq", "card_user", "sync_seq"),
+        # Búsqueda de texto (solo MySQL crea el índice como FULLTEXT)
+        Index("ft_flashcards_question_answer", "question", "answer", mysql_prefix="FULLTEXT"),
+        # Búsqueda de duplicados por usuario: hash exacto y cubetas LSH de la firma SimHash
+        Index("ix_flashcards_user_hash", "card_user", "content_hash"),
+        Index("ix_flashcards_user_band0", "card_user", "lsh_band0"),
+        Index("ix_flashcards_user_band1", "card_user", "lsh_band1"),
+        Index("ix_flashcards_user_band2", "card_user", "lsh_band2"),
+        Index("ix_flashcards_user_band3", "card_user", "lsh_band3"),
+    )
+
     collection_owner = relationship("CardCollection", back_populates="flashcards")
     user = relationship("Usuario", back_populates="flashcards")
 
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr
-from typing import Optional, List
+from typing import Optional, List, Literal
 from datetime import datetime
 
 # =========================================================
@@ -30,6 +30,24 @@ class SessionOut(SessionBase):
     class Config:
         from_attributes = True
 
+# Sesiones en curso (estado en memoria hasta finalizar)
+class LiveSessionStart(BaseModel):
+    metodo_id: int
+    descripcion: Optional[str] = None
+
+class LiveSessionFinish(BaseModel):
+    fue_completada: bool = True
+
+class LiveSessionState(BaseModel):
+    live_id: str
+    session_id: Optional[int] = None  # Fila de sesion_estudio si ya hubo un checkpoint
+    metodo_id: int
+    descripcion: Optional[str] = None
+    started_at: datetime
+    paused: bool
+    active_seconds: int
+    checkpointed_at: Optional[datetime] = None
+
 
 # --- Schemas para Flashcards ---
 class FlashcardBase(BaseModel):
@@ -52,6 +70,50 @@ class FlashcardOut(FlashcardBase):
         from_attributes = True
 
 
+class FlashcardCreatedOut(FlashcardOut):
+    # card_id de una tarjeta existente con el mismo contenido (o casi), si la hay
+    duplicate_of: Optional[int] = None
+
+class FlashcardScheduleOut(FlashcardOut):
+    interval_days: int
+    ease_factor: float
+    repetitions: int
+    lapses: int
+    due_at: Optional[datetime] = None
+    last_reviewed_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class FlashcardSearchHit(FlashcardOut):
+    score: float
+
+class FlashcardReviewIn(BaseModel):
+    grade: Literal['hard', 'medium', 'easy']
+
+
+class FlashcardImportLineError(BaseModel):
+    line: int
+    detail: str
+
+class FlashcardImportResult(BaseModel):
+    collection_id: int
+    inserted: int
+    failed: int
+    skipped_duplicates: int = 0
+    errors: List[FlashcardImportLineError] = []  # Solo los primeros errores; `failed` tiene el total
+
+class FlashcardDuplicateGroup(BaseModel):
+    kept_card_id: int
+    duplicate_card_ids: List[int]
+
+class FlashcardDedupeResult(BaseModel):
+    collection_id: int
+    dry_run: bool
+    duplicates: int
+    groups: List[FlashcardDuplicateGroup] = []
+
+
 # --- Schemas para Colecciones (MODIFICADO: agregado user_id) ---
 class CollectionBase(BaseModel):
     collection_name: str
@@ -75,6 +137,57 @@ class CollectionOutWithCards(CollectionOut):
     class Config:
         from_attributes = True
 
+class CollectionCardsPage(CollectionOutWithCards):
+    # card_id a enviar como `after` para pedir la siguiente página (None = última página)
+    next_after: Optional[int] = None
+
+class FlashcardDigestOut(BaseModel):
+    card_id: int
+    hash: str
+
+class CollectionDigestPage(CollectionOut):
+    cards: List[FlashcardDigestOut] = []
+    next_after: Optional[int] = None
+
+
+class FlashcardSyncOut(BaseModel):
+    seq: int  # Enviar como `since` en la próxima sincronización
+    collections: List[CollectionOut] = []
+    cards: List[FlashcardOut] = []
+    deleted_collections: List[int] = []  # Al borrar una colección también se informan sus tarjetas
+    deleted_cards: List[int] = []
+
+
+class CollectionWithCountOut(CollectionOut):
+    card_count: int = 0
+
+
+class FlashcardSessionTotals(BaseModel):
+    sessions: int = 0
+    cards_studied: int = 0
+    cards_easy: int = 0
+    cards_medium: int = 0
+    cards_hard: int = 0
+    minutes: int = 0
+    # Porcentaje (0-100) sobre las tarjetas calificadas (fácil + media + difícil)
+    easy_pct: float = 0.0
+    medium_pct: float = 0.0
+    hard_pct: float = 0.0
+
+
+class FlashcardCollectionStats(FlashcardSessionTotals):
+    collection_id: int
+    collection_name: str
+    card_count: int = 0
+
+
+class FlashcardStatsOut(BaseModel):
+    user_id: int
+    total_collections: int
+    total_cards: int
+    sessions: FlashcardSessionTotals
+    collections: List[FlashcardCollectionStats] = []
+
 
 # --- Schemas para Comunidad (Posts y Likes) ---
 class LikeBase(BaseModel):
@@ -0,0 +1,27 @@
+from sqlalchemy import Column, Integer, String, Float, Text, DateTime, ForeignKey, Index
+from sqlalchemy.sql import func
+from app.database.connection import Base
+
+class TrackingSessionArchive(Base):
+    """Sesiones de seguimiento de semanas cerradas (o anteriores a un reinicio)"""
+    __tablename__ = "tracking_sessions_archive"
+    
+    session_id = Column(Integer, primary_key=True, autoincrement=False)  # Mismo ID que en tracking_sessions
+    user_id = Column(Integer, ForeignKey("usuario.user_id"), nullable=False)
+    
+    # Semana ISO a la que pertenece la sesión
+    iso_year = Column(Integer, nullable=False)
+    iso_week = Column(Integer, nullable=False)
+    
+    day_of_week = Column(String(20), nullable=False)
+    hours = Column(Float, nullable=False)
+    method = Column(String(50), nullable=False)
+    description = Column(Text, nullable=True)
+    
+    created_at = Column(DateTime, nullable=True)
+    archived_at = Column(DateTime, server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_tracking_archive_user_week", "user_id", "iso_year", "iso_week"),
+        Index("ix_tracking_archive_user_created", "user_id", "created_at"),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, Text, DateTime, ForeignKey, Index
 from sqlalchemy.sql import func
 from app.database.connection import Base
 
@@ -13,4 +13,7 @@ class TrackingSession(Base):
     method = Column(String(50), nullable=False)
     description = Column(Text, nullable=True)
     
-    created_at = Column(DateTime, server_default=func.now())
\ No newline at end of file
+    created_at = Column(DateTime, server_default=func.now())
+
+    # Las consultas "calientes" siempre filtran por usuario y rango de fechas
+    __table_args__ = (Index("ix_tracking_sessions_user_created", "user_id", "created_at"),)
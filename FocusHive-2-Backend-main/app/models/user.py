@@ -21,6 +21,8 @@ class Usuario(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     diagnostic_completed = Column(Boolean, default=False)
+    # False desde que se pide borrar la cuenta hasta que termina el borrado
+    is_active = Column(Boolean, default=True, nullable=False, server_default="1")
 
     # Relaciones inversas
     flashcards = relationship("Flashcard", back_populates="user")
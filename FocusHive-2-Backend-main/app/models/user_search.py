@@ -0,0 +1,11 @@
+from sqlalchemy import Column, Integer, String, ForeignKey
+from app.database.connection import Base
+
+
+class UserSearchGram(Base):
+    """Índice de trigramas de username y full_name para la búsqueda de usuarios"""
+    __tablename__ = "user_search_grams"
+
+    # La clave (gram, user_id) sirve de índice para buscar por trigrama
+    gram = Column(String(3), primary_key=True)
+    user_id = Column(Integer, ForeignKey("usuario.user_id", ondelete="CASCADE"), primary_key=True, index=True)
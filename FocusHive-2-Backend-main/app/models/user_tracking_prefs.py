@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Float, Text, ForeignKey
+from sqlalchemy import Column, Integer, Float, Text, DateTime, ForeignKey
 from app.database.connection import Base
 
 class UserTrackingPrefs(Base):
@@ -6,4 +6,6 @@ class UserTrackingPrefs(Base):
     
     user_id = Column(Integer, ForeignKey("usuario.user_id"), primary_key=True)
     weekly_goal = Column(Float, default=20.0)
-    achievements = Column(Text, default="[]")  # JSON string: ["first_session", "week_goal"]
\ No newline at end of file
+    achievements = Column(Text, default="[]")  # JSON string: ["first_session", "week_goal"]
+    # Marca del último "reiniciar semana": las sesiones anteriores quedan ocultas y se archivan
+    week_reset_at = Column(DateTime, nullable=True)
@@ -54,6 +54,14 @@ class TokenResponse(BaseModel):
     token_type:str="bearer"
     user:UserResponse
 
+class AvailabilityResult(BaseModel):
+    value:str
+    available:bool
+
+class AvailabilityResponse(BaseModel):
+    username:Optional[AvailabilityResult]=None
+    email:Optional[AvailabilityResult]=None
+
 class TokenData(BaseModel):
     user_id: Optional[int]=None
     username: Optional[int]=None
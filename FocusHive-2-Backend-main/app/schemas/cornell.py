@@ -1,6 +1,7 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Optional, Dict, List, Literal
 from datetime import datetime
+from app.schemas.note_delta import TextDeltaOp
 
 
 # Schema para crear una nueva nota Cornell
@@ -21,6 +22,15 @@ class CornellUpdate(BaseModel):
     summary_section: Optional[str] = None
 
 
+
+# Schema para el autoguardado incremental (PATCH): cambios por sección
+class CornellAutosave(BaseModel):
+    base_revision: int = Field(..., ge=0, description="Revisión sobre la que se calcularon los cambios")
+    changes: Dict[
+        Literal['title', 'subject', 'notes_section', 'cues_section', 'summary_section'],
+        List[TextDeltaOp]
+    ] = Field(..., min_length=1)
+
 # Schema de respuesta (lo que devuelve la API)
 class CornellResponse(BaseModel):
     note_id: int
@@ -30,8 +40,22 @@ class CornellResponse(BaseModel):
     notes_section: Optional[str] = None
     cues_section: Optional[str] = None
     summary_section: Optional[str] = None
+    revision: int = 0
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+# Schema resumido para listados (sin el texto completo de las secciones)
+class CornellSummary(BaseModel):
+    note_id: int
+    user_id: int
+    title: str
+    subject: Optional[str] = None
+    preview: Optional[str] = None  # Inicio del resumen (o de las notas si no hay resumen)
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
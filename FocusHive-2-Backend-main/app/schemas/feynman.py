@@ -1,6 +1,7 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Optional, Dict, List, Literal
 from datetime import datetime
+from app.schemas.note_delta import TextDeltaOp
 
 
 # Schema para crear un nuevo trabajo Feynman
@@ -20,6 +21,15 @@ class FeynmanUpdate(BaseModel):
     is_completed: Optional[bool] = None
 
 
+
+# Schema para el autoguardado incremental (PATCH): cambios por sección
+class FeynmanAutosave(BaseModel):
+    base_revision: int = Field(..., ge=0, description="Revisión sobre la que se calcularon los cambios")
+    changes: Dict[
+        Literal['topic', 'explanation', 'gaps_identified', 'final_version'],
+        List[TextDeltaOp]
+    ] = Field(..., min_length=1)
+
 # Schema de respuesta (lo que devuelve la API)
 class FeynmanResponse(BaseModel):
     feynman_id: int
@@ -29,6 +39,7 @@ class FeynmanResponse(BaseModel):
     gaps_identified: Optional[str] = None
     final_version: Optional[str] = None
     is_completed: bool
+    revision: int = 0
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
 
@@ -36,6 +47,45 @@ class FeynmanResponse(BaseModel):
         from_attributes = True  # Permite convertir desde ORM
 
 
+# Schema resumido para listados (sin el texto completo de la explicación)
+class FeynmanSummary(BaseModel):
+    feynman_id: int
+    user_id: int
+    topic: str
+    is_completed: bool
+    preview: Optional[str] = None  # Inicio de la versión final (o de la explicación)
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+
+# Entrada del historial de revisiones (sin el contenido)
+class FeynmanRevisionSummary(BaseModel):
+    revision: int
+    kind: Literal['snapshot', 'delta']
+    changed_fields: List[str] = []  # Campos modificados al pasar a la revisión siguiente
+    data_size: int
+    replaced_at: Optional[datetime] = None
+
+
+class FeynmanRevisionPage(BaseModel):
+    revisions: List[FeynmanRevisionSummary] = []
+    next_before: Optional[int] = None  # Enviar como `before` para la siguiente página
+
+
+# Contenido de un trabajo Feynman en una revisión pasada
+class FeynmanRevisionOut(BaseModel):
+    feynman_id: int
+    revision: int
+    topic: str
+    explanation: Optional[str] = None
+    gaps_identified: Optional[str] = None
+    final_version: Optional[str] = None
+    is_completed: bool
+
 # Schema para lista de trabajos
 class FeynmanList(BaseModel):
     works: list[FeynmanResponse]
@@ -1,6 +1,6 @@
-from pydantic import BaseModel, Field
-from typing import Optional
-from datetime import datetime
+from pydantic import BaseModel, Field, validator
+from typing import Optional, List, Literal
+from datetime import datetime, date
 
 
 # Schema para crear una nueva sesión de estudio
@@ -14,6 +14,42 @@ class FlashcardSessionCreate(BaseModel):
     notes: Optional[str] = Field(None, description="Notas de la sesión")
 
 
+# Evento de repaso de una tarjeta
+class FlashcardReviewEvent(BaseModel):
+    card_id: int = Field(..., gt=0, description="ID de la tarjeta repasada")
+    grade: Literal['hard', 'medium', 'easy'] = Field(..., description="Dificultad marcada por el usuario")
+    response_ms: Optional[int] = Field(None, ge=0, description="Tiempo de respuesta en milisegundos")
+    reviewed_at: Optional[datetime] = Field(None, description="Momento del repaso")
+
+    @validator('reviewed_at')
+    def to_local_naive(cls, v):
+        # El servidor trabaja con hora local sin zona (datetime.now()): las fechas
+        # con zona se convierten para poder ordenarlas y compararlas con las demás
+        if v is not None and v.tzinfo is not None:
+            return v.astimezone().replace(tzinfo=None)
+        return v
+
+
+# Schema para registrar una sesión completa con sus repasos en una sola petición
+class FlashcardReviewBatchCreate(BaseModel):
+    collection_id: Optional[int] = Field(None, description="ID de la colección estudiada")
+    duration_minutes: int = Field(0, ge=0, description="Duración en minutos")
+    notes: Optional[str] = Field(None, description="Notas de la sesión")
+    reviews: List[FlashcardReviewEvent] = Field(..., min_length=1, max_length=2000)
+
+
+class FlashcardReviewResponse(BaseModel):
+    review_id: int
+    card_id: int
+    session_id: Optional[int] = None
+    grade: str
+    response_ms: Optional[int] = None
+    reviewed_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
 # Schema de respuesta (lo que devuelve la API)
 class FlashcardSessionResponse(BaseModel):
     session_id: int
@@ -28,4 +64,19 @@ class FlashcardSessionResponse(BaseModel):
     created_at: Optional[datetime] = None
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+# Totales de un periodo (día o semana) en las estadísticas de sesiones
+class FlashcardStatsPeriod(BaseModel):
+    period_start: date
+    sessions: int = 0
+    cards_studied: int = 0
+    cards_easy: int = 0
+    cards_medium: int = 0
+    cards_hard: int = 0
+    duration_minutes: int = 0
+
+
+class FlashcardSessionStatsResponse(BaseModel):
+    granularity: Literal['day', 'week']
+    periods: List[FlashcardStatsPeriod] = []
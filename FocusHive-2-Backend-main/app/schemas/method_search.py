@@ -0,0 +1,14 @@
+from pydantic import BaseModel
+from typing import Optional, Literal
+from datetime import datetime
+
+
+# Resultado de la búsqueda unificada de notas (Cornell y Feynman)
+class NoteSearchHit(BaseModel):
+    type: Literal['cornell', 'feynman']
+    id: int  # note_id o feynman_id según el tipo
+    title: str
+    score: float
+    field: Optional[str] = None  # Campo del que se extrajo el fragmento
+    snippet: Optional[str] = None  # Fragmento con los términos marcados con <mark>
+    updated_at: Optional[datetime] = None
@@ -0,0 +1,18 @@
+from pydantic import BaseModel, Field
+from typing import Optional, Literal
+from datetime import datetime
+
+
+# Operación de edición sobre el texto de una sección
+class TextDeltaOp(BaseModel):
+    op: Literal['insert', 'delete']
+    pos: int = Field(..., ge=0, description="Posición en unidades UTF-16, como String.length en JavaScript (tras aplicar las operaciones anteriores)")
+    text: Optional[str] = Field(None, description="Texto a insertar (solo 'insert')")
+    count: Optional[int] = Field(None, ge=1, description="Unidades UTF-16 a borrar (solo 'delete')")
+
+
+# Respuesta del autoguardado: solo la nueva revisión, no el documento
+class NoteAutosaveResponse(BaseModel):
+    revision: int
+    updated_fields: list[str]
+    updated_at: Optional[datetime] = None
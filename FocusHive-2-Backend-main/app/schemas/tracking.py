@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field
 from typing import Optional, List, Dict
-from datetime import datetime
+from datetime import datetime, date
 
 class TrackingSessionCreate(BaseModel):
     day_of_week: str = Field(..., min_length=1, max_length=20)
@@ -27,6 +27,22 @@ class WeeklyStatsResponse(BaseModel):
     method_stats: Dict[str, dict]
     most_used_method: Optional[str]
 
+class TrackingBulkRowError(BaseModel):
+    row: int
+    detail: str
+
+class TrackingBulkImportResponse(BaseModel):
+    inserted: int
+    failed: int
+    errors: List[TrackingBulkRowError]
+
+class TrackingWeekSummary(BaseModel):
+    iso_year: int
+    iso_week: int
+    week_start: date
+    total_hours: float
+    sessions_count: int
+
 class UserPrefsUpdate(BaseModel):
     weekly_goal: Optional[float] = Field(None, gt=0, le=168)
 
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr, Field, validator
-from typing import Optional
+from typing import Optional, List, Dict
 from datetime import datetime
 import re
 
@@ -81,6 +81,34 @@ class UserSummaryResponse(BaseModel):
     class Config:
         from_attributes = True
 
+# Página de resultados de búsqueda (paginación por cursor)
+class UserSearchPage(BaseModel):
+    users: List[UserSummaryResponse]
+    next_cursor: Optional[str] = None  # Pasar como ?cursor= para la siguiente página
+
+# Estadísticas del perfil (/users/me/stats)
+class UserStatsResponse(BaseModel):
+    user_id: int
+    username: str
+    level: int
+    total_studied_time: int
+    is_premium: bool
+    member_since: Optional[str]
+    study_sessions: int
+    completed_sessions: int
+    study_minutes: int
+    minutes_by_method: Dict[str, int]  # nombre del método -> minutos
+    flashcards: int
+    collections: int
+    flashcard_sessions: int
+    cards_studied: int
+    cornell_notes: int
+    feynman_works: int
+    feynman_completed: int
+    tracking_sessions: int
+    tracking_hours: float
+    achievements: int
+
 # Schema para confirmar acciones
 class UserActionResponse(BaseModel):
     message: str
@@ -0,0 +1,207 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import select, delete, update, or_
+from fastapi import HTTPException, status
+from typing import Dict, List, Optional
+from datetime import datetime, timedelta
+
+from app.database.connection import SessionLocal
+from app.models.account_deletion import AccountDeletion
+from app.models.user import Usuario
+from app.models.orm_models import Post, Like, CardCollection, Flashcard
+from app.models.flashcard_review import FlashcardReview
+from app.models.flashcard_session import FlashcardStudySession
+from app.models.flashcard_session_rollup import FlashcardSessionRollup, FlashcardRollupState
+from app.models.flashcard_sync import FlashcardSyncState, FlashcardTombstone
+from app.models.cornell import CornellNote
+from app.models.feynman import FeynmanWork
+from app.models.feynman_revision import FeynmanRevision
+from app.models.diagnostic import DiagnosticResponse, DiagnosticSubmission
+from app.models.user_method import UsuarioMetodo
+from app.models.study_session import SesionEstudio
+from app.models.tracking_session import TrackingSession
+from app.models.tracking_archive import TrackingSessionArchive
+from app.models.user_tracking_prefs import UserTrackingPrefs
+from app.models.user_search import UserSearchGram
+from app.services.user_search_service import UserSearchService
+
+# Filas borradas por transacción (evita bloqueos largos)
+DELETE_BATCH_SIZE = 1000
+
+# Un borrado "running" sin avance en este tiempo se considera abandonado
+STALE_AFTER = timedelta(minutes=15)
+
+
+class AccountDeletionService:
+    """
+    Borrado de cuentas en dos fases: la petición solo desactiva la cuenta y
+    registra el borrado; después se borran las tablas dependientes una a una,
+    en lotes con commit, guardando el avance para poder retomarlo.
+    """
+
+    @staticmethod
+    def _steps(user_id: int) -> List[tuple]:
+        """
+        Pasos en orden (hijos antes que padres):
+        (nombre, modelo, columna clave para el lote, condición, valores)
+        Con `valores` el paso es un UPDATE (desvincula filas de otros usuarios).
+        """
+        user_posts = select(Post.post_id).where(Post.user_id == user_id)
+        user_collections = select(CardCollection.collection_id).where(CardCollection.user_id == user_id)
+        user_cards = select(Flashcard.card_id).where(
+            or_(Flashcard.card_user == user_id, Flashcard.collection.in_(user_collections))
+        )
+        user_works = select(FeynmanWork.feynman_id).where(FeynmanWork.user_id == user_id)
+
+        return [
+            ("likes", Like, Like.like_id, or_(Like.user_id == user_id, Like.post_id.in_(user_posts)), None),
+            ("posts", Post, Post.post_id, Post.user_id == user_id, None),
+            ("flashcard_reviews", FlashcardReview, FlashcardReview.review_id,
+             or_(FlashcardReview.user_id == user_id, FlashcardReview.card_id.in_(user_cards)), None),
+            ("flashcard_tombstones", FlashcardTombstone, FlashcardTombstone.tombstone_id,
+             FlashcardTombstone.user_id == user_id, None),
+            ("flashcard_sync_state", FlashcardSyncState, FlashcardSyncState.user_id,
+             FlashcardSyncState.user_id == user_id, None),
+            ("flashcard_session_rollups", FlashcardSessionRollup, FlashcardSessionRollup.day,
+             FlashcardSessionRollup.user_id == user_id, None),
+            ("flashcard_rollup_state", FlashcardRollupState, FlashcardRollupState.user_id,
+             FlashcardRollupState.user_id == user_id, None),
+            ("flashcard_study_sessions", FlashcardStudySession, FlashcardStudySession.session_id,
+             FlashcardStudySession.user_id == user_id, None),
+            ("flashcard_study_sessions_shared", FlashcardStudySession, FlashcardStudySession.session_id,
+             FlashcardStudySession.collection_id.in_(user_collections), {"collection_id": None}),
+            ("flashcards", Flashcard, Flashcard.card_id,
+             or_(Flashcard.card_user == user_id, Flashcard.collection.in_(user_collections)), None),
+            ("card_collections", CardCollection, CardCollection.collection_id,
+             CardCollection.user_id == user_id, None),
+            ("feynman_revisions", FeynmanRevision, FeynmanRevision.revision_id,
+             or_(FeynmanRevision.user_id == user_id, FeynmanRevision.feynman_id.in_(user_works)), None),
+            ("feynman_work", FeynmanWork, FeynmanWork.feynman_id, FeynmanWork.user_id == user_id, None),
+            ("cornell_notes", CornellNote, CornellNote.note_id, CornellNote.user_id == user_id, None),
+            ("diagnostic_submissions", DiagnosticSubmission, DiagnosticSubmission.submission_id,
+             DiagnosticSubmission.user_id == user_id, None),
+            ("diagnostic_responses", DiagnosticResponse, DiagnosticResponse.response_id,
+             DiagnosticResponse.user_id == user_id, None),
+            ("usuario_metodo", UsuarioMetodo, UsuarioMetodo.metodo_id, UsuarioMetodo.user_id == user_id, None),
+            ("sesion_estudio", SesionEstudio, SesionEstudio.session_id, SesionEstudio.user_id == user_id, None),
+            ("tracking_sessions", TrackingSession, TrackingSession.session_id,
+             TrackingSession.user_id == user_id, None),
+            ("tracking_sessions_archive", TrackingSessionArchive, TrackingSessionArchive.session_id,
+             TrackingSessionArchive.user_id == user_id, None),
+            ("user_tracking_prefs", UserTrackingPrefs, UserTrackingPrefs.user_id,
+             UserTrackingPrefs.user_id == user_id, None),
+            ("user_search_grams", UserSearchGram, UserSearchGram.gram, UserSearchGram.user_id == user_id, None),
+            ("usuario", Usuario, Usuario.user_id, Usuario.user_id == user_id, None),
+        ]
+
+    @staticmethod
+    def request_deletion(db: Session, user_id: int) -> AccountDeletion:
+        """
+        Desactiva la cuenta y registra el borrado pendiente (respuesta inmediata).
+
+        Raises:
+            HTTPException: Si el usuario no existe o ya tiene un borrado en curso
+        """
+        user = db.query(Usuario).filter(Usuario.user_id == user_id).first()
+        if not user or not user.is_active:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Usuario con ID {user_id} no encontrado"
+            )
+
+        try:
+            user.is_active = False
+            # Deja de aparecer en búsquedas desde ya
+            UserSearchService.remove_user(db, user_id)
+
+            deletion = db.query(AccountDeletion).filter(AccountDeletion.user_id == user_id).first()
+            if deletion:
+                deletion.status, deletion.step, deletion.error = "pending", None, None
+            else:
+                deletion = AccountDeletion(user_id=user_id, status="pending", rows_deleted=0)
+                db.add(deletion)
+
+            db.commit()
+            return deletion
+        except Exception as e:
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Error al eliminar el usuario: {str(e)}"
+            )
+
+    @staticmethod
+    def _delete_batch(db: Session, model, key, condition, values: Optional[Dict], batch_size: int) -> int:
+        """Borra (o desvincula) un lote de filas. Devuelve cuántas procesó."""
+        keys = db.execute(select(key).where(condition).limit(batch_size)).scalars().all()
+        if not keys:
+            return 0
+
+        if values is None:
+            stmt = delete(model).where(condition, key.in_(keys))
+        else:
+            stmt = update(model).where(condition, key.in_(keys)).values(**values)
+        db.execute(stmt.execution_options(synchronize_session=False))
+        return len(keys)
+
+    @staticmethod
+    def run(db: Session, user_id: int, batch_size: int = DELETE_BATCH_SIZE) -> Optional[AccountDeletion]:
+        """
+        Ejecuta (o retoma) el borrado de una cuenta. Cada lote se confirma junto
+        con el avance, así un reinicio continúa desde el paso en que quedó.
+        """
+        deletion = db.query(AccountDeletion).filter(AccountDeletion.user_id == user_id).first()
+        if not deletion or deletion.status == "done":
+            return deletion
+
+        steps = AccountDeletionService._steps(user_id)
+        names = [step[0] for step in steps]
+        start = names.index(deletion.step) if deletion.step in names else 0
+
+        deletion.status = "running"
+        db.commit()
+
+        try:
+            for name, model, key, condition, values in steps[start:]:
+                deletion.step = name
+                db.commit()
+
+                while True:
+                    processed = AccountDeletionService._delete_batch(
+                        db, model, key, condition, values, batch_size
+                    )
+                    if not processed:
+                        break
+                    deletion.rows_deleted += processed
+                    db.commit()
+
+            deletion.status = "done"
+            deletion.step = None
+            deletion.finished_at = datetime.now()
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            deletion.status = "failed"
+            deletion.error = str(e)[:2000]
+            db.commit()
+            raise
+
+        return deletion
+
+    @staticmethod
+    def run_in_background(user_id: int) -> None:
+        """Tarea en segundo plano: abre su propia sesión de BD"""
+        db = SessionLocal()
+        try:
+            AccountDeletionService.run(db, user_id)
+        finally:
+            db.close()
+
+    @staticmethod
+    def pending_user_ids(db: Session) -> List[int]:
+        """Borrados pendientes, fallidos o abandonados (para el job de reintento)"""
+        stale_before = datetime.now() - STALE_AFTER
+        rows = db.query(AccountDeletion.user_id).filter(or_(
+            AccountDeletion.status.in_(("pending", "failed")),
+            (AccountDeletion.status == "running") & (AccountDeletion.updated_at < stale_before)
+        )).order_by(AccountDeletion.requested_at).all()
+        return [row.user_id for row in rows]
@@ -5,6 +5,8 @@ from datetime import timedelta
 from app.models.user import Usuario
 from app.schemas.auth import RegisterSchema, LoginSchema, UserResponse
 from app.utils.security import hash_password, verify_password, create_access_token
+from app.services.user_search_service import UserSearchService
+from app.services.user_availability_service import UserAvailabilityService
 from app.config import get_settings
 
 #Obtener la configutacion
@@ -17,17 +19,15 @@ class AuthService:
         """
         Registrar un nuevo usuario en el sistema
         """
-        #verificar si el username ya existe
-        existing_user=db.query(Usuario).filter(Usuario.username==data.username).first()
-        if existing_user:
+        #verificar si el username ya existe (el filtro evita la consulta si seguro está libre)
+        if not UserAvailabilityService.is_available(db, "username", data.username):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="El username ya esta en uso"
             )
         
         #Verificar si el email ya existe
-        existing_email=db.query(Usuario).filter(Usuario.email==data.email).first()
-        if existing_email:
+        if not UserAvailabilityService.is_available(db, "email", data.email):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="El correo ya ha sido registrado"
@@ -45,8 +45,11 @@ class AuthService:
             )
 
             db.add(new_user)
+            db.flush()
+            UserSearchService.index_user(db, new_user)
             db.commit()
             db.refresh(new_user)
+            UserAvailabilityService.add(new_user.username, new_user.email)
 
             return new_user
         except IntegrityError as e:
@@ -71,8 +74,8 @@ class AuthService:
         #buscar usuario por username
         user=db.query(Usuario).filter(Usuario.username==data.username).first()
 
-        #Verificar si el usuario no existe
-        if not user:
+        #Verificar si el usuario no existe (o su cuenta se está eliminando)
+        if not user or not user.is_active:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Credenciales incorrectas",
@@ -110,7 +113,7 @@ class AuthService:
         Ovtiene los datos del usuario desde la BD
         """
         user=db.query(Usuario).filter(Usuario.user_id==user_id).first()
-        if not user:
+        if not user or not user.is_active:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Usuario no encontrado"
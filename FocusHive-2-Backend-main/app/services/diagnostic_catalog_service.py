@@ -0,0 +1,128 @@
+import hashlib
+import threading
+from itertools import chain
+from sqlalchemy import event, update, insert
+from sqlalchemy.orm import Session, selectinload
+from fastapi import HTTPException, status
+from typing import Optional, Tuple
+
+from app.models.diagnostic import DiagnosticQuestion, DiagnosticOption, DiagnosticCatalogVersion
+from app.schemas.diagnostic import (
+    DiagnosticQuestionsResponse,
+    DiagnosticQuestionSchema,
+    DiagnosticOptionSchema
+)
+from app.utils.diagnostic_algorithm import ScoringMatrix
+
+CATALOG_ID = 1
+
+
+class DiagnosticCatalogService:
+    """
+    Cuestionario de diagnóstico precalculado en memoria.
+
+    El cuestionario solo cambia cuando se editan preguntas u opciones; cada
+    cambio incrementa la versión en `diagnostic_catalog_version` y los
+    procesos reconstruyen su copia al ver una versión distinta.
+    """
+
+    # (versión, JSON serializado, ETag)
+    _questions: Optional[Tuple[int, bytes, str]] = None
+    # (versión, tabla de puntuación)
+    _matrix: Optional[Tuple[int, ScoringMatrix]] = None
+    _lock = threading.Lock()
+
+    @staticmethod
+    def get_version(db: Session) -> int:
+        """Versión actual del cuestionario (0 si nunca se registró un cambio)"""
+        return db.query(DiagnosticCatalogVersion.version).filter(
+            DiagnosticCatalogVersion.catalog_id == CATALOG_ID
+        ).scalar() or 0
+
+    @staticmethod
+    def bump_version(executor) -> None:
+        """
+        Incrementa la versión del cuestionario.
+
+        Args:
+            executor: Session o Connection (dentro de la transacción del cambio)
+        """
+        table = DiagnosticCatalogVersion.__table__
+        result = executor.execute(
+            update(table).where(table.c.catalog_id == CATALOG_ID).values(version=table.c.version + 1)
+        )
+        if not result.rowcount:
+            executor.execute(insert(table).values(catalog_id=CATALOG_ID, version=1))
+
+    @staticmethod
+    def get_questions_payload(db: Session) -> Tuple[bytes, str]:
+        """
+        Devuelve el cuestionario completo como JSON ya serializado y su ETag.
+        Solo consulta preguntas y opciones cuando cambió la versión.
+        """
+        version = DiagnosticCatalogService.get_version(db)
+
+        with DiagnosticCatalogService._lock:
+            cached = DiagnosticCatalogService._questions
+        if cached and cached[0] == version:
+            return cached[1], cached[2]
+
+        # Preguntas y opciones en dos consultas (sin carga perezosa por pregunta)
+        questions = db.query(DiagnosticQuestion).options(
+            selectinload(DiagnosticQuestion.options)
+        ).order_by(DiagnosticQuestion.question_order).all()
+
+        if not questions:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="No hay preguntas disponibles"
+            )
+
+        response = DiagnosticQuestionsResponse(
+            total_questions=len(questions),
+            questions=[
+                DiagnosticQuestionSchema(
+                    question_id=q.question_id,
+                    question_text=q.question_text,
+                    question_order=q.question_order,
+                    options=[
+                        DiagnosticOptionSchema(option_id=opt.option_id, option_text=opt.option_text)
+                        for opt in sorted(q.options, key=lambda opt: opt.option_id)
+                    ]
+                )
+                for q in questions
+            ]
+        )
+
+        body = response.model_dump_json().encode("utf-8")
+        etag = f'"{version}-{hashlib.sha1(body).hexdigest()[:16]}"'
+
+        with DiagnosticCatalogService._lock:
+            DiagnosticCatalogService._questions = (version, body, etag)
+
+        return body, etag
+
+    @staticmethod
+    def get_scoring_matrix(db: Session) -> ScoringMatrix:
+        """Tabla de puntuación en memoria, reconstruida cuando cambia la versión"""
+        version = DiagnosticCatalogService.get_version(db)
+
+        with DiagnosticCatalogService._lock:
+            cached = DiagnosticCatalogService._matrix
+        if cached and cached[0] == version:
+            return cached[1]
+
+        matrix = ScoringMatrix.load(db)
+        with DiagnosticCatalogService._lock:
+            DiagnosticCatalogService._matrix = (version, matrix)
+        return matrix
+
+
+@event.listens_for(Session, "after_flush")
+def _bump_catalog_version(session: Session, flush_context) -> None:
+    """Incrementa la versión en la misma transacción que edita preguntas u opciones"""
+    if any(
+        isinstance(obj, (DiagnosticQuestion, DiagnosticOption))
+        for obj in chain(session.new, session.dirty, session.deleted)
+    ):
+        DiagnosticCatalogService.bump_version(session.connection())
@@ -0,0 +1,190 @@
+import time
+from itertools import groupby
+from sqlalchemy.orm import Session
+from sqlalchemy import select, update, func, insert, case
+from typing import Dict, List, Optional, Tuple
+
+from app.database.connection import SessionLocal, engine
+from app.models.diagnostic import DiagnosticResponse, DiagnosticRescoreProgress
+from app.models.method import Metodo
+from app.models.user_method import UsuarioMetodo
+from app.utils.diagnostic_algorithm import DiagnosticAlgorithm, ScoringMatrix
+from app.services.diagnostic_service import DiagnosticService
+
+# Usuarios actualizados por transacción
+RESCORE_CHUNK_SIZE = 500
+
+# Filas leídas por viaje del cursor del servidor
+STREAM_BATCH_SIZE = 5000
+
+
+class DiagnosticRescoreService:
+    """
+    Recalcula las recomendaciones de método a partir de las respuestas
+    guardadas, por rangos de user_id (cada rango lo procesa un worker).
+    """
+
+    @staticmethod
+    def plan_ranges(db: Session, run_id: str, parts: int) -> List[Tuple[int, int]]:
+        """
+        Divide los user_id con respuestas en `parts` rangos [inicio, fin) y los
+        registra para el run. Si el run ya existe, devuelve sus rangos pendientes.
+        """
+        existing = db.query(DiagnosticRescoreProgress).filter(
+            DiagnosticRescoreProgress.run_id == run_id
+        ).all()
+        if existing:
+            return [(p.range_start, p.range_end) for p in existing if not p.finished]
+
+        low, high = db.query(
+            func.min(DiagnosticResponse.user_id),
+            func.max(DiagnosticResponse.user_id)
+        ).one()
+        if low is None:
+            return []
+
+        step = max(1, -(-(high - low + 1) // parts))
+        ranges = [(start, min(start + step, high + 1)) for start in range(low, high + 1, step)]
+
+        db.execute(insert(DiagnosticRescoreProgress), [
+            {"run_id": run_id, "range_start": start, "range_end": end, "users_done": 0, "finished": False}
+            for start, end in ranges
+        ])
+        db.commit()
+        return ranges
+
+    @staticmethod
+    def rescore_range(
+        run_id: str,
+        range_start: int,
+        range_end: int,
+        chunk_size: int = RESCORE_CHUNK_SIZE
+    ) -> Dict:
+        """
+        Procesa un rango de usuarios retomando desde el último usuario confirmado.
+        Pensado para ejecutarse en un proceso worker (abre sus propias conexiones).
+
+        Returns:
+            {'range_start', 'users', 'responses', 'seconds'}
+        """
+        started = time.monotonic()
+        db = SessionLocal()
+        users = responses = 0
+
+        try:
+            progress = db.query(DiagnosticRescoreProgress).filter(
+                DiagnosticRescoreProgress.run_id == run_id,
+                DiagnosticRescoreProgress.range_start == range_start
+            ).one()
+            resume_after = progress.last_user_id
+
+            matrix = ScoringMatrix.load(db)
+            method_ids = {nombre.lower(): metodo_id for metodo_id, nombre in db.query(Metodo.metodo_id, Metodo.nombre)}
+            db.commit()
+
+            stmt = select(DiagnosticResponse.user_id, DiagnosticResponse.option_id).where(
+                DiagnosticResponse.user_id >= range_start,
+                DiagnosticResponse.user_id < range_end
+            )
+            if resume_after is not None:
+                stmt = stmt.where(DiagnosticResponse.user_id > resume_after)
+            stmt = stmt.order_by(DiagnosticResponse.user_id)
+
+            # Lectura con cursor del lado del servidor en una conexión aparte:
+            # las escrituras van por la sesión mientras el cursor sigue abierto
+            with engine.connect() as stream_conn:
+                rows = stream_conn.execution_options(
+                    stream_results=True, yield_per=STREAM_BATCH_SIZE
+                ).execute(stmt)
+
+                chunk: Dict[int, Tuple[int, ...]] = {}
+                for user_id, group in groupby(rows, key=lambda row: row.user_id):
+                    option_ids = [row.option_id for row in group]
+                    responses += len(option_ids)
+                    chunk[user_id] = DiagnosticRescoreService._recommend(matrix, method_ids, option_ids)
+
+                    if len(chunk) >= chunk_size:
+                        DiagnosticRescoreService._write_chunk(db, run_id, range_start, chunk)
+                        users += len(chunk)
+                        chunk = {}
+
+                DiagnosticRescoreService._write_chunk(db, run_id, range_start, chunk, finished=True)
+                users += len(chunk)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+        return {
+            "range_start": range_start,
+            "users": users,
+            "responses": responses,
+            "seconds": time.monotonic() - started
+        }
+
+    @staticmethod
+    def _recommend(matrix: ScoringMatrix, method_ids: Dict[str, int], option_ids: List[int]) -> Tuple[int, ...]:
+        """metodo_id recomendados (principal y, si aplica, secundario) para unas respuestas"""
+        scores = matrix.score(option_ids)
+        primary, secondary = DiagnosticAlgorithm.get_recommended_method(scores)
+        return tuple(
+            method_ids[name] for name in (primary, secondary)
+            if name is not None and name in method_ids
+        )
+
+    @staticmethod
+    def _write_chunk(
+        db: Session,
+        run_id: str,
+        range_start: int,
+        chunk: Dict[int, Tuple[int, ...]],
+        finished: bool = False
+    ) -> None:
+        """
+        Escribe las recomendaciones de un bloque de usuarios y el avance del
+        rango en la misma transacción (así un reinicio no repite ni pierde usuarios).
+        """
+        try:
+            if chunk:
+                db.execute(
+                    update(UsuarioMetodo)
+                    .where(UsuarioMetodo.user_id.in_(list(chunk)))
+                    .values(es_recomendado=False)
+                )
+
+                rows = [
+                    {"user_id": user_id, "metodo_id": metodo_id, "es_recomendado": True, "es_utilizado": False}
+                    for user_id, metodo_ids in chunk.items()
+                    for metodo_id in metodo_ids
+                ]
+                if rows:
+                    db.execute(DiagnosticService.recommended_upsert(db), rows)
+
+            values = {"users_done": DiagnosticRescoreProgress.users_done + len(chunk)}
+            if chunk:
+                values["last_user_id"] = max(chunk)
+            if finished:
+                values["finished"] = True
+            db.query(DiagnosticRescoreProgress).filter(
+                DiagnosticRescoreProgress.run_id == run_id,
+                DiagnosticRescoreProgress.range_start == range_start
+            ).update(values, synchronize_session=False)
+
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+    @staticmethod
+    def get_run_summary(db: Session, run_id: str) -> Optional[Dict]:
+        """Totales del run: rangos terminados y usuarios procesados"""
+        row = db.query(
+            func.count(DiagnosticRescoreProgress.range_start),
+            func.sum(DiagnosticRescoreProgress.users_done),
+            func.sum(case((DiagnosticRescoreProgress.finished == True, 1), else_=0))
+        ).filter(DiagnosticRescoreProgress.run_id == run_id).one()
+
+        if not row[0]:
+            return None
+        return {"ranges": row[0], "users_done": int(row[1] or 0), "ranges_finished": int(row[2] or 0)}
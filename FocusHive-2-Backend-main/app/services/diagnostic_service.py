@@ -1,14 +1,20 @@
+import hashlib
+import json
 from sqlalchemy.orm import Session
+from sqlalchemy import func, insert
+from sqlalchemy.dialects import mysql, sqlite
+from sqlalchemy.exc import IntegrityError
 from fastapi import HTTPException, status
 from typing import List, Dict, Optional
 from datetime import datetime
 
-from app.models.diagnostic import DiagnosticQuestion, DiagnosticOption, DiagnosticResponse
+from app.models.diagnostic import DiagnosticQuestion, DiagnosticResponse, DiagnosticSubmission
 from app.models.user_method import UsuarioMetodo
 from app.models.user import Usuario
 from app.models.method import Metodo
 from app.schemas.diagnostic import UserAnswerSchema
-from app.utils.diagnostic_algorithm import DiagnosticAlgorithm
+from app.utils.diagnostic_algorithm import DiagnosticAlgorithm, ScoringMatrix
+from app.services.diagnostic_catalog_service import DiagnosticCatalogService
 
 class DiagnosticService:
     
@@ -51,9 +57,15 @@ class DiagnosticService:
         }
     
     @staticmethod
-    def validate_answers(db: Session, answers: List[UserAnswerSchema]) -> bool:
-        """Valida que las respuestas sean correctas"""
-        total_questions = db.query(DiagnosticQuestion).count()
+    def validate_answers(
+        db: Session,
+        answers: List[UserAnswerSchema],
+        matrix: Optional[ScoringMatrix] = None
+    ) -> bool:
+        """Valida que las respuestas sean correctas (contra la tabla de puntuación en memoria)"""
+        if matrix is None:
+            matrix = DiagnosticCatalogService.get_scoring_matrix(db)
+        total_questions = len(matrix.question_ids)
         
         if len(answers) != total_questions:
             raise HTTPException(
@@ -62,67 +74,93 @@ class DiagnosticService:
             )
         
         # Validar cada respuesta
-        for answer in answers:
-            option = db.query(DiagnosticOption).filter(
-                DiagnosticOption.option_id == answer.option_id,
-                DiagnosticOption.question_id == answer.question_id
-            ).first()
-            
-            if not option:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Opción {answer.option_id} no válida para pregunta {answer.question_id}"
-                )
+        invalid = matrix.find_invalid((a.question_id, a.option_id) for a in answers)
+        if invalid:
+            question_id, option_id = invalid
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Opción {option_id} no válida para pregunta {question_id}"
+            )
         
         return True
     
+    @staticmethod
+    def recommended_upsert(db: Session):
+        """INSERT de usuario_metodo que, si la fila (usuario, método) ya existe, solo la marca como recomendada"""
+        if db.get_bind().dialect.name == "mysql":
+            stmt = mysql.insert(UsuarioMetodo)
+            return stmt.on_duplicate_key_update(es_recomendado=stmt.inserted.es_recomendado)
+        
+        stmt = sqlite.insert(UsuarioMetodo)
+        return stmt.on_conflict_do_update(
+            index_elements=[UsuarioMetodo.user_id, UsuarioMetodo.metodo_id],
+            set_={"es_recomendado": stmt.excluded.es_recomendado}
+        )
+    
+    @staticmethod
+    def _answers_hash(answers: List[UserAnswerSchema]) -> str:
+        pairs = sorted((a.question_id, a.option_id) for a in answers)
+        return hashlib.sha1(json.dumps(pairs).encode("utf-8")).hexdigest()
+    
+    @staticmethod
+    def _get_submission(db: Session, user_id: int, idempotency_key: str) -> Optional[DiagnosticSubmission]:
+        return db.query(DiagnosticSubmission).filter(
+            DiagnosticSubmission.user_id == user_id,
+            DiagnosticSubmission.idempotency_key == idempotency_key
+        ).first()
+    
+    @staticmethod
+    def _replay_submission(submission: DiagnosticSubmission, request_hash: str) -> Dict:
+        """Resultado guardado de un envío repetido con la misma clave"""
+        if submission.request_hash != request_hash:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="La clave de idempotencia ya se usó con otras respuestas"
+            )
+        return json.loads(submission.result)
+    
     @staticmethod
     def process_diagnostic(
         db: Session,
         user_id: int,
-        answers: List[UserAnswerSchema]
+        answers: List[UserAnswerSchema],
+        idempotency_key: Optional[str] = None
     ) -> Dict:
         """
         Procesa el diagnóstico completo.
         Implementa el requisito funcional #5
+        
+        Las escrituras son operaciones de conjunto: un INSERT multi-fila de
+        respuestas, un upsert de las recomendaciones y un UPDATE del usuario.
+        Con `idempotency_key`, un envío repetido devuelve el resultado guardado
+        sin volver a procesar.
         """
-        # 1. Validar
-        DiagnosticService.validate_answers(db, answers)
-        
-        # 2. Eliminar respuestas anteriores si existen
-        db.query(DiagnosticResponse).filter(
-            DiagnosticResponse.user_id == user_id
-        ).delete()
-        
-        # 3. Guardar nuevas respuestas
-        for answer in answers:
-            response = DiagnosticResponse(
-                user_id=user_id,
-                question_id=answer.question_id,
-                option_id=answer.option_id
-            )
-            db.add(response)
+        request_hash = DiagnosticService._answers_hash(answers)
+        if idempotency_key:
+            previous = DiagnosticService._get_submission(db, user_id, idempotency_key)
+            if previous:
+                return DiagnosticService._replay_submission(previous, request_hash)
+        
+        # 1. Validar (con la tabla de puntuación en memoria)
+        matrix = DiagnosticCatalogService.get_scoring_matrix(db)
+        DiagnosticService.validate_answers(db, answers, matrix)
         
-        # 4. Calcular scores
+        # 2. Calcular scores y métodos recomendados
         answers_dict = [
             {"question_id": a.question_id, "option_id": a.option_id}
             for a in answers
         ]
-        scores = DiagnosticAlgorithm.calculate_scores(db, answers_dict)
-        
-        # 5. Determinar método recomendado
+        scores = DiagnosticAlgorithm.calculate_scores(db, answers_dict, matrix)
         primary_name, secondary_name = DiagnosticAlgorithm.get_recommended_method(scores)
         
-        # 6. Obtener método de la BD
-        primary_method = db.query(Metodo).filter(
-            Metodo.nombre.ilike(primary_name)
-        ).first()
-        
-        secondary_method = None
-        if secondary_name:
-            secondary_method = db.query(Metodo).filter(
-                Metodo.nombre.ilike(secondary_name)
-            ).first()
+        # 3. Obtener ambos métodos de la BD en una consulta
+        names = [name for name in (primary_name, secondary_name) if name]
+        methods = {
+            metodo.nombre.lower(): metodo
+            for metodo in db.query(Metodo).filter(func.lower(Metodo.nombre).in_(names)).all()
+        }
+        primary_method = methods.get(primary_name)
+        secondary_method = methods.get(secondary_name) if secondary_name else None
         
         if not primary_method:
             raise HTTPException(
@@ -130,75 +168,72 @@ class DiagnosticService:
                 detail=f"Método '{primary_name}' no encontrado en BD"
             )
         
+        primary_info = DiagnosticAlgorithm.get_method_recommendations(primary_name)
+        secondary_info = None
+        if secondary_name:
+            secondary_info = DiagnosticAlgorithm.get_method_recommendations(secondary_name)
+        
+        result = {
+            "primary_method": {
+                "method_id": primary_method.metodo_id,
+                "method_name": primary_method.nombre,
+                "score": scores[primary_name],
+                **primary_info
+            },
+            "secondary_method": {
+                "method_id": secondary_method.metodo_id,
+                "method_name": secondary_method.nombre,
+                "score": scores[secondary_name],
+                **secondary_info
+            } if secondary_method else None,
+            "all_scores": scores
+        }
+        
         try:
-            # 7. Limpiar recomendaciones anteriores del usuario
+            # 4. Reemplazar respuestas anteriores (DELETE + INSERT multi-fila)
+            db.query(DiagnosticResponse).filter(
+                DiagnosticResponse.user_id == user_id
+            ).delete(synchronize_session=False)
+            db.execute(insert(DiagnosticResponse), [
+                {"user_id": user_id, "question_id": a.question_id, "option_id": a.option_id}
+                for a in answers
+            ])
+            
+            # 5. Limpiar recomendaciones anteriores y marcar las nuevas (upsert)
             db.query(UsuarioMetodo).filter(
                 UsuarioMetodo.user_id == user_id
-            ).update({"es_recomendado": False})
+            ).update({"es_recomendado": False}, synchronize_session=False)
+            db.execute(DiagnosticService.recommended_upsert(db), [
+                {"user_id": user_id, "metodo_id": metodo.metodo_id, "es_recomendado": True, "es_utilizado": False}
+                for metodo in (primary_method, secondary_method) if metodo
+            ])
             
-            # 8. Marcar método principal como recomendado
-            user_method = db.query(UsuarioMetodo).filter(
-                UsuarioMetodo.user_id == user_id,
-                UsuarioMetodo.metodo_id == primary_method.metodo_id
-            ).first()
+            # 6. Actualizar usuario
+            db.query(Usuario).filter(
+                Usuario.user_id == user_id
+            ).update({"diagnostic_completed": True}, synchronize_session=False)
             
-            if user_method:
-                user_method.es_recomendado = True
-            else:
-                new_user_method = UsuarioMetodo(
+            if idempotency_key:
+                db.add(DiagnosticSubmission(
                     user_id=user_id,
-                    metodo_id=primary_method.metodo_id,
-                    es_recomendado=True,
-                    es_utilizado=False
-                )
-                db.add(new_user_method)
-            
-            # 9. Marcar método secundario si existe
-            if secondary_method:
-                sec_user_method = db.query(UsuarioMetodo).filter(
-                    UsuarioMetodo.user_id == user_id,
-                    UsuarioMetodo.metodo_id == secondary_method.metodo_id
-                ).first()
-                
-                if sec_user_method:
-                    sec_user_method.es_recomendado = True
-                else:
-                    new_sec = UsuarioMetodo(
-                        user_id=user_id,
-                        metodo_id=secondary_method.metodo_id,
-                        es_recomendado=True,
-                        es_utilizado=False
-                    )
-                    db.add(new_sec)
-            
-            # 10. Actualizar usuario
-            user = db.query(Usuario).filter(Usuario.user_id == user_id).first()
-            user.diagnostic_completed = True
+                    idempotency_key=idempotency_key,
+                    request_hash=request_hash,
+                    result=json.dumps(result, ensure_ascii=False)
+                ))
             
             db.commit()
+            return result
             
-            # 11. Preparar resultado
-            primary_info = DiagnosticAlgorithm.get_method_recommendations(primary_name)
-            secondary_info = None
-            if secondary_name:
-                secondary_info = DiagnosticAlgorithm.get_method_recommendations(secondary_name)
-            
-            return {
-                "primary_method": {
-                    "method_id": primary_method.metodo_id,
-                    "method_name": primary_method.nombre,
-                    "score": scores[primary_name],
-                    **primary_info
-                },
-                "secondary_method": {
-                    "method_id": secondary_method.metodo_id,
-                    "method_name": secondary_method.nombre,
-                    "score": scores[secondary_name],
-                    **secondary_info
-                } if secondary_method else None,
-                "all_scores": scores
-            }
-            
+        except IntegrityError:
+            db.rollback()
+            # Otro envío con la misma clave terminó primero: responder con su resultado
+            previous = DiagnosticService._get_submission(db, user_id, idempotency_key) if idempotency_key else None
+            if previous:
+                return DiagnosticService._replay_submission(previous, request_hash)
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Error al procesar: conflicto al guardar el diagnóstico"
+            )
         except Exception as e:
             db.rollback()
             raise HTTPException(
@@ -0,0 +1,166 @@
+import json
+from sqlalchemy.orm import Session
+from sqlalchemy import func
+from fastapi import HTTPException, status
+from typing import Dict, Optional
+
+from app.models.feynman import FeynmanWork
+from app.models.feynman_revision import FeynmanRevision
+from app.schemas.note_delta import TextDeltaOp
+from app.utils.text_delta import apply_text_delta, diff_text
+
+# Cada cuántas revisiones se guarda una copia completa: reconstruir cualquier
+# revisión aplica como máximo SNAPSHOT_INTERVAL - 1 diffs
+SNAPSHOT_INTERVAL = 20
+
+# Campos de texto versionados (se guardan como diff) y campos guardados por valor
+TEXT_FIELDS = ("topic", "explanation", "gaps_identified", "final_version")
+VALUE_FIELDS = ("is_completed",)
+HISTORY_FIELDS = TEXT_FIELDS + VALUE_FIELDS
+
+
+class FeynmanHistoryService:
+    """Historial de revisiones de trabajos Feynman (diffs inversos + copias periódicas)"""
+
+    @staticmethod
+    def state_of(work: FeynmanWork) -> Dict:
+        """Estado versionado de un trabajo"""
+        return {field: getattr(work, field) for field in HISTORY_FIELDS}
+
+    @staticmethod
+    def record(
+        db: Session,
+        feynman_id: int,
+        user_id: int,
+        revision: int,
+        old: Dict,
+        new: Dict
+    ) -> None:
+        """
+        Registra el estado de `revision` antes de que lo reemplace la siguiente.
+        No hace commit: debe ir en la misma transacción que la actualización.
+
+        Args:
+            revision: Revisión que se está reemplazando
+            old: Valores anteriores de (al menos) los campos que cambiaron
+            new: Valores nuevos de esos campos
+        """
+        changed = sorted(field for field in new if field in HISTORY_FIELDS and new[field] != old.get(field))
+
+        if revision % SNAPSHOT_INTERVAL == 0:
+            state = {field: old[field] for field in HISTORY_FIELDS if field in old}
+            missing = [field for field in HISTORY_FIELDS if field not in state]
+            if missing:
+                # Los campos que no cambiaron tienen el mismo valor en la fila actual
+                row = db.query(*[getattr(FeynmanWork, field) for field in missing]).filter(
+                    FeynmanWork.feynman_id == feynman_id
+                ).one()
+                state.update(zip(missing, row))
+            kind, payload = "snapshot", {"fields": state}
+        else:
+            # Diff inverso: transforma la revisión siguiente en esta
+            # (los campos que pasan de/a vacío (None) se guardan por valor)
+            diffed = [
+                field for field in changed
+                if field in TEXT_FIELDS and old[field] is not None and new[field] is not None
+            ]
+            kind, payload = "delta", {
+                "ops": {field: diff_text(new[field], old[field]) for field in diffed},
+                "values": {field: old[field] for field in changed if field not in diffed}
+            }
+
+        data = json.dumps(payload, ensure_ascii=False)
+        db.add(FeynmanRevision(
+            feynman_id=feynman_id,
+            user_id=user_id,
+            revision=revision,
+            kind=kind,
+            changed_fields=",".join(changed) or None,
+            data_size=len(data),
+            data=data
+        ))
+
+    @staticmethod
+    def list_revisions(
+        db: Session,
+        feynman_id: int,
+        before: Optional[int] = None,
+        limit: int = 20
+    ) -> Dict:
+        """Revisiones anteriores (más recientes primero) sin cargar su contenido"""
+        query = db.query(
+            FeynmanRevision.revision,
+            FeynmanRevision.kind,
+            FeynmanRevision.changed_fields,
+            FeynmanRevision.data_size,
+            FeynmanRevision.created_at
+        ).filter(FeynmanRevision.feynman_id == feynman_id)
+
+        if before is not None:
+            query = query.filter(FeynmanRevision.revision < before)
+
+        rows = query.order_by(FeynmanRevision.revision.desc()).limit(limit + 1).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        return {
+            "revisions": [
+                {
+                    "revision": r.revision,
+                    "kind": r.kind,
+                    "changed_fields": r.changed_fields.split(",") if r.changed_fields else [],
+                    "data_size": r.data_size,
+                    "replaced_at": r.created_at
+                }
+                for r in rows
+            ],
+            "next_before": rows[-1].revision if has_more else None
+        }
+
+    @staticmethod
+    def get_revision(db: Session, work: FeynmanWork, revision: int) -> Dict:
+        """
+        Reconstruye una revisión: parte de la copia completa más cercana por
+        encima (o del estado actual) y aplica los diffs inversos hacia atrás.
+        """
+        current = work.revision or 0
+        if revision == current:
+            return {"feynman_id": work.feynman_id, "revision": current, **FeynmanHistoryService.state_of(work)}
+
+        if revision < 0 or revision > current:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Revisión no encontrada")
+
+        snapshot_revision = db.query(func.min(FeynmanRevision.revision)).filter(
+            FeynmanRevision.feynman_id == work.feynman_id,
+            FeynmanRevision.kind == "snapshot",
+            FeynmanRevision.revision >= revision,
+            FeynmanRevision.revision < current
+        ).scalar()
+        upper = snapshot_revision if snapshot_revision is not None else current - 1
+
+        entries = db.query(FeynmanRevision).filter(
+            FeynmanRevision.feynman_id == work.feynman_id,
+            FeynmanRevision.revision >= revision,
+            FeynmanRevision.revision <= upper
+        ).order_by(FeynmanRevision.revision.desc()).all()
+
+        if len(entries) != upper - revision + 1:
+            # Revisiones anteriores a la activación del historial
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="La revisión no está disponible en el historial"
+            )
+
+        if snapshot_revision is not None:
+            state = json.loads(entries[0].data)["fields"]
+            entries = entries[1:]
+        else:
+            state = FeynmanHistoryService.state_of(work)
+
+        for entry in entries:
+            payload = json.loads(entry.data)
+            for field, ops in payload.get("ops", {}).items():
+                state[field] = apply_text_delta(state[field], [TextDeltaOp(**op) for op in ops])
+            state.update(payload.get("values", {}))
+
+        return {"feynman_id": work.feynman_id, "revision": revision, **state}
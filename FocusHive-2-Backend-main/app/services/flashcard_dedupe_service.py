@@ -0,0 +1,207 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import or_, update
+from typing import List, Dict, Optional, Sequence
+
+from app.models.orm_models import Flashcard
+from app.services.flashcard_sync_service import FlashcardSyncService
+from app.utils.flashcard_utils import (
+    CardFingerprint,
+    LSH_BANDS,
+    card_fingerprint,
+    fingerprint_columns,
+    is_near_duplicate
+)
+
+# Tarjetas procesadas por transacción al recalcular huellas
+BACKFILL_BATCH_SIZE = 1000
+
+
+class FlashcardDedupeService:
+    """Detección de flashcards duplicadas o casi duplicadas mediante hash exacto y LSH sobre SimHash"""
+
+    @staticmethod
+    def find_duplicates(
+        db: Session,
+        user_id: int,
+        fingerprints: Sequence[CardFingerprint]
+    ) -> List[Optional[int]]:
+        """
+        Busca, para cada huella, una tarjeta activa del usuario que sea duplicada.
+
+        Solo se consultan las tarjetas que comparten el hash exacto o alguna
+        cubeta LSH (consultas por índice), no toda la colección.
+
+        Returns:
+            Lista paralela a `fingerprints` con el card_id duplicado o None
+        """
+        if not fingerprints:
+            return []
+
+        conditions = [Flashcard.content_hash.in_({fp.content_hash for fp in fingerprints})]
+        for band in range(LSH_BANDS):
+            column = getattr(Flashcard, f"lsh_band{band}")
+            conditions.append(column.in_({fp.bands[band] for fp in fingerprints}))
+
+        candidates = db.query(
+            Flashcard.card_id, Flashcard.content_hash, Flashcard.simhash
+        ).filter(
+            Flashcard.card_user == user_id,
+            Flashcard.is_active == True,
+            or_(*conditions)
+        ).order_by(Flashcard.card_id).all()
+
+        return [
+            next(
+                (c.card_id for c in candidates if is_near_duplicate(fp, c.content_hash, c.simhash)),
+                None
+            )
+            for fp in fingerprints
+        ]
+
+    @staticmethod
+    def mark_duplicates(db: Session, user_id: int, fingerprints: Sequence[CardFingerprint]) -> List[bool]:
+        """
+        Indica qué huellas de un lote de importación son duplicadas, ya sea de
+        tarjetas existentes o de otra fila anterior del mismo lote.
+        """
+        existing = FlashcardDedupeService.find_duplicates(db, user_id, fingerprints)
+
+        hashes = set()
+        buckets: Dict[tuple, List[CardFingerprint]] = {}
+        result = []
+
+        for fp, duplicate_of in zip(fingerprints, existing):
+            if duplicate_of is not None or fp.content_hash in hashes:
+                result.append(True)
+                continue
+
+            candidates = [
+                kept
+                for band, value in enumerate(fp.bands)
+                for kept in buckets.get((band, value), [])
+            ]
+            if any(is_near_duplicate(fp, kept.content_hash, kept.simhash) for kept in candidates):
+                result.append(True)
+                continue
+
+            result.append(False)
+            hashes.add(fp.content_hash)
+            for band, value in enumerate(fp.bands):
+                buckets.setdefault((band, value), []).append(fp)
+
+        return result
+
+    @staticmethod
+    def dedupe_collection(db: Session, user_id: int, collection_id: int, dry_run: bool = True) -> List[Dict]:
+        """
+        Agrupa las tarjetas duplicadas de una colección. Se conserva la más antigua
+        de cada grupo; si no es simulación, el resto se desactiva.
+
+        Una simulación no escribe nada: las huellas que falten se calculan en
+        memoria en lugar de guardarse.
+
+        Returns:
+            [{'kept_card_id': X, 'duplicate_card_ids': [...]}, ...]
+        """
+        if not dry_run:
+            FlashcardDedupeService.backfill_fingerprints(db, user_id=user_id)
+
+        cards = db.query(
+            Flashcard.card_id, Flashcard.question, Flashcard.answer,
+            Flashcard.content_hash, Flashcard.simhash,
+            Flashcard.lsh_band0, Flashcard.lsh_band1, Flashcard.lsh_band2, Flashcard.lsh_band3
+        ).filter(
+            Flashcard.card_user == user_id,
+            Flashcard.collection == collection_id,
+            Flashcard.is_active == True
+        ).order_by(Flashcard.card_id).all()
+
+        # Cubetas en memoria: (banda, valor) -> tarjetas que se conservan
+        buckets: Dict[tuple, List] = {}
+        hashes: Dict[str, int] = {}
+        groups: Dict[int, List[int]] = {}
+
+        for card in cards:
+            if card.content_hash is None:
+                fp = card_fingerprint(card.question, card.answer)
+            else:
+                fp = CardFingerprint(
+                    card.content_hash,
+                    card.simhash,
+                    (card.lsh_band0, card.lsh_band1, card.lsh_band2, card.lsh_band3)
+                )
+
+            original = hashes.get(fp.content_hash)
+            if original is None:
+                candidates = {
+                    kept.card_id: kept
+                    for band, value in enumerate(fp.bands)
+                    for kept in buckets.get((band, value), [])
+                }
+                original = next(
+                    (card_id for card_id, kept in sorted(candidates.items())
+                     if is_near_duplicate(fp, kept.content_hash, kept.simhash)),
+                    None
+                )
+
+            if original is not None:
+                groups.setdefault(original, []).append(card.card_id)
+                continue
+
+            hashes[fp.content_hash] = card.card_id
+            for band, value in enumerate(fp.bands):
+                buckets.setdefault((band, value), []).append(card)
+
+        duplicate_ids = [card_id for ids in groups.values() for card_id in ids]
+        if duplicate_ids and not dry_run:
+            seq = FlashcardSyncService.next_seq(db, user_id)
+            db.execute(
+                update(Flashcard)
+                .where(Flashcard.card_id.in_(duplicate_ids))
+                .values(is_active=False, sync_seq=seq)
+            )
+            db.commit()
+
+        return [
+            {"kept_card_id": kept, "duplicate_card_ids": ids}
+            for kept, ids in groups.items()
+        ]
+
+    @staticmethod
+    def backfill_fingerprints(
+        db: Session,
+        user_id: Optional[int] = None,
+        batch_size: int = BACKFILL_BATCH_SIZE
+    ) -> int:
+        """
+        Calcula las huellas de las tarjetas que aún no la tienen (creadas antes
+        de existir la detección de duplicados), por lotes.
+
+        Returns:
+            Número de tarjetas actualizadas
+        """
+        updated = 0
+        last_id = 0
+
+        while True:
+            query = db.query(Flashcard.card_id, Flashcard.question, Flashcard.answer).filter(
+                Flashcard.content_hash.is_(None),
+                Flashcard.card_id > last_id
+            )
+            if user_id is not None:
+                query = query.filter(Flashcard.card_user == user_id)
+
+            rows = query.order_by(Flashcard.card_id).limit(batch_size).all()
+            if not rows:
+                break
+
+            db.execute(update(Flashcard), [
+                {"card_id": row.card_id, **fingerprint_columns(card_fingerprint(row.question, row.answer))}
+                for row in rows
+            ])
+            db.commit()
+
+            updated += len(rows)
+            last_id = rows[-1].card_id
+
+        return updated
@@ -0,0 +1,130 @@
+import threading
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+from typing import List, Dict, Optional, Tuple
+
+from app.models.flashcard_sync import FlashcardSyncState
+from app.models.orm_models import Flashcard
+from app.utils.text_search import InvertedIndex, mysql_boolean_query
+
+# Peso de cada campo en el ranking del índice en memoria
+QUESTION_WEIGHT = 2.0
+ANSWER_WEIGHT = 1.0
+
+
+class FlashcardSearchService:
+    """
+    Búsqueda de texto sobre flashcards.
+
+    En MySQL usa el índice FULLTEXT (question, answer). En otros motores
+    (desarrollo local) usa un índice invertido en memoria por usuario, que
+    se reconstruye cuando cambia la secuencia de sincronización del usuario.
+    """
+
+    # user_id -> (sync_seq, índice, {card_id: collection_id})
+    _indexes: Dict[int, Tuple[int, InvertedIndex, Dict[int, int]]] = {}
+    _lock = threading.Lock()
+
+    @staticmethod
+    def search(
+        db: Session,
+        user_id: int,
+        query: str,
+        collection_id: Optional[int] = None,
+        limit: int = 20
+    ) -> List[Tuple[Flashcard, float]]:
+        """
+        Busca flashcards activas del usuario por pregunta y respuesta.
+
+        Returns:
+            Lista de (flashcard, score) ordenada por relevancia
+        """
+        if db.get_bind().dialect.name == "mysql":
+            hits = FlashcardSearchService._search_mysql(db, user_id, query, collection_id, limit)
+        else:
+            hits = FlashcardSearchService._search_in_memory(db, user_id, query, collection_id, limit)
+
+        if not hits:
+            return []
+
+        cards = db.query(Flashcard).filter(
+            Flashcard.card_id.in_([card_id for card_id, _ in hits])
+        ).all()
+        cards_by_id = {card.card_id: card for card in cards}
+
+        return [(cards_by_id[card_id], score) for card_id, score in hits if card_id in cards_by_id]
+
+    @staticmethod
+    def _search_mysql(
+        db: Session,
+        user_id: int,
+        query: str,
+        collection_id: Optional[int],
+        limit: int
+    ) -> List[Tuple[int, float]]:
+        boolean_query = mysql_boolean_query(query)
+        if not boolean_query:
+            return []
+
+        sql = """
+            SELECT card_id, MATCH(question, answer) AGAINST (:q IN BOOLEAN MODE) AS score
+            FROM flashcards
+            WHERE card_user = :user_id
+              AND is_active = 1
+              AND MATCH(question, answer) AGAINST (:q IN BOOLEAN MODE)
+        """
+        params = {"q": boolean_query, "user_id": user_id, "limit": limit}
+
+        if collection_id is not None:
+            sql += " AND collection = :collection_id"
+            params["collection_id"] = collection_id
+
+        sql += " ORDER BY score DESC LIMIT :limit"
+
+        return [(row.card_id, float(row.score)) for row in db.execute(text(sql), params)]
+
+    @staticmethod
+    def _search_in_memory(
+        db: Session,
+        user_id: int,
+        query: str,
+        collection_id: Optional[int],
+        limit: int
+    ) -> List[Tuple[int, float]]:
+        index, collections = FlashcardSearchService._get_user_index(db, user_id)
+
+        doc_filter = None
+        if collection_id is not None:
+            doc_filter = lambda card_id: collections.get(card_id) == collection_id
+
+        return index.search(query, limit=limit, doc_filter=doc_filter)
+
+    @staticmethod
+    def _get_user_index(db: Session, user_id: int) -> Tuple[InvertedIndex, Dict[int, int]]:
+        """Obtiene el índice del usuario, reconstruyéndolo si sus flashcards cambiaron"""
+        seq = db.query(FlashcardSyncState.last_seq).filter(
+            FlashcardSyncState.user_id == user_id
+        ).scalar() or 0
+
+        with FlashcardSearchService._lock:
+            cached = FlashcardSearchService._indexes.get(user_id)
+            if cached and cached[0] == seq:
+                return cached[1], cached[2]
+
+        rows = db.query(
+            Flashcard.card_id, Flashcard.collection, Flashcard.question, Flashcard.answer
+        ).filter(
+            Flashcard.card_user == user_id,
+            Flashcard.is_active == True
+        ).yield_per(1000)
+
+        index = InvertedIndex()
+        collections = {}
+        for row in rows:
+            index.add(row.card_id, [(row.question, QUESTION_WEIGHT), (row.answer, ANSWER_WEIGHT)])
+            collections[row.card_id] = row.collection
+
+        with FlashcardSearchService._lock:
+            FlashcardSearchService._indexes[user_id] = (seq, index, collections)
+
+        return index, collections
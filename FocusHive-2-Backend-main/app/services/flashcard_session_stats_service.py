@@ -0,0 +1,155 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import func, insert
+from sqlalchemy.exc import IntegrityError
+from typing import Dict, List, Optional
+from datetime import date, datetime, timedelta
+
+from app.models.flashcard_session import FlashcardStudySession
+from app.models.flashcard_session_rollup import FlashcardSessionRollup, FlashcardRollupState
+
+STAT_FIELDS = ("sessions", "cards_studied", "cards_easy", "cards_medium", "cards_hard", "duration_minutes")
+
+
+class FlashcardSessionStatsService:
+    """
+    Estadísticas de sesiones de flashcards por día o semana.
+
+    Los días cerrados se consolidan una sola vez en flashcard_session_rollups;
+    solo el día en curso se calcula en cada petición.
+    """
+
+    @staticmethod
+    def _aggregate_columns():
+        return [
+            func.count(FlashcardStudySession.session_id).label("sessions"),
+            func.coalesce(func.sum(FlashcardStudySession.cards_studied), 0).label("cards_studied"),
+            func.coalesce(func.sum(FlashcardStudySession.cards_easy), 0).label("cards_easy"),
+            func.coalesce(func.sum(FlashcardStudySession.cards_medium), 0).label("cards_medium"),
+            func.coalesce(func.sum(FlashcardStudySession.cards_hard), 0).label("cards_hard"),
+            func.coalesce(func.sum(FlashcardStudySession.duration_minutes), 0).label("duration_minutes")
+        ]
+
+    @staticmethod
+    def _as_date(value) -> date:
+        """DATE() devuelve date en MySQL y texto en SQLite"""
+        if isinstance(value, datetime):
+            return value.date()
+        if isinstance(value, date):
+            return value
+        return date.fromisoformat(str(value)[:10])
+
+    @staticmethod
+    def refresh_rollups(db: Session, user_id: int, today: date) -> None:
+        """Consolida los días cerrados (anteriores a hoy) que aún no están en el rollup"""
+        closed_until = today - timedelta(days=1)
+        state = db.query(FlashcardRollupState).filter(
+            FlashcardRollupState.user_id == user_id
+        ).first()
+
+        if state and state.rolled_up_until >= closed_until:
+            return
+
+        day = func.date(FlashcardStudySession.created_at)
+        query = db.query(day.label("day"), *FlashcardSessionStatsService._aggregate_columns()).filter(
+            FlashcardStudySession.user_id == user_id,
+            FlashcardStudySession.created_at < datetime.combine(today, datetime.min.time())
+        )
+        if state:
+            query = query.filter(
+                FlashcardStudySession.created_at >= datetime.combine(
+                    state.rolled_up_until + timedelta(days=1), datetime.min.time()
+                )
+            )
+
+        rows = [
+            {
+                "user_id": user_id,
+                "day": FlashcardSessionStatsService._as_date(r.day),
+                **{field: int(getattr(r, field)) for field in STAT_FIELDS}
+            }
+            for r in query.group_by(day).all()
+        ]
+
+        try:
+            if rows:
+                db.execute(insert(FlashcardSessionRollup), rows)
+            if state:
+                state.rolled_up_until = closed_until
+            else:
+                db.add(FlashcardRollupState(user_id=user_id, rolled_up_until=closed_until))
+            db.commit()
+        except IntegrityError:
+            # Otra petición consolidó los mismos días al mismo tiempo
+            db.rollback()
+
+    @staticmethod
+    def invalidate_day(db: Session, user_id: int, day: date) -> None:
+        """
+        Descarta el rollup de un día cerrado (por ejemplo, al borrar una sesión)
+        para que se vuelva a consolidar desde ese día en la próxima consulta.
+        No hace commit.
+        """
+        state = db.query(FlashcardRollupState).filter(
+            FlashcardRollupState.user_id == user_id
+        ).first()
+        if not state or state.rolled_up_until < day:
+            return
+
+        db.query(FlashcardSessionRollup).filter(
+            FlashcardSessionRollup.user_id == user_id,
+            FlashcardSessionRollup.day >= day
+        ).delete(synchronize_session=False)
+        state.rolled_up_until = day - timedelta(days=1)
+
+    @staticmethod
+    def get_stats(
+        db: Session,
+        user_id: int,
+        granularity: str = "day",
+        periods: int = 30,
+        today: Optional[date] = None
+    ) -> Dict:
+        """
+        Totales de sesiones por periodo, del más antiguo al más reciente.
+
+        Args:
+            granularity: 'day' o 'week' (semanas de lunes a domingo)
+            periods: Cantidad de periodos a devolver (incluye el actual)
+        """
+        today = today or date.today()
+        if granularity == "week":
+            current_start = today - timedelta(days=today.weekday())
+            starts = [current_start - timedelta(weeks=i) for i in range(periods - 1, -1, -1)]
+        else:
+            starts = [today - timedelta(days=i) for i in range(periods - 1, -1, -1)]
+        range_start = starts[0]
+
+        FlashcardSessionStatsService.refresh_rollups(db, user_id, today)
+
+        daily: Dict[date, Dict[str, int]] = {}
+        rollups = db.query(FlashcardSessionRollup).filter(
+            FlashcardSessionRollup.user_id == user_id,
+            FlashcardSessionRollup.day >= range_start,
+            FlashcardSessionRollup.day < today
+        ).all()
+        for r in rollups:
+            daily[r.day] = {field: getattr(r, field) for field in STAT_FIELDS}
+
+        live = db.query(*FlashcardSessionStatsService._aggregate_columns()).filter(
+            FlashcardStudySession.user_id == user_id,
+            FlashcardStudySession.created_at >= datetime.combine(today, datetime.min.time())
+        ).one()
+        if live.sessions:
+            daily[today] = {field: int(getattr(live, field)) for field in STAT_FIELDS}
+
+        buckets = {start: dict.fromkeys(STAT_FIELDS, 0) for start in starts}
+        for day, totals in daily.items():
+            start = day - timedelta(days=day.weekday()) if granularity == "week" else day
+            bucket = buckets.get(start)
+            if bucket is None:
+                continue
+            for field in STAT_FIELDS:
+                bucket[field] += totals[field]
+
+        result: List[Dict] = [{"period_start": start, **buckets[start]} for start in starts]
+        return {"granularity": granularity, "periods": result}
@@ -0,0 +1,135 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import func, literal, null, union_all
+from typing import Dict, List
+
+from app.models.orm_models import CardCollection, Flashcard
+from app.models.flashcard_session import FlashcardStudySession
+
+
+class FlashcardStatsService:
+    """Estadísticas de flashcards calculadas con consultas agrupadas"""
+
+    @staticmethod
+    def card_counts_subquery(db: Session, user_id: int):
+        """Tarjetas activas por colección del usuario"""
+        return db.query(
+            Flashcard.collection.label("collection_id"),
+            func.count(Flashcard.card_id).label("card_count")
+        ).filter(
+            Flashcard.card_user == user_id,
+            Flashcard.is_active == True
+        ).group_by(Flashcard.collection).subquery()
+
+    @staticmethod
+    def get_collections_with_counts(db: Session, user_id: int) -> List:
+        """Colecciones activas del usuario junto con su número de tarjetas activas"""
+        card_counts = FlashcardStatsService.card_counts_subquery(db, user_id)
+
+        return db.query(
+            CardCollection,
+            func.coalesce(card_counts.c.card_count, 0).label("card_count")
+        ).outerjoin(
+            card_counts, card_counts.c.collection_id == CardCollection.collection_id
+        ).filter(
+            CardCollection.user_id == user_id,
+            CardCollection.is_active == True
+        ).all()
+
+    @staticmethod
+    def get_stats(db: Session, user_id: int) -> Dict:
+        """
+        Estadísticas de flashcards del usuario en una sola consulta (UNION ALL):
+        una fila por colección activa con sus tarjetas y agregados de sesiones,
+        más una fila (collection_id NULL) con los totales de sesiones del
+        usuario, que incluye las sesiones sin colección o de colecciones
+        desactivadas o borradas.
+        """
+        card_counts = FlashcardStatsService.card_counts_subquery(db, user_id)
+
+        session_sums = (
+            func.count(FlashcardStudySession.session_id).label("sessions"),
+            func.coalesce(func.sum(FlashcardStudySession.cards_studied), 0).label("cards_studied"),
+            func.coalesce(func.sum(FlashcardStudySession.cards_easy), 0).label("cards_easy"),
+            func.coalesce(func.sum(FlashcardStudySession.cards_medium), 0).label("cards_medium"),
+            func.coalesce(func.sum(FlashcardStudySession.cards_hard), 0).label("cards_hard"),
+            func.coalesce(func.sum(FlashcardStudySession.duration_minutes), 0).label("minutes")
+        )
+
+        session_stats = db.query(
+            FlashcardStudySession.collection_id.label("collection_id"),
+            *session_sums
+        ).filter(
+            FlashcardStudySession.user_id == user_id
+        ).group_by(FlashcardStudySession.collection_id).subquery()
+
+        collection_rows = db.query(
+            CardCollection.collection_id,
+            CardCollection.collection_name,
+            func.coalesce(card_counts.c.card_count, 0).label("card_count"),
+            func.coalesce(session_stats.c.sessions, 0).label("sessions"),
+            func.coalesce(session_stats.c.cards_studied, 0).label("cards_studied"),
+            func.coalesce(session_stats.c.cards_easy, 0).label("cards_easy"),
+            func.coalesce(session_stats.c.cards_medium, 0).label("cards_medium"),
+            func.coalesce(session_stats.c.cards_hard, 0).label("cards_hard"),
+            func.coalesce(session_stats.c.minutes, 0).label("minutes")
+        ).outerjoin(
+            card_counts, card_counts.c.collection_id == CardCollection.collection_id
+        ).outerjoin(
+            session_stats, session_stats.c.collection_id == CardCollection.collection_id
+        ).filter(
+            CardCollection.user_id == user_id,
+            CardCollection.is_active == True
+        )
+
+        user_totals = db.query(
+            null().label("collection_id"),
+            null().label("collection_name"),
+            literal(0).label("card_count"),
+            *session_sums
+        ).filter(FlashcardStudySession.user_id == user_id)
+
+        rows = db.execute(union_all(collection_rows.statement, user_totals.statement)).all()
+
+        totals = None
+        collections = []
+        for r in rows:
+            if r.collection_id is None:
+                totals = FlashcardStatsService._session_summary(r)
+                continue
+            collections.append({
+                "collection_id": r.collection_id,
+                "collection_name": r.collection_name,
+                "card_count": int(r.card_count),
+                **FlashcardStatsService._session_summary(r)
+            })
+        collections.sort(key=lambda c: c["collection_id"])
+
+        return {
+            "user_id": user_id,
+            "total_collections": len(collections),
+            "total_cards": sum(c["card_count"] for c in collections),
+            "sessions": totals,
+            "collections": collections
+        }
+
+    @staticmethod
+    def _session_summary(values) -> Dict:
+        """Totales de sesiones con el porcentaje de tarjetas fáciles/medias/difíciles"""
+        get = values.get if isinstance(values, dict) else lambda key: getattr(values, key)
+        easy, medium, hard = int(get("cards_easy")), int(get("cards_medium")), int(get("cards_hard"))
+        graded = easy + medium + hard
+
+        def pct(value: int) -> float:
+            return round(value / graded * 100, 2) if graded else 0.0
+
+        return {
+            "sessions": int(get("sessions")),
+            "cards_studied": int(get("cards_studied")),
+            "cards_easy": easy,
+            "cards_medium": medium,
+            "cards_hard": hard,
+            "minutes": int(get("minutes")),
+            "easy_pct": pct(easy),
+            "medium_pct": pct(medium),
+            "hard_pct": pct(hard)
+        }
@@ -0,0 +1,102 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import insert
+from sqlalchemy.dialects import mysql, sqlite
+from typing import Dict, Iterable
+
+from app.models.flashcard_sync import FlashcardSyncState, FlashcardTombstone
+from app.models.orm_models import CardCollection, Flashcard
+
+
+class FlashcardSyncService:
+    """Secuencia de cambios por usuario para colecciones y flashcards"""
+
+    @staticmethod
+    def next_seq(db: Session, user_id: int) -> int:
+        """
+        Reserva el siguiente número de secuencia del usuario.
+
+        Se incrementa con un upsert: crea la fila del contador si no existe
+        (primera escritura del usuario) sin chocar con la clave primaria cuando
+        dos peticiones llegan a la vez. La fila queda bloqueada hasta el commit,
+        así dos escrituras concurrentes del mismo usuario se confirman en el
+        orden de su secuencia y un cliente nunca se salta cambios.
+        """
+        if db.get_bind().dialect.name == "mysql":
+            stmt = mysql.insert(FlashcardSyncState).values(user_id=user_id, last_seq=1)
+            stmt = stmt.on_duplicate_key_update(last_seq=FlashcardSyncState.last_seq + 1)
+        else:
+            stmt = sqlite.insert(FlashcardSyncState).values(user_id=user_id, last_seq=1)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[FlashcardSyncState.user_id],
+                set_={"last_seq": FlashcardSyncState.last_seq + 1}
+            )
+        db.execute(stmt)
+
+        return db.query(FlashcardSyncState.last_seq).filter(
+            FlashcardSyncState.user_id == user_id
+        ).scalar()
+
+    @staticmethod
+    def record_deletes(
+        db: Session,
+        user_id: int,
+        seq: int,
+        entity_type: str,
+        entity_ids: Iterable[int]
+    ) -> None:
+        """Registra tombstones para entidades eliminadas"""
+        rows = [
+            {
+                "user_id": user_id,
+                "entity_type": entity_type,
+                "entity_id": entity_id,
+                "sync_seq": seq
+            }
+            for entity_id in entity_ids
+        ]
+        if rows:
+            db.execute(insert(FlashcardTombstone), rows)
+
+    @staticmethod
+    def get_changes(db: Session, user_id: int, since: int = 0) -> Dict:
+        """
+        Obtiene los cambios del usuario posteriores a `since`.
+        Con since=0 devuelve el estado completo (primera sincronización).
+
+        Returns:
+            {'seq', 'collections', 'cards', 'deleted_collections', 'deleted_cards'}
+        """
+        current_seq = db.query(FlashcardSyncState.last_seq).filter(
+            FlashcardSyncState.user_id == user_id
+        ).scalar() or 0
+
+        collections = db.query(CardCollection).filter(
+            CardCollection.user_id == user_id,
+            CardCollection.sync_seq <= current_seq
+        )
+        cards = db.query(Flashcard).filter(
+            Flashcard.card_user == user_id,
+            Flashcard.sync_seq <= current_seq
+        )
+        tombstones = db.query(
+            FlashcardTombstone.entity_type, FlashcardTombstone.entity_id
+        ).filter(
+            FlashcardTombstone.user_id == user_id,
+            FlashcardTombstone.sync_seq <= current_seq
+        )
+
+        if since > 0:
+            collections = collections.filter(CardCollection.sync_seq > since)
+            cards = cards.filter(Flashcard.sync_seq > since)
+            deleted = tombstones.filter(FlashcardTombstone.sync_seq > since).all()
+        else:
+            # En la sincronización completa solo interesan las entidades existentes
+            deleted = []
+
+        return {
+            "seq": current_seq,
+            "collections": collections.order_by(CardCollection.collection_id).all(),
+            "cards": cards.order_by(Flashcard.card_id).all(),
+            "deleted_collections": [t.entity_id for t in deleted if t.entity_type == "collection"],
+            "deleted_cards": [t.entity_id for t in deleted if t.entity_type == "card"]
+        }
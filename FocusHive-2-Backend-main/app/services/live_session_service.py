@@ -0,0 +1,294 @@
+import threading
+import time
+import uuid
+from sqlalchemy.orm import Session
+from sqlalchemy import update
+from fastapi import HTTPException, status
+from typing import Callable, Dict, Optional
+from datetime import datetime
+
+from app.database.connection import SessionLocal
+from app.models.method import Metodo
+from app.models.study_session import SesionEstudio
+from app.models.user import Usuario
+from app.services.live_session_store import LiveSession, LiveSessionStore, InMemoryLiveSessionStore
+
+# Sin heartbeat durante este tiempo, la sesión deja de sumar minutos (pestaña cerrada, etc.)
+HEARTBEAT_TIMEOUT = 90
+
+# Cada cuánto se guarda el avance en sesion_estudio mientras la sesión sigue en curso
+CHECKPOINT_SECONDS = 300
+
+# Sesiones sin actividad durante este tiempo se cierran como no completadas
+ABANDON_AFTER = 30 * 60
+
+# Cada cuánto se revisan las sesiones abandonadas (hilo de fondo y eventos de sesión)
+SWEEP_SECONDS = 60
+
+
+class LiveSessionService:
+    """
+    Sesiones de estudio en curso (Pomodoro). Los heartbeats y las pausas solo
+    modifican el estado en memoria; la fila de sesion_estudio se escribe al
+    finalizar, más un checkpoint cada CHECKPOINT_SECONDS para no perder el
+    tiempo estudiado si el servidor se reinicia.
+
+    Toda modificación de una sesión ocurre bajo store.lock(live_id), así un
+    checkpoint y el cierre (o dos cierres) nunca escriben a la vez.
+    """
+
+    store: LiveSessionStore = InMemoryLiveSessionStore()
+    _swept_at = 0.0
+    _sweeper: Optional[threading.Thread] = None
+
+    @staticmethod
+    def use_store(store: LiveSessionStore) -> None:
+        """Reemplaza el almacén (por ejemplo, por uno compartido entre workers)"""
+        LiveSessionService.store = store
+
+    @staticmethod
+    def _settle(session: LiveSession, now: float) -> None:
+        """Descuenta el tiempo sin heartbeats: la sesión se retoma desde ahora"""
+        if session.resumed_at is not None and now - session.last_seen > HEARTBEAT_TIMEOUT:
+            stopped_at = session.last_seen + HEARTBEAT_TIMEOUT
+            session.active_seconds += max(0.0, stopped_at - session.resumed_at)
+            session.resumed_at = now
+        session.last_seen = now
+
+    @staticmethod
+    def _active_seconds(session: LiveSession, now: float) -> float:
+        if session.resumed_at is None:
+            return session.active_seconds
+        end = min(now, session.last_seen + HEARTBEAT_TIMEOUT)
+        return session.active_seconds + max(0.0, end - session.resumed_at)
+
+    @staticmethod
+    def to_state(session: LiveSession, now: Optional[float] = None) -> Dict:
+        now = now or time.time()
+        return {
+            "live_id": session.live_id,
+            "session_id": session.session_id,
+            "metodo_id": session.metodo_id,
+            "descripcion": session.descripcion,
+            "started_at": session.started_at,
+            "paused": session.resumed_at is None,
+            "active_seconds": int(LiveSessionService._active_seconds(session, now)),
+            "checkpointed_at": datetime.fromtimestamp(session.checkpointed_at) if session.session_id else None
+        }
+
+    @staticmethod
+    def _get_owned(live_id: str, user_id: int) -> LiveSession:
+        session = LiveSessionService.store.get(live_id)
+        if not session or session.user_id != user_id:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Sesión en curso no encontrada")
+        return session
+
+    @staticmethod
+    def _write(db: Session, session: LiveSession, now: float, completed: bool) -> None:
+        """Inserta o actualiza la fila de sesion_estudio con los minutos acumulados. No hace commit."""
+        minutes = int(LiveSessionService._active_seconds(session, now) // 60)
+        if session.session_id is None:
+            row = SesionEstudio(
+                user_id=session.user_id,
+                metodo_id=session.metodo_id,
+                fecha_inicio=session.started_at,
+                duracion_minutos=minutes,
+                fue_completada=completed,
+                descripcion=session.descripcion
+            )
+            db.add(row)
+            db.flush()
+            session.session_id = row.session_id
+        else:
+            db.execute(
+                update(SesionEstudio)
+                .where(SesionEstudio.session_id == session.session_id)
+                .values(duracion_minutos=minutes, fue_completada=completed)
+            )
+        session.checkpointed_at = now
+
+    @staticmethod
+    def _checkpoint_if_due(db: Session, session: LiveSession, now: float) -> None:
+        """Guarda el avance si toca. Se llama con el candado de la sesión tomado."""
+        if now - session.checkpointed_at < CHECKPOINT_SECONDS:
+            return
+        session_id = session.session_id
+        try:
+            LiveSessionService._write(db, session, now, completed=False)
+            db.commit()
+        except Exception:
+            # El estado en memoria sigue siendo válido: se reintenta en el próximo evento
+            db.rollback()
+            session.session_id = session_id
+
+    @staticmethod
+    def sweep_abandoned(db: Session) -> int:
+        """Cierra como no completadas las sesiones sin actividad reciente"""
+        store = LiveSessionService.store
+        now = time.time()
+        closed = 0
+        for candidate in store.all():
+            if now - candidate.last_seen < ABANDON_AFTER:
+                continue
+            with store.lock(candidate.live_id):
+                # Puede haber recibido un heartbeat o haberse cerrado mientras tanto
+                session = store.pop(candidate.live_id)
+                if session is None:
+                    continue
+                if now - session.last_seen < ABANDON_AFTER:
+                    store.put(session)
+                    continue
+                if LiveSessionService._active_seconds(session, now) >= 60 or session.session_id is not None:
+                    try:
+                        LiveSessionService._write(db, session, now, completed=False)
+                        db.commit()
+                    except Exception:
+                        db.rollback()
+                        store.put(session)
+                        continue
+            closed += 1
+        return closed
+
+    @staticmethod
+    def _sweep_if_due(db: Session, now: float) -> None:
+        if now - LiveSessionService._swept_at > SWEEP_SECONDS:
+            LiveSessionService._swept_at = now
+            LiveSessionService.sweep_abandoned(db)
+
+    @staticmethod
+    def _sweep_loop() -> None:
+        while True:
+            time.sleep(SWEEP_SECONDS)
+            db = SessionLocal()
+            try:
+                LiveSessionService._sweep_if_due(db, time.time())
+            except Exception:
+                # Se reintenta en la próxima vuelta
+                db.rollback()
+            finally:
+                db.close()
+
+    @staticmethod
+    def start_sweeper() -> None:
+        """
+        Inicia el hilo que cierra las sesiones abandonadas cada SWEEP_SECONDS
+        (al arrancar la app). Corre en el mismo proceso porque el almacén por
+        defecto vive en su memoria.
+        """
+        if LiveSessionService._sweeper is None:
+            LiveSessionService._sweeper = threading.Thread(
+                target=LiveSessionService._sweep_loop, name="live-session-sweeper", daemon=True
+            )
+            LiveSessionService._sweeper.start()
+
+    @staticmethod
+    def start(db: Session, user_id: int, metodo_id: int, descripcion: Optional[str] = None) -> Dict:
+        """Inicia una sesión en curso (sin escribir en la BD)"""
+        if not db.query(Metodo.metodo_id).filter(Metodo.metodo_id == metodo_id).first():
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Método no encontrado")
+
+        now = time.time()
+        LiveSessionService._sweep_if_due(db, now)
+
+        session = LiveSession(
+            live_id=uuid.uuid4().hex,
+            user_id=user_id,
+            metodo_id=metodo_id,
+            descripcion=descripcion,
+            started_at=datetime.now(),
+            now=now
+        )
+        LiveSessionService.store.put(session)
+        return LiveSessionService.to_state(session, now)
+
+    @staticmethod
+    def get_state(live_id: str, user_id: int) -> Dict:
+        return LiveSessionService.to_state(LiveSessionService._get_owned(live_id, user_id))
+
+    @staticmethod
+    def _update(
+        db: Session,
+        live_id: str,
+        user_id: int,
+        change: Callable[[LiveSession, float], None]
+    ) -> Dict:
+        """Aplica un evento del cliente bajo el candado de la sesión (con checkpoint si toca)"""
+        store = LiveSessionService.store
+        with store.lock(live_id):
+            session = LiveSessionService._get_owned(live_id, user_id)
+            now = time.time()
+            change(session, now)
+            LiveSessionService._checkpoint_if_due(db, session, now)
+            store.put(session)
+            state = LiveSessionService.to_state(session, now)
+
+        # Fuera del candado: el barrido toma el de cada sesión que revisa
+        LiveSessionService._sweep_if_due(db, now)
+        return state
+
+    @staticmethod
+    def heartbeat(db: Session, live_id: str, user_id: int) -> Dict:
+        """Marca la sesión como viva; solo escribe en la BD si toca checkpoint"""
+        return LiveSessionService._update(db, live_id, user_id, LiveSessionService._settle)
+
+    @staticmethod
+    def pause(db: Session, live_id: str, user_id: int) -> Dict:
+        def change(session: LiveSession, now: float) -> None:
+            if session.resumed_at is not None:
+                session.active_seconds = LiveSessionService._active_seconds(session, now)
+                session.resumed_at = None
+            session.last_seen = now
+
+        return LiveSessionService._update(db, live_id, user_id, change)
+
+    @staticmethod
+    def resume(db: Session, live_id: str, user_id: int) -> Dict:
+        def change(session: LiveSession, now: float) -> None:
+            if session.resumed_at is None:
+                session.resumed_at = now
+            session.last_seen = now
+
+        return LiveSessionService._update(db, live_id, user_id, change)
+
+    @staticmethod
+    def finish(db: Session, live_id: str, user_id: int, completed: bool = True) -> SesionEstudio:
+        """
+        Finaliza la sesión: escribe (o completa) la fila de sesion_estudio y,
+        si fue completada, suma los minutos al tiempo total del usuario.
+
+        La sesión se saca del almacén al empezar (bajo su candado), así un
+        segundo cierre concurrente recibe 404 en lugar de escribir otra fila.
+        Si la escritura falla se devuelve al almacén para poder reintentar.
+        """
+        store = LiveSessionService.store
+        with store.lock(live_id):
+            session = store.pop(live_id)
+            if session is not None and session.user_id != user_id:
+                store.put(session)
+                session = None
+            if session is None:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Sesión en curso no encontrada")
+
+            now = time.time()
+            LiveSessionService._settle(session, now)
+            session_id = session.session_id
+
+            try:
+                LiveSessionService._write(db, session, now, completed)
+                minutes = int(LiveSessionService._active_seconds(session, now) // 60)
+                if completed and minutes:
+                    db.query(Usuario).filter(Usuario.user_id == user_id).update(
+                        {"total_studied_time": Usuario.total_studied_time + minutes},
+                        synchronize_session=False
+                    )
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                session.session_id = session_id
+                store.put(session)
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail=f"Error al finalizar la sesión: {str(e)}"
+                )
+
+        return db.query(SesionEstudio).filter(SesionEstudio.session_id == session.session_id).first()
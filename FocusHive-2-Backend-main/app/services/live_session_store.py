@@ -0,0 +1,114 @@
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import ContextManager, Dict, List, Optional
+
+# Candados del almacén en memoria (se reparten por hash del live_id)
+LOCK_STRIPES = 64
+
+
+class LiveSession:
+    """Estado de una sesión de estudio en curso (vive en memoria hasta finalizar)"""
+
+    __slots__ = (
+        "live_id", "user_id", "metodo_id", "descripcion", "started_at",
+        "active_seconds", "resumed_at", "last_seen", "session_id", "checkpointed_at"
+    )
+
+    def __init__(
+        self,
+        live_id: str,
+        user_id: int,
+        metodo_id: int,
+        descripcion: Optional[str],
+        started_at: datetime,
+        now: float
+    ):
+        self.live_id = live_id
+        self.user_id = user_id
+        self.metodo_id = metodo_id
+        self.descripcion = descripcion
+        self.started_at = started_at
+        self.active_seconds = 0.0  # Tiempo activo acumulado hasta la última pausa
+        self.resumed_at: Optional[float] = now  # None mientras está en pausa
+        self.last_seen = now  # Último heartbeat o evento del cliente
+        self.session_id: Optional[int] = None  # Fila de sesion_estudio tras el primer checkpoint
+        self.checkpointed_at = now
+
+    def to_dict(self) -> Dict:
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "LiveSession":
+        session = cls.__new__(cls)
+        for slot in cls.__slots__:
+            setattr(session, slot, data[slot])
+        return session
+
+
+class LiveSessionStore(ABC):
+    """
+    Almacén de sesiones en curso. La implementación por defecto es en memoria
+    (un solo proceso); con varios workers se puede usar un almacén compartido
+    (por ejemplo, Redis guardando LiveSession.to_dict()) con la misma interfaz.
+
+    El servicio siempre llama a put() después de modificar una sesión, así que
+    los almacenes compartidos no dependen de mutar el objeto en memoria. Cada
+    modificación se hace dentro de lock(live_id), que en un almacén compartido
+    debe ser un candado compartido entre workers.
+    """
+
+    @abstractmethod
+    def get(self, live_id: str) -> Optional[LiveSession]:
+        ...
+
+    @abstractmethod
+    def put(self, session: LiveSession) -> None:
+        ...
+
+    @abstractmethod
+    def pop(self, live_id: str) -> Optional[LiveSession]:
+        """Quita la sesión y la devuelve en una sola operación (None si no existe)"""
+
+    @abstractmethod
+    def delete(self, live_id: str) -> None:
+        ...
+
+    @abstractmethod
+    def all(self) -> List[LiveSession]:
+        ...
+
+    @abstractmethod
+    def lock(self, live_id: str) -> ContextManager:
+        """Candado de una sesión: serializa heartbeats, checkpoints y el cierre"""
+
+
+class InMemoryLiveSessionStore(LiveSessionStore):
+
+    def __init__(self):
+        self._sessions: Dict[str, LiveSession] = {}
+        self._lock = threading.Lock()
+        self._session_locks = [threading.Lock() for _ in range(LOCK_STRIPES)]
+
+    def get(self, live_id: str) -> Optional[LiveSession]:
+        with self._lock:
+            return self._sessions.get(live_id)
+
+    def put(self, session: LiveSession) -> None:
+        with self._lock:
+            self._sessions[session.live_id] = session
+
+    def pop(self, live_id: str) -> Optional[LiveSession]:
+        with self._lock:
+            return self._sessions.pop(live_id, None)
+
+    def delete(self, live_id: str) -> None:
+        with self._lock:
+            self._sessions.pop(live_id, None)
+
+    def all(self) -> List[LiveSession]:
+        with self._lock:
+            return list(self._sessions.values())
+
+    def lock(self, live_id: str) -> ContextManager:
+        return self._session_locks[hash(live_id) % LOCK_STRIPES]
@@ -0,0 +1,129 @@
+from sqlalchemy.orm import Session
+from fastapi import HTTPException, status
+from typing import Callable, Dict, List, Optional
+from datetime import datetime
+
+from app.utils.text_delta import apply_text_delta
+from app.utils.note_utils import note_preview, note_search_text
+
+
+class NoteAutosaveService:
+    """Autoguardado incremental de notas (Cornell / Feynman) con control de revisión"""
+
+    @staticmethod
+    def apply_changes(
+        db: Session,
+        model,
+        pk_column,
+        doc_id: int,
+        user_id: int,
+        base_revision: int,
+        changes: Dict[str, List],
+        not_found_detail: str,
+        on_saved: Optional[Callable[[Dict, Dict], None]] = None
+    ) -> Dict:
+        """
+        Aplica deltas de texto por sección sobre la revisión indicada.
+
+        Solo se leen y se escriben las columnas con cambios (y la vista previa
+        o los términos indexados si cambia alguna de sus secciones). La actualización
+        exige que la revisión no haya cambiado (`WHERE revision = base`), así
+        dos autoguardados concurrentes no se pisan.
+
+        Args:
+            on_saved: Se llama con (valores_anteriores, valores_nuevos) de los
+                campos modificados antes del commit (por ejemplo, para el historial)
+
+        Returns:
+            {'revision', 'updated_fields', 'updated_at'}
+        """
+        fields = list(changes)
+        # La vista previa y los términos indexados dependen de varias secciones:
+        # se leen también las que no cambian
+        for derived_from in (model.PREVIEW_FIELDS, model.SEARCH_FIELDS):
+            if set(changes) & set(derived_from):
+                fields += [field for field in derived_from if field not in fields]
+
+        current = db.query(model.revision, *[getattr(model, field) for field in fields]).filter(
+            pk_column == doc_id,
+            model.user_id == user_id
+        ).first()
+
+        if current is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=not_found_detail)
+
+        if current.revision != base_revision:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"El documento cambió (revisión actual {current.revision}); recárgalo antes de guardar"
+            )
+
+        values = {}
+        for field, ops in changes.items():
+            try:
+                # El cliente (JavaScript) cuenta posiciones en unidades UTF-16
+                new_text = apply_text_delta(getattr(current, field), ops, units="utf16")
+            except ValueError as e:
+                raise HTTPException(
+                    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    detail=f"{field}: {e}"
+                )
+            if new_text != (getattr(current, field) or ""):
+                values[field] = new_text
+
+        if not values:
+            return {"revision": current.revision, "updated_fields": [], "updated_at": None}
+
+        for field, value in values.items():
+            column = getattr(model, field)
+            max_length = getattr(column.type, "length", None)
+            if max_length and len(value) > max_length:
+                raise HTTPException(
+                    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    detail=f"{field}: supera los {max_length} caracteres"
+                )
+            if not column.nullable and not value.strip():
+                raise HTTPException(
+                    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    detail=f"{field}: no puede quedar vacío"
+                )
+
+        if set(values) & set(model.PREVIEW_FIELDS):
+            values["preview"] = note_preview(
+                *(values.get(field, getattr(current, field)) for field in model.PREVIEW_FIELDS)
+            )
+        if set(values) & set(model.SEARCH_FIELDS):
+            values["search_text"] = note_search_text(
+                *(values.get(field, getattr(current, field)) for field in model.SEARCH_FIELDS)
+            )
+
+        updated_at = datetime.now()
+        updated = db.query(model).filter(
+            pk_column == doc_id,
+            model.user_id == user_id,
+            model.revision == base_revision
+        ).update(
+            {**values, "revision": base_revision + 1, "updated_at": updated_at},
+            synchronize_session=False
+        )
+
+        if not updated:
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="El documento cambió mientras se guardaba; recárgalo antes de guardar"
+            )
+
+        if on_saved is not None:
+            edited = [field for field in values if field in changes]
+            on_saved(
+                {field: getattr(current, field) for field in edited},
+                {field: values[field] for field in edited}
+            )
+
+        db.commit()
+        return {
+            "revision": base_revision + 1,
+            "updated_fields": sorted(field for field in values if field in changes),
+            "updated_at": updated_at
+        }
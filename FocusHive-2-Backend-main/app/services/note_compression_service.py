@@ -0,0 +1,104 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import update, type_coerce, Text
+from typing import Dict
+
+from app.database.connection import CompressedText, COMPRESSED_PREFIX
+from app.models.cornell import CornellNote
+from app.models.feynman import FeynmanWork
+from app.utils.note_utils import note_preview, note_search_text
+
+# Notas revisadas por transacción
+COMPRESSION_BATCH_SIZE = 200
+
+# Modelo -> (clave primaria, columnas comprimidas)
+COMPRESSED_NOTE_COLUMNS = {
+    CornellNote: (CornellNote.note_id, ("notes_section", "summary_section")),
+    FeynmanWork: (FeynmanWork.feynman_id, ("explanation", "gaps_identified", "final_version")),
+}
+
+
+class NoteCompressionService:
+    """Migración en segundo plano de las notas guardadas antes de la compresión"""
+
+    @staticmethod
+    def compress_existing(
+        db: Session,
+        model,
+        batch_size: int = COMPRESSION_BATCH_SIZE
+    ) -> int:
+        """
+        Recorre la tabla por lotes (por clave primaria), comprime las secciones
+        largas guardadas en texto plano y completa la vista previa y los
+        términos indexados que falten.
+        No modifica `revision` ni `updated_at`.
+
+        Returns:
+            Número de notas reescritas
+        """
+        pk, columns = COMPRESSED_NOTE_COLUMNS[model]
+        compressed_type = CompressedText()
+        last_id = 0
+        rewritten = 0
+
+        while True:
+            # type_coerce lee el valor guardado sin descomprimirlo
+            rows = db.query(
+                pk.label("id"),
+                model.preview,
+                model.search_text,
+                model.updated_at,
+                *[type_coerce(getattr(model, column), Text).label(column) for column in columns]
+            ).filter(pk > last_id).order_by(pk).limit(batch_size).all()
+
+            if not rows:
+                break
+            last_id = rows[-1].id
+
+            groups: Dict[tuple, list] = {}
+            for row in rows:
+                raw = {column: getattr(row, column) for column in columns}
+                plain = [
+                    column for column, value in raw.items()
+                    if value and not value.startswith(COMPRESSED_PREFIX)
+                    and len(value.encode("utf-8")) >= compressed_type.threshold
+                ]
+                values = {column: raw[column] for column in plain}
+
+                if row.preview is None or row.search_text is None:
+                    decoded = {
+                        column: compressed_type.process_result_value(value, None)
+                        for column, value in raw.items()
+                    }
+                    preview = note_preview(*(decoded[field] for field in model.PREVIEW_FIELDS))
+                    if row.preview is None and preview is not None:
+                        values["preview"] = preview
+                    search_text = note_search_text(*(decoded[field] for field in model.SEARCH_FIELDS))
+                    if row.search_text is None and search_text is not None:
+                        values["search_text"] = search_text
+
+                if not values:
+                    continue
+
+                values[pk.key] = row.id
+                values["updated_at"] = row.updated_at
+                groups.setdefault(tuple(sorted(values)), []).append(values)
+
+            try:
+                for group in groups.values():
+                    db.execute(update(model), group)
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+
+            rewritten += sum(len(group) for group in groups.values())
+
+        return rewritten
+
+    @staticmethod
+    def compress_all(db: Session, batch_size: int = COMPRESSION_BATCH_SIZE) -> Dict[str, int]:
+        """Migra todas las tablas de notas. Devuelve {tabla: notas_reescritas}"""
+        return {
+            model.__tablename__: NoteCompressionService.compress_existing(db, model, batch_size)
+            for model in COMPRESSED_NOTE_COLUMNS
+        }
@@ -0,0 +1,202 @@
+import threading
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+from typing import List, Dict, Optional, Tuple
+
+from app.models.cornell import CornellNote
+from app.models.feynman import FeynmanWork
+from app.utils.text_search import InvertedIndex, mysql_boolean_query, highlight_snippet
+
+# Campos indexados por tipo de nota con su peso en el ranking, en orden de
+# preferencia para elegir el fragmento a mostrar
+CORNELL_FIELDS = (
+    ("title", 3.0),
+    ("cues_section", 2.0),
+    ("subject", 2.0),
+    ("summary_section", 1.5),
+    ("notes_section", 1.0),
+)
+FEYNMAN_FIELDS = (
+    ("topic", 3.0),
+    ("final_version", 1.5),
+    ("explanation", 1.0),
+    ("gaps_identified", 1.0),
+)
+
+# tipo -> (modelo, clave primaria, campos, columnas del índice FULLTEXT en el orden del modelo)
+NOTE_TYPES = {
+    "cornell": (
+        CornellNote, CornellNote.note_id, CORNELL_FIELDS,
+        "title, subject, cues_section, search_text"
+    ),
+    "feynman": (
+        FeynmanWork, FeynmanWork.feynman_id, FEYNMAN_FIELDS,
+        "topic, search_text"
+    ),
+}
+
+
+class NoteSearchService:
+    """
+    Búsqueda de texto unificada sobre notas Cornell y trabajos Feynman.
+
+    En MySQL usa los índices FULLTEXT de cada tabla. En otros motores
+    (desarrollo local) usa un índice invertido en memoria por usuario que
+    se actualiza desde los endpoints de creación, edición y borrado.
+
+    Las secciones que se guardan comprimidas (ver CompressedText) no se
+    indexan directamente: el índice FULLTEXT cubre la columna `search_text`,
+    con sus términos en texto plano.
+    """
+
+    # user_id -> índice con documentos ("cornell" | "feynman", id)
+    _indexes: Dict[int, InvertedIndex] = {}
+    _lock = threading.Lock()
+
+    @staticmethod
+    def search(
+        db: Session,
+        user_id: int,
+        query: str,
+        note_type: Optional[str] = None,
+        limit: int = 20
+    ) -> List[Dict]:
+        """
+        Busca notas del usuario y devuelve los resultados con un fragmento resaltado.
+
+        Args:
+            note_type: 'cornell', 'feynman' o None para ambos
+
+        Returns:
+            Lista de resultados ordenada por relevancia
+        """
+        types = [note_type] if note_type else list(NOTE_TYPES)
+
+        if db.get_bind().dialect.name == "mysql":
+            hits = NoteSearchService._search_mysql(db, user_id, query, types, limit)
+        else:
+            index = NoteSearchService._get_user_index(db, user_id)
+            with NoteSearchService._lock:
+                hits = index.search(query, limit=limit, doc_filter=lambda doc: doc[0] in types)
+
+        if not hits:
+            return []
+
+        # Cargar solo las notas encontradas
+        ids_by_type: Dict[str, List[int]] = {}
+        for (kind, doc_id), _ in hits:
+            ids_by_type.setdefault(kind, []).append(doc_id)
+
+        docs = {}
+        for kind, ids in ids_by_type.items():
+            model, pk, _, _ = NOTE_TYPES[kind]
+            for doc in db.query(model).filter(pk.in_(ids), model.user_id == user_id).all():
+                docs[(kind, getattr(doc, pk.key))] = doc
+
+        results = []
+        for key, score in hits:
+            doc = docs.get(key)
+            if doc is None:
+                continue
+            kind, doc_id = key
+            field, snippet = NoteSearchService._best_snippet(doc, NOTE_TYPES[kind][2], query)
+            results.append({
+                "type": kind,
+                "id": doc_id,
+                "title": doc.title if kind == "cornell" else doc.topic,
+                "score": round(score, 4),
+                "field": field,
+                "snippet": snippet,
+                "updated_at": doc.updated_at or doc.created_at
+            })
+
+        return results
+
+    @staticmethod
+    def _best_snippet(doc, fields, query: str) -> Tuple[Optional[str], Optional[str]]:
+        """Primer campo (por peso) que contiene la consulta y su fragmento resaltado"""
+        for field, _ in fields:
+            snippet = highlight_snippet(getattr(doc, field) or "", query)
+            if snippet:
+                return field, snippet
+        return None, None
+
+    @staticmethod
+    def _search_mysql(
+        db: Session,
+        user_id: int,
+        query: str,
+        types: List[str],
+        limit: int
+    ) -> List[Tuple[Tuple[str, int], float]]:
+        boolean_query = mysql_boolean_query(query)
+        if not boolean_query:
+            return []
+
+        hits = []
+        for kind in types:
+            model, pk, _, columns = NOTE_TYPES[kind]
+            match = f"MATCH({columns}) AGAINST (:q IN BOOLEAN MODE)"
+            sql = f"""
+                SELECT {pk.key} AS doc_id, {match} AS score
+                FROM {model.__tablename__}
+                WHERE user_id = :user_id AND {match}
+                ORDER BY score DESC
+                LIMIT :limit
+            """
+            rows = db.execute(text(sql), {"q": boolean_query, "user_id": user_id, "limit": limit})
+            hits.extend(((kind, row.doc_id), float(row.score)) for row in rows)
+
+        hits.sort(key=lambda hit: hit[1], reverse=True)
+        return hits[:limit]
+
+    @staticmethod
+    def _document_fields(doc, fields) -> List[Tuple[Optional[str], float]]:
+        return [(getattr(doc, field), weight) for field, weight in fields]
+
+    @staticmethod
+    def _get_user_index(db: Session, user_id: int) -> InvertedIndex:
+        """Obtiene el índice en memoria del usuario, construyéndolo la primera vez"""
+        with NoteSearchService._lock:
+            index = NoteSearchService._indexes.get(user_id)
+            if index is not None:
+                return index
+
+        index = InvertedIndex()
+        for kind, (model, pk, fields, _) in NOTE_TYPES.items():
+            for doc in db.query(model).filter(model.user_id == user_id).yield_per(500):
+                index.add((kind, getattr(doc, pk.key)), NoteSearchService._document_fields(doc, fields))
+
+        with NoteSearchService._lock:
+            return NoteSearchService._indexes.setdefault(user_id, index)
+
+    @staticmethod
+    def index_note(note_type: str, doc) -> None:
+        """Indexa (o reindexa) una nota después de crearla o editarla"""
+        with NoteSearchService._lock:
+            index = NoteSearchService._indexes.get(doc.user_id)
+            if index is None:
+                # Se construirá completo en la primera búsqueda del usuario
+                return
+            _, pk, fields, _ = NOTE_TYPES[note_type]
+            index.add((note_type, getattr(doc, pk.key)), NoteSearchService._document_fields(doc, fields))
+
+    @staticmethod
+    def remove_note(note_type: str, user_id: int, doc_id: int) -> None:
+        """Quita una nota borrada del índice"""
+        with NoteSearchService._lock:
+            index = NoteSearchService._indexes.get(user_id)
+            if index is not None:
+                index.remove((note_type, doc_id))
+
+    @staticmethod
+    def reindex_note(db: Session, note_type: str, user_id: int, doc_id: int) -> None:
+        """Reindexa una nota por id (solo si el índice del usuario está cargado)"""
+        with NoteSearchService._lock:
+            if user_id not in NoteSearchService._indexes:
+                return
+
+        model, pk, _, _ = NOTE_TYPES[note_type]
+        doc = db.query(model).filter(pk == doc_id).first()
+        if doc is not None:
+            NoteSearchService.index_note(note_type, doc)
@@ -0,0 +1,190 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import insert, func, union, union_all, select
+from typing import Optional, List, Dict
+from datetime import datetime
+
+from app.models.tracking_session import TrackingSession
+from app.models.tracking_archive import TrackingSessionArchive
+from app.models.user_tracking_prefs import UserTrackingPrefs
+from app.utils.dashboard_utils import DashboardCalculator
+
+# Filas movidas por transacción (evita bloqueos largos sobre tracking_sessions)
+ARCHIVE_BATCH_SIZE = 1000
+
+
+class TrackingArchiveService:
+    """Servicio para separar sesiones de seguimiento calientes (semana actual) y archivadas"""
+
+    @staticmethod
+    def get_reset_at(db: Session, user_id: int) -> Optional[datetime]:
+        """Obtiene la marca del último reinicio de semana del usuario"""
+        return db.query(UserTrackingPrefs.week_reset_at).filter(
+            UserTrackingPrefs.user_id == user_id
+        ).scalar()
+
+    @staticmethod
+    def get_visible_since(db: Session, user_id: int, cutoff_date: datetime) -> datetime:
+        """
+        Fecha desde la que las sesiones son visibles para el usuario.
+        Combina el rango pedido con la marca de reinicio de semana.
+        """
+        reset_at = TrackingArchiveService.get_reset_at(db, user_id)
+        if reset_at and reset_at > cutoff_date:
+            return reset_at
+        return cutoff_date
+
+    @staticmethod
+    def visible_sessions(db: Session, user_id: int, since: datetime):
+        """
+        Subconsulta con las sesiones del usuario desde `since`. Si el rango
+        empieza antes de la semana actual, incluye también las archivadas
+        (el job de archivado mueve ahí todo lo anterior a la semana ISO actual).
+        """
+        columns = ("session_id", "user_id", "day_of_week", "hours", "method", "description", "created_at")
+        hot = select(*[getattr(TrackingSession, c) for c in columns]).where(
+            TrackingSession.user_id == user_id,
+            TrackingSession.created_at >= since
+        )
+
+        week_start, _ = DashboardCalculator.get_date_range('week')
+        if since >= week_start:
+            return hot.subquery()
+
+        archived = select(*[getattr(TrackingSessionArchive, c) for c in columns]).where(
+            TrackingSessionArchive.user_id == user_id,
+            TrackingSessionArchive.created_at >= since
+        )
+        return union_all(hot, archived).subquery()
+
+    @staticmethod
+    def reset_week(db: Session, user_id: int) -> None:
+        """
+        Reinicia la semana del usuario con una sola actualización de metadatos.
+        Las sesiones anteriores se archivan después en segundo plano.
+        """
+        prefs = db.query(UserTrackingPrefs).filter(
+            UserTrackingPrefs.user_id == user_id
+        ).first()
+
+        if not prefs:
+            prefs = UserTrackingPrefs(user_id=user_id, weekly_goal=20.0, achievements="[]")
+            db.add(prefs)
+
+        prefs.week_reset_at = datetime.now()
+        db.commit()
+
+    @staticmethod
+    def archive_user_sessions(
+        db: Session,
+        user_id: int,
+        batch_size: int = ARCHIVE_BATCH_SIZE
+    ) -> int:
+        """
+        Mueve al archivo las sesiones frías de un usuario: las de semanas cerradas
+        y las anteriores a su último reinicio. Trabaja por lotes acotados.
+
+        Returns:
+            Número de sesiones archivadas
+        """
+        week_start, _ = DashboardCalculator.get_date_range('week')
+        cutoff = TrackingArchiveService.get_visible_since(db, user_id, week_start)
+        moved = 0
+
+        while True:
+            sessions = db.query(TrackingSession).filter(
+                TrackingSession.user_id == user_id,
+                TrackingSession.created_at < cutoff
+            ).order_by(TrackingSession.session_id).limit(batch_size).all()
+
+            if not sessions:
+                break
+
+            rows = []
+            for s in sessions:
+                iso_year, iso_week, _ = (s.created_at or cutoff).isocalendar()
+                rows.append({
+                    "session_id": s.session_id,
+                    "user_id": s.user_id,
+                    "iso_year": iso_year,
+                    "iso_week": iso_week,
+                    "day_of_week": s.day_of_week,
+                    "hours": s.hours,
+                    "method": s.method,
+                    "description": s.description,
+                    "created_at": s.created_at
+                })
+
+            try:
+                db.execute(insert(TrackingSessionArchive), rows)
+                db.query(TrackingSession).filter(
+                    TrackingSession.session_id.in_([s.session_id for s in sessions])
+                ).delete(synchronize_session=False)
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+
+            db.expunge_all()
+            moved += len(rows)
+
+        return moved
+
+    @staticmethod
+    def archive_cold_sessions(db: Session, batch_size: int = ARCHIVE_BATCH_SIZE) -> Dict[int, int]:
+        """
+        Archiva las sesiones frías de todos los usuarios.
+        Pensado para ejecutarse periódicamente (por ejemplo, cada lunes).
+
+        Returns:
+            {user_id: sesiones_archivadas}
+        """
+        week_start, _ = DashboardCalculator.get_date_range('week')
+
+        candidates = union(
+            db.query(TrackingSession.user_id).filter(
+                TrackingSession.created_at < week_start
+            ).distinct().statement,
+            db.query(TrackingSession.user_id).join(
+                UserTrackingPrefs, UserTrackingPrefs.user_id == TrackingSession.user_id
+            ).filter(
+                TrackingSession.created_at < UserTrackingPrefs.week_reset_at
+            ).distinct().statement
+        )
+        user_ids = [row[0] for row in db.execute(candidates).all()]
+
+        result = {}
+        for user_id in user_ids:
+            moved = TrackingArchiveService.archive_user_sessions(db, user_id, batch_size)
+            if moved:
+                result[user_id] = moved
+
+        return result
+
+    @staticmethod
+    def get_weekly_history(db: Session, user_id: int, weeks: int = 12) -> List[Dict]:
+        """Obtiene totales por semana ISO de las sesiones archivadas (más recientes primero)"""
+        results = db.query(
+            TrackingSessionArchive.iso_year,
+            TrackingSessionArchive.iso_week,
+            func.sum(TrackingSessionArchive.hours).label('total_hours'),
+            func.count(TrackingSessionArchive.session_id).label('sessions_count')
+        ).filter(
+            TrackingSessionArchive.user_id == user_id
+        ).group_by(
+            TrackingSessionArchive.iso_year,
+            TrackingSessionArchive.iso_week
+        ).order_by(
+            TrackingSessionArchive.iso_year.desc(),
+            TrackingSessionArchive.iso_week.desc()
+        ).limit(weeks).all()
+
+        return [
+            {
+                "iso_year": r.iso_year,
+                "iso_week": r.iso_week,
+                "week_start": datetime.fromisocalendar(r.iso_year, r.iso_week, 1).date(),
+                "total_hours": round(r.total_hours or 0, 1),
+                "sessions_count": r.sessions_count
+            }
+            for r in results
+        ]
@@ -0,0 +1,156 @@
+import threading
+import time
+from sqlalchemy.orm import Session
+from sqlalchemy import func
+from typing import Dict, Optional
+
+from app.models.user import Usuario
+from app.utils.bloom_filter import BloomFilter
+
+# Cada cuánto se agregan los usuarios registrados desde otros procesos
+REFRESH_SECONDS = 5
+
+# Cada cuánto se reconstruye completo (recoge cambios de username/email
+# hechos en otros procesos y descarta los valores ya liberados)
+REBUILD_SECONDS = 600
+
+# Margen de capacidad sobre los usuarios actuales antes de reconstruir
+CAPACITY_FACTOR = 2
+MIN_CAPACITY = 10000
+
+
+class UserAvailabilityService:
+    """
+    Disponibilidad de usernames y emails con filtros de Bloom en memoria.
+
+    Si el filtro dice que un valor no está, está libre y no se consulta la BD.
+    Solo las posibles coincidencias (ocupados o falsos positivos) se confirman
+    con una consulta por índice único. El índice único de la tabla sigue
+    siendo la garantía final al registrar.
+    """
+
+    _filters: Optional[Dict[str, BloomFilter]] = None
+    _max_user_id = 0
+    _refreshed_at = 0.0
+    _built_at = 0.0
+    _lock = threading.Lock()
+    # Solo una reconstrucción a la vez por proceso
+    _rebuild_lock = threading.Lock()
+
+    @staticmethod
+    def _key(value: str) -> str:
+        # Las comparaciones de la BD no distinguen mayúsculas
+        return value.strip().lower()
+
+    @staticmethod
+    def rebuild(db: Session) -> None:
+        """Construye los filtros con todos los usuarios (al iniciar y periódicamente)"""
+        total = db.query(func.count(Usuario.user_id)).scalar() or 0
+        capacity = max(MIN_CAPACITY, total * CAPACITY_FACTOR)
+        filters = {"username": BloomFilter(capacity), "email": BloomFilter(capacity)}
+
+        max_user_id = 0
+        key = UserAvailabilityService._key
+        for user_id, username, email in db.query(
+            Usuario.user_id, Usuario.username, Usuario.email
+        ).yield_per(5000):
+            filters["username"].add(key(username))
+            filters["email"].add(key(email))
+            max_user_id = max(max_user_id, user_id)
+
+        now = time.monotonic()
+        with UserAvailabilityService._lock:
+            UserAvailabilityService._filters = filters
+            UserAvailabilityService._max_user_id = max_user_id
+            UserAvailabilityService._refreshed_at = now
+            UserAvailabilityService._built_at = now
+
+    @staticmethod
+    def _needs_rebuild(now: float) -> bool:
+        cls = UserAvailabilityService
+        return cls._filters is None or now - cls._built_at > REBUILD_SECONDS or cls._filters["username"].is_full
+
+    @staticmethod
+    def _ensure_fresh(db: Session) -> Dict[str, BloomFilter]:
+        cls = UserAvailabilityService
+        now = time.monotonic()
+
+        if cls._needs_rebuild(now):
+            # Sin filtros hay que esperar a la reconstrucción; con filtros, si otra
+            # petición ya está reconstruyendo, se siguen usando los actuales
+            if cls._rebuild_lock.acquire(blocking=cls._filters is None):
+                try:
+                    # Otra petición pudo terminar la reconstrucción mientras se esperaba
+                    if cls._needs_rebuild(time.monotonic()):
+                        cls.rebuild(db)
+                finally:
+                    cls._rebuild_lock.release()
+                return cls._filters
+
+        if now - cls._refreshed_at > REFRESH_SECONDS:
+            # Usuarios nuevos (rango sobre la clave primaria)
+            new_users = db.query(Usuario.user_id, Usuario.username, Usuario.email).filter(
+                Usuario.user_id > cls._max_user_id
+            ).all()
+            with cls._lock:
+                for user_id, username, email in new_users:
+                    cls._filters["username"].add(cls._key(username))
+                    cls._filters["email"].add(cls._key(email))
+                    cls._max_user_id = max(cls._max_user_id, user_id)
+                cls._refreshed_at = now
+
+        return cls._filters
+
+    @staticmethod
+    def add(username: Optional[str] = None, email: Optional[str] = None) -> None:
+        """Registra valores ocupados tras un registro o cambio de perfil"""
+        with UserAvailabilityService._lock:
+            filters = UserAvailabilityService._filters
+            if filters is None:
+                # Se construirá completo en la próxima consulta
+                return
+            if username:
+                filters["username"].add(UserAvailabilityService._key(username))
+            if email:
+                filters["email"].add(UserAvailabilityService._key(email))
+
+    @staticmethod
+    def might_be_taken(db: Session, field: str, value: str) -> bool:
+        """False si el valor seguro está libre (sin consultar la BD)"""
+        filters = UserAvailabilityService._ensure_fresh(db)
+        with UserAvailabilityService._lock:
+            return UserAvailabilityService._key(value) in filters[field]
+
+    @staticmethod
+    def is_available(db: Session, field: str, value: str, exclude_user_id: Optional[int] = None) -> bool:
+        """
+        Disponibilidad de un username o email.
+
+        Args:
+            field: 'username' o 'email'
+            exclude_user_id: Usuario que ya lo usa y no cuenta como ocupado (edición de perfil)
+        """
+        if not UserAvailabilityService.might_be_taken(db, field, value):
+            return True
+
+        column = getattr(Usuario, field)
+        query = db.query(Usuario.user_id).filter(column == value)
+        if exclude_user_id:
+            query = query.filter(Usuario.user_id != exclude_user_id)
+        return query.first() is None
+
+    @staticmethod
+    def check(db: Session, username: Optional[str] = None, email: Optional[str] = None) -> Dict:
+        """Disponibilidad de los valores enviados (para el formulario de registro)"""
+        result = {}
+        if username is not None:
+            result["username"] = {
+                "value": username,
+                "available": UserAvailabilityService.is_available(db, "username", username)
+            }
+        if email is not None:
+            result["email"] = {
+                "value": email,
+                "available": UserAvailabilityService.is_available(db, "email", email)
+            }
+        return result
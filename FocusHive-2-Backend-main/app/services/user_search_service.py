@@ -0,0 +1,190 @@
+import math
+from sqlalchemy.orm import Session
+from sqlalchemy import select, func, case, or_, and_, insert
+from fastapi import HTTPException, status
+from typing import Dict, List, Optional, Tuple
+
+from app.models.user import Usuario
+from app.models.user_search import UserSearchGram
+from app.utils.text_search import trigrams
+
+# Fracción mínima de trigramas de la consulta que debe tener un usuario para
+# aparecer (tolera errores de escritura que dejen al menos la mitad intactos;
+# un error cambia hasta 3 trigramas, así que palabras cortas con un error al
+# inicio no coinciden)
+MIN_SIMILARITY = 0.5
+
+# Usuarios reindexados por lote en el job de reconstrucción
+REINDEX_BATCH_SIZE = 1000
+
+
+class UserSearchService:
+    """
+    Búsqueda de usuarios por username y nombre completo sobre un índice de
+    trigramas (user_search_grams), con coincidencia por prefijo y tolerancia
+    a errores de escritura. Funciona igual en MySQL y en SQLite.
+    """
+
+    @staticmethod
+    def user_grams(username: Optional[str], full_name: Optional[str]) -> List[str]:
+        return trigrams(f"{username or ''} {full_name or ''}")
+
+    @staticmethod
+    def index_user(db: Session, user: Usuario) -> None:
+        """
+        Reemplaza los trigramas de un usuario (al registrarse o editar su perfil).
+        No hace commit: va en la misma transacción que el cambio del usuario.
+        """
+        db.query(UserSearchGram).filter(
+            UserSearchGram.user_id == user.user_id
+        ).delete(synchronize_session=False)
+
+        grams = UserSearchService.user_grams(user.username, user.full_name)
+        if grams:
+            db.execute(insert(UserSearchGram), [
+                {"gram": gram, "user_id": user.user_id} for gram in grams
+            ])
+
+    @staticmethod
+    def remove_user(db: Session, user_id: int) -> None:
+        """Quita a un usuario del índice. No hace commit."""
+        db.query(UserSearchGram).filter(
+            UserSearchGram.user_id == user_id
+        ).delete(synchronize_session=False)
+
+    @staticmethod
+    def rebuild(db: Session, batch_size: int = REINDEX_BATCH_SIZE) -> int:
+        """Reconstruye el índice completo por lotes de user_id (para usuarios existentes)"""
+        indexed = 0
+        last_id = 0
+        while True:
+            users = db.query(Usuario.user_id, Usuario.username, Usuario.full_name).filter(
+                Usuario.user_id > last_id
+            ).order_by(Usuario.user_id).limit(batch_size).all()
+            if not users:
+                return indexed
+
+            ids = [u.user_id for u in users]
+            db.query(UserSearchGram).filter(
+                UserSearchGram.user_id.in_(ids)
+            ).delete(synchronize_session=False)
+            rows = [
+                {"gram": gram, "user_id": u.user_id}
+                for u in users
+                for gram in UserSearchService.user_grams(u.username, u.full_name)
+            ]
+            if rows:
+                db.execute(insert(UserSearchGram), rows)
+            db.commit()
+
+            indexed += len(users)
+            last_id = ids[-1]
+
+    @staticmethod
+    def _ranked(query: str):
+        """
+        SELECT de los usuarios candidatos con su puntuación:
+        trigramas en común, más un bono si el username o alguna palabra del
+        nombre empieza con la consulta (y otro si el username es exacto).
+        Devuelve None si la consulta no tiene términos buscables.
+        """
+        grams = trigrams(query, prefix=True)
+        if not grams:
+            return None
+
+        min_hits = max(1, math.ceil(len(grams) * MIN_SIMILARITY))
+        hits = select(
+            UserSearchGram.user_id,
+            func.count().label("hits")
+        ).where(
+            UserSearchGram.gram.in_(grams)
+        ).group_by(UserSearchGram.user_id).having(func.count() >= min_hits).subquery()
+
+        term = query.strip().lower()
+        pattern = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        username = func.lower(Usuario.username)
+        full_name = func.lower(func.coalesce(Usuario.full_name, ""))
+        bonus = len(grams)
+
+        score = (
+            hits.c.hits
+            + case((username == term, bonus), else_=0)
+            + case((username.like(f"{pattern}%", escape="\\"), bonus), else_=0)
+            + case((or_(
+                full_name.like(f"{pattern}%", escape="\\"),
+                full_name.like(f"% {pattern}%", escape="\\")
+            ), bonus // 2), else_=0)
+        )
+
+        return select(
+            Usuario.user_id,
+            Usuario.username,
+            Usuario.full_name,
+            Usuario.avatar_url,
+            Usuario.level,
+            Usuario.is_premium,
+            score.label("score")
+        ).join(hits, hits.c.user_id == Usuario.user_id).where(Usuario.is_active == True)
+
+    @staticmethod
+    def _parse_cursor(cursor: str) -> Tuple[int, int]:
+        try:
+            score, user_id = cursor.split(":", 1)
+            return int(score), int(user_id)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Cursor de búsqueda inválido"
+            )
+
+    @staticmethod
+    def search(
+        db: Session,
+        query: str,
+        limit: int = 20,
+        cursor: Optional[str] = None
+    ) -> Dict:
+        """
+        Busca usuarios ordenados por relevancia (y user_id para desempatar).
+
+        Args:
+            cursor: Valor `next_cursor` de la página anterior ("score:user_id")
+
+        Returns:
+            {'users': [...], 'next_cursor': str | None}
+        """
+        ranked = UserSearchService._ranked(query)
+        if ranked is None:
+            return {"users": [], "next_cursor": None}
+
+        ranked = ranked.subquery()
+        stmt = select(ranked)
+        if cursor:
+            last_score, last_id = UserSearchService._parse_cursor(cursor)
+            stmt = stmt.where(or_(
+                ranked.c.score < last_score,
+                and_(ranked.c.score == last_score, ranked.c.user_id > last_id)
+            ))
+
+        rows = db.execute(
+            stmt.order_by(ranked.c.score.desc(), ranked.c.user_id).limit(limit + 1)
+        ).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        return {
+            "users": rows,
+            "next_cursor": f"{rows[-1].score}:{rows[-1].user_id}" if has_more else None
+        }
+
+    @staticmethod
+    def search_offset(db: Session, query: str, skip: int = 0, limit: int = 100) -> List:
+        """Misma búsqueda con paginación por offset (para el listado /users existente)"""
+        ranked = UserSearchService._ranked(query)
+        if ranked is None:
+            return []
+
+        ranked = ranked.subquery()
+        return db.execute(
+            select(ranked).order_by(ranked.c.score.desc(), ranked.c.user_id).offset(skip).limit(limit)
+        ).all()
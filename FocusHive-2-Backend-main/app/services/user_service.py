@@ -6,6 +6,10 @@ from app.models.user import Usuario
 from app.schemas.user import UserUpdateSchema, ChangePasswordSchema
 from app.utils.security import hash_password, verify_password
 from app.utils.validators import UserValidator
+from app.services.user_search_service import UserSearchService
+from app.services.user_availability_service import UserAvailabilityService
+from app.services.account_deletion_service import AccountDeletionService
+from app.services.user_stats_service import UserStatsService
 
 class UserService:
     """Servicio para operaciones CRUD del perfil de usuario"""
@@ -25,7 +29,7 @@ class UserService:
         Raises:
             HTTPException: Si el usuario no existe
         """
-        user = db.query(Usuario).filter(Usuario.user_id == user_id).first()
+        user = db.query(Usuario).filter(Usuario.user_id == user_id, Usuario.is_active == True).first()
         
         if not user:
             raise HTTPException(
@@ -50,7 +54,7 @@ class UserService:
         Raises:
             HTTPException: Si el usuario no existe
         """
-        user = db.query(Usuario).filter(Usuario.username == username).first()
+        user = db.query(Usuario).filter(Usuario.username == username, Usuario.is_active == True).first()
         
         if not user:
             raise HTTPException(
@@ -66,7 +70,7 @@ class UserService:
         skip: int = 0, 
         limit: int = 100,
         search: Optional[str] = None
-    ) -> List[Usuario]:
+    ) -> List:
         """
         Obtiene una lista paginada de usuarios.
         
@@ -74,22 +78,16 @@ class UserService:
             db: Sesión de base de datos
             skip: Número de registros a saltar (para paginación)
             limit: Número máximo de registros a retornar
-            search: Término de búsqueda opcional (busca en username y full_name)
+            search: Término de búsqueda opcional (busca en username y full_name
+                con el índice de trigramas, ordenado por relevancia)
         
         Returns:
             Lista de usuarios
         """
-        query = db.query(Usuario)
-        
-        # Aplicar filtro de búsqueda si existe
         if search:
-            search_pattern = f"%{search}%"
-            query = query.filter(
-                (Usuario.username.like(search_pattern)) |
-                (Usuario.full_name.like(search_pattern))
-            )
+            return UserSearchService.search_offset(db, search, skip=skip, limit=limit)
         
-        users = query.offset(skip).limit(limit).all()
+        users = db.query(Usuario).filter(Usuario.is_active == True).order_by(Usuario.user_id).offset(skip).limit(limit).all()
         return users
     
     @staticmethod
@@ -150,8 +148,12 @@ class UserService:
             for field, value in update_dict.items():
                 setattr(user, field, value)
             
+            if 'username' in update_dict or 'full_name' in update_dict:
+                UserSearchService.index_user(db, user)
+            
             db.commit()
             db.refresh(user)
+            UserAvailabilityService.add(update_dict.get('username'), update_dict.get('email'))
             
             return user
             
@@ -231,54 +233,44 @@ class UserService:
         Elimina un usuario 
         Implementa el requisito funcional 
         
+        La cuenta queda desactivada de inmediato; sus datos se borran después
+        en segundo plano (ver AccountDeletionService.run).
+        
         Args:
             db: Sesión de base de datos
             user_id: ID del usuario a eliminar
         
         Returns:
-            True si se eliminó correctamente
+            True si el borrado quedó registrado
         
         Raises:
             HTTPException: Si el usuario no existe o hay error en la eliminación
         """
-        # Obtener usuario
-        user = UserService.get_user_by_id(db, user_id)
-        
-        try:
-            db.delete(user)
-            db.commit()
-            return True
-            
-        except Exception as e:
-            db.rollback()
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Error al eliminar el usuario: {str(e)}"
-            )
+        AccountDeletionService.request_deletion(db, user_id)
+        return True
     
     @staticmethod
-    def get_user_statistics(db: Session, user_id: int) -> dict:
+    def get_user_statistics(db: Session, user: Usuario) -> dict:
         """
-        Obtiene estadísticas básicas del usuario.
+        Obtiene estadísticas del usuario.
         Útil para el dashboard
         
+        Los conteos (sesiones, métodos, flashcards, notas, seguimiento y logros)
+        salen de una sola consulta y se guardan unos segundos en caché.
+        
         Args:
             db: Sesión de base de datos
-            user_id: ID del usuario
+            user: Usuario (ya cargado por la autenticación)
         
         Returns:
             Diccionario con estadísticas del usuario
         """
-        user = UserService.get_user_by_id(db, user_id)
-        
-        # Aquí puedes agregar consultas adicionales para obtener más estadísticas
-        # Por ejemplo, contar sesiones de estudio, posts, etc.
-        
         return {
             "user_id": user.user_id,
             "username": user.username,
             "level": user.level,
             "total_studied_time": user.total_studied_time,
             "is_premium": user.is_premium,
-            "member_since": user.created_at.strftime("%Y-%m-%d") if user.created_at else None
+            "member_since": user.created_at.strftime("%Y-%m-%d") if user.created_at else None,
+            **UserStatsService.get(db, user.user_id)
         }
\ No newline at end of file
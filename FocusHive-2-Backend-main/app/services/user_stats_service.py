@@ -0,0 +1,150 @@
+import json
+import threading
+import time
+from sqlalchemy.orm import Session
+from sqlalchemy import select, func, literal, cast, case, null, union_all, String
+from typing import Dict, Tuple
+
+from app.models.method import Metodo
+from app.models.study_session import SesionEstudio
+from app.models.orm_models import CardCollection, Flashcard
+from app.models.flashcard_session import FlashcardStudySession
+from app.models.cornell import CornellNote
+from app.models.feynman import FeynmanWork
+from app.models.tracking_session import TrackingSession
+from app.models.tracking_archive import TrackingSessionArchive
+from app.models.user_tracking_prefs import UserTrackingPrefs
+
+# Segundos que se reutilizan las estadísticas calculadas de un usuario
+STATS_CACHE_TTL = 30
+
+# Entradas máximas antes de purgar las vencidas
+STATS_CACHE_MAX_ENTRIES = 10000
+
+
+class UserStatsService:
+    """
+    Estadísticas del perfil (sesiones, métodos, flashcards, notas, seguimiento
+    y logros) calculadas con una sola consulta UNION ALL de conteos agrupados,
+    con una caché corta por usuario.
+    """
+
+    # user_id -> (vence_en, estadísticas)
+    _cache: Dict[int, Tuple[float, Dict]] = {}
+    _lock = threading.Lock()
+
+    @staticmethod
+    def _row(metric: str, label, count, total, model, *conditions):
+        """Fila (métrica, etiqueta, cantidad, total) de una parte del UNION ALL"""
+        return select(
+            literal(metric).label("metric"),
+            cast(label, String).label("label"),
+            count.label("count"),
+            total.label("total")
+        ).select_from(model).where(*conditions)
+
+    @staticmethod
+    def _stats_query(user_id: int):
+        row = UserStatsService._row
+        minutes_by_method = select(
+            literal("method_minutes").label("metric"),
+            cast(Metodo.nombre, String).label("label"),
+            func.count(SesionEstudio.session_id).label("count"),
+            func.coalesce(func.sum(SesionEstudio.duracion_minutos), 0).label("total")
+        ).select_from(SesionEstudio).join(
+            Metodo, Metodo.metodo_id == SesionEstudio.metodo_id
+        ).where(SesionEstudio.user_id == user_id).group_by(Metodo.nombre)
+
+        return union_all(
+            row("study_sessions", null(), func.count(SesionEstudio.session_id),
+                func.coalesce(func.sum(SesionEstudio.duracion_minutos), 0),
+                SesionEstudio, SesionEstudio.user_id == user_id),
+            row("completed_sessions", null(), func.count(SesionEstudio.session_id), literal(0),
+                SesionEstudio, SesionEstudio.user_id == user_id, SesionEstudio.fue_completada == True),
+            minutes_by_method,
+            row("flashcards", null(), func.count(Flashcard.card_id), literal(0),
+                Flashcard, Flashcard.card_user == user_id, Flashcard.is_active == True),
+            row("collections", null(), func.count(CardCollection.collection_id), literal(0),
+                CardCollection, CardCollection.user_id == user_id, CardCollection.is_active == True),
+            row("flashcard_sessions", null(), func.count(FlashcardStudySession.session_id),
+                func.coalesce(func.sum(FlashcardStudySession.cards_studied), 0),
+                FlashcardStudySession, FlashcardStudySession.user_id == user_id),
+            row("cornell_notes", null(), func.count(CornellNote.note_id), literal(0),
+                CornellNote, CornellNote.user_id == user_id),
+            row("feynman_works", null(), func.count(FeynmanWork.feynman_id),
+                func.coalesce(func.sum(case((FeynmanWork.is_completed == True, 1), else_=0)), 0),
+                FeynmanWork, FeynmanWork.user_id == user_id),
+            row("tracking", null(), func.count(TrackingSession.session_id),
+                func.coalesce(func.sum(TrackingSession.hours), 0),
+                TrackingSession, TrackingSession.user_id == user_id),
+            row("tracking", null(), func.count(TrackingSessionArchive.session_id),
+                func.coalesce(func.sum(TrackingSessionArchive.hours), 0),
+                TrackingSessionArchive, TrackingSessionArchive.user_id == user_id),
+            # Los logros se guardan como lista JSON: viaja en la etiqueta
+            row("achievements", UserTrackingPrefs.achievements, literal(1), literal(0),
+                UserTrackingPrefs, UserTrackingPrefs.user_id == user_id),
+        )
+
+    @staticmethod
+    def compute(db: Session, user_id: int) -> Dict:
+        """Calcula las estadísticas del usuario (sin caché)"""
+        stats = {
+            "study_sessions": 0,
+            "completed_sessions": 0,
+            "study_minutes": 0,
+            "minutes_by_method": {},
+            "flashcards": 0,
+            "collections": 0,
+            "flashcard_sessions": 0,
+            "cards_studied": 0,
+            "cornell_notes": 0,
+            "feynman_works": 0,
+            "feynman_completed": 0,
+            "tracking_sessions": 0,
+            "tracking_hours": 0.0,
+            "achievements": 0
+        }
+
+        for metric, label, count, total in db.execute(UserStatsService._stats_query(user_id)):
+            count, total = int(count or 0), float(total or 0)
+            if metric == "study_sessions":
+                stats["study_sessions"], stats["study_minutes"] = count, int(total)
+            elif metric == "method_minutes":
+                stats["minutes_by_method"][label] = int(total)
+            elif metric == "flashcard_sessions":
+                stats["flashcard_sessions"], stats["cards_studied"] = count, int(total)
+            elif metric == "feynman_works":
+                stats["feynman_works"], stats["feynman_completed"] = count, int(total)
+            elif metric == "tracking":
+                # Una fila por tabla (actual y archivo)
+                stats["tracking_sessions"] += count
+                stats["tracking_hours"] += total
+            elif metric == "achievements":
+                stats["achievements"] = len(json.loads(label or "[]"))
+            else:
+                stats[metric] = count
+
+        stats["tracking_hours"] = round(stats["tracking_hours"], 2)
+        return stats
+
+    @staticmethod
+    def get(db: Session, user_id: int) -> Dict:
+        """Estadísticas del usuario, reutilizando las calculadas hace menos de STATS_CACHE_TTL"""
+        now = time.monotonic()
+        with UserStatsService._lock:
+            cached = UserStatsService._cache.get(user_id)
+            if cached and cached[0] > now:
+                return cached[1]
+
+        stats = UserStatsService.compute(db, user_id)
+
+        with UserStatsService._lock:
+            cache = UserStatsService._cache
+            if len(cache) >= STATS_CACHE_MAX_ENTRIES:
+                for key in [key for key, (expires, _) in cache.items() if expires <= now]:
+                    del cache[key]
+                if len(cache) >= STATS_CACHE_MAX_ENTRIES:
+                    cache.clear()
+            cache[user_id] = (now + STATS_CACHE_TTL, stats)
+
+        return stats
@@ -0,0 +1,199 @@
+import codecs
+import csv
+import json
+from itertools import chain
+from typing import Any, AsyncIterator, Iterator, List, Optional, TextIO, Tuple
+from pydantic import ValidationError
+
+# Cantidad de filas por sentencia INSERT multi-fila
+BULK_INSERT_BATCH_SIZE = 500
+
+# Máximo de errores detallados por importación (el resto solo se cuenta)
+MAX_REPORTED_ERRORS = 100
+
+# Tamaño máximo (en caracteres) de un registro JSON: un elemento mal formado
+# no debe hacer crecer el buffer hasta el final del cuerpo
+MAX_JSON_RECORD_SIZE = 64 * 1024
+
+# Valores aceptados en la directiva "#separator:" de los mazos exportados por Anki
+ANKI_SEPARATORS = {
+    "tab": "\t",
+    "comma": ",",
+    "semicolon": ";",
+    "pipe": "|",
+    "space": " "
+}
+
+
+def format_validation_error(exc: ValidationError) -> str:
+    """Convierte un ValidationError de Pydantic en un mensaje legible de una línea"""
+    return "; ".join(
+        f"{'.'.join(str(part) for part in err['loc']) or 'fila'}: {err['msg']}"
+        for err in exc.errors()
+    )
+
+
+async def iter_json_records(
+    chunks: AsyncIterator[bytes],
+    max_record_size: int = MAX_JSON_RECORD_SIZE
+) -> AsyncIterator[Tuple[int, Optional[Any], Optional[str]]]:
+    """
+    Recorre un cuerpo JSON en streaming sin cargarlo completo en memoria.
+
+    Acepta un arreglo JSON (`[{...}, {...}]`) o NDJSON (un objeto por línea).
+    El formato se detecta por el primer carácter no vacío del cuerpo.
+
+    Un registro de más de `max_record_size` caracteres se reporta como error:
+    en NDJSON se descarta esa línea; en un arreglo se deja de leer (no es
+    posible resincronizar un arreglo mal formado).
+
+    Args:
+        chunks: Iterador asíncrono de bytes (por ejemplo `request.stream()`)
+        max_record_size: Tamaño máximo de un registro
+
+    Yields:
+        (numero_de_fila, registro, error). Si la fila no se pudo parsear,
+        `registro` es None y `error` contiene el motivo.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    json_decoder = json.JSONDecoder()
+    buffer = ""
+    mode = None  # "array" | "ndjson"
+    row_number = 0
+    finished = False
+    eof = False
+    skip_line = False  # Descartando una línea NDJSON demasiado larga
+    iterator = chunks.__aiter__()
+
+    while not finished:
+        if not eof:
+            try:
+                chunk = await iterator.__anext__()
+                buffer += decoder.decode(chunk)
+            except StopAsyncIteration:
+                buffer += decoder.decode(b"", final=True)
+                eof = True
+
+        if mode is None:
+            stripped = buffer.lstrip()
+            if not stripped:
+                if eof:
+                    return
+                continue
+            if stripped[0] == "[":
+                mode = "array"
+                buffer = stripped[1:]
+            else:
+                mode = "ndjson"
+
+        if mode == "ndjson":
+            lines = buffer.split("\n")
+            # La última línea puede estar incompleta hasta llegar al final del cuerpo
+            buffer = "" if eof else lines.pop()
+            if skip_line:
+                if not lines:
+                    buffer = ""
+                    continue
+                # Resto de la línea demasiado larga (ya reportada)
+                lines.pop(0)
+                skip_line = False
+            for line in lines:
+                row_number += 1
+                if not line.strip():
+                    continue
+                try:
+                    yield row_number, json.loads(line), None
+                except json.JSONDecodeError as e:
+                    yield row_number, None, f"JSON inválido: {e.msg}"
+            if len(buffer) > max_record_size:
+                row_number += 1
+                yield row_number, None, "Registro demasiado grande"
+                buffer = ""
+                skip_line = True
+            finished = eof
+            continue
+
+        # Modo arreglo: extraer elementos completos mientras el buffer lo permita
+        pos = 0
+        while True:
+            while pos < len(buffer) and (buffer[pos].isspace() or buffer[pos] == ","):
+                pos += 1
+            if pos >= len(buffer):
+                buffer = ""
+                if eof:
+                    yield row_number + 1, None, "Arreglo JSON sin cerrar"
+                    finished = True
+                break
+            if buffer[pos] == "]":
+                finished = True
+                break
+            try:
+                record, end = json_decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError as e:
+                buffer = buffer[pos:]
+                if len(buffer) > max_record_size:
+                    yield row_number + 1, None, "Registro demasiado grande o JSON inválido"
+                    finished = True
+                elif eof:
+                    # No es posible resincronizar un arreglo mal formado
+                    yield row_number + 1, None, f"JSON inválido: {e.msg}"
+                    finished = True
+                break
+            row_number += 1
+            yield row_number, record, None
+            pos = end
+
+
+def _sniff_delimiter(line: str) -> str:
+    """Detecta el separador de un archivo de texto a partir de su primera línea de datos"""
+    if "\t" in line:
+        return "\t"
+    if line.count(";") > line.count(","):
+        return ";"
+    return ","
+
+
+def iter_delimited_records(
+    stream: TextIO,
+    delimiter: Optional[str] = None
+) -> Iterator[Tuple[int, List[str]]]:
+    """
+    Recorre un archivo CSV/TSV o de texto estilo Anki línea por línea.
+
+    Las líneas iniciales que empiezan con "#" se tratan como directivas de Anki
+    (por ejemplo `#separator:tab`) y no se devuelven. Si no se indica el
+    separador, se detecta a partir de la primera línea de datos.
+
+    Args:
+        stream: Archivo de texto abierto (se lee de forma incremental)
+        delimiter: Separador a usar; None para detectarlo
+
+    Yields:
+        (numero_de_linea, campos)
+    """
+    lines = iter(stream)
+    header_lines = 0
+    first_line = None
+
+    for line in lines:
+        if line.startswith("#"):
+            header_lines += 1
+            key, _, value = line[1:].strip().partition(":")
+            if key.strip().lower() == "separator" and delimiter is None:
+                value = value.strip()
+                delimiter = ANKI_SEPARATORS.get(value.lower(), value[:1] or None)
+            continue
+        first_line = line
+        break
+
+    if first_line is None:
+        return
+
+    reader = csv.reader(
+        chain([first_line], lines),
+        delimiter=delimiter or _sniff_delimiter(first_line)
+    )
+    for fields in reader:
+        if not any(field.strip() for field in fields):
+            continue
+        yield header_lines + reader.line_num, fields
@@ -1,36 +1,97 @@
-from typing import List, Dict, Tuple, Optional
+from typing import List, Dict, Tuple, Optional, FrozenSet, Iterable
 from sqlalchemy.orm import Session
-from app.models.diagnostic import DiagnosticOption
+from app.models.diagnostic import DiagnosticOption, DiagnosticQuestion
 from app.models.method import Metodo
 
+# Métodos que siempre aparecen en los puntajes (aunque no sumen puntos)
+BASE_METHODS = ('pomodoro', 'feynman', 'cornell', 'flashcards')
+
+
+class ScoringMatrix:
+    """
+    Tabla de puntuación del cuestionario en memoria:
+    option_id -> (question_id, índice del método, puntos).
+    """
+    
+    __slots__ = ("methods", "options", "question_ids")
+    
+    def __init__(
+        self,
+        methods: Tuple[str, ...],
+        options: Dict[int, Tuple[int, int, int]],
+        question_ids: FrozenSet[int]
+    ):
+        self.methods = methods
+        self.options = options
+        self.question_ids = question_ids
+    
+    @classmethod
+    def load(cls, db: Session) -> "ScoringMatrix":
+        """Construye la tabla con dos consultas (opciones con su método y preguntas)"""
+        rows = db.query(
+            DiagnosticOption.option_id,
+            DiagnosticOption.question_id,
+            DiagnosticOption.points,
+            Metodo.nombre
+        ).join(Metodo, Metodo.metodo_id == DiagnosticOption.method_id).all()
+        
+        methods = list(BASE_METHODS)
+        method_index = {name: i for i, name in enumerate(methods)}
+        options = {}
+        for option_id, question_id, points, method_name in rows:
+            name = method_name.lower()
+            if name not in method_index:
+                method_index[name] = len(methods)
+                methods.append(name)
+            options[option_id] = (question_id, method_index[name], points)
+        
+        question_ids = frozenset(q for (q,) in db.query(DiagnosticQuestion.question_id).all())
+        return cls(tuple(methods), options, question_ids)
+    
+    def find_invalid(self, answers: Iterable[Tuple[int, int]]) -> Optional[Tuple[int, int]]:
+        """Primera respuesta (question_id, option_id) cuya opción no pertenece a la pregunta"""
+        options = self.options
+        for question_id, option_id in answers:
+            entry = options.get(option_id)
+            if entry is None or entry[0] != question_id:
+                return question_id, option_id
+        return None
+    
+    def score(self, option_ids: Iterable[int]) -> Dict[str, int]:
+        """Suma los puntos por método en una sola pasada (opciones desconocidas se ignoran)"""
+        totals = [0] * len(self.methods)
+        options = self.options
+        for option_id in option_ids:
+            entry = options.get(option_id)
+            if entry is not None:
+                totals[entry[1]] += entry[2]
+        return dict(zip(self.methods, totals))
+
+
 class DiagnosticAlgorithm:
     """Algoritmo simplificado para recomendar método de estudio"""
     
     @staticmethod
-    def calculate_scores(db: Session, user_answers: List[Dict[str, int]]) -> Dict[str, int]:
+    def calculate_scores(
+        db: Session,
+        user_answers: List[Dict[str, int]],
+        matrix: Optional[ScoringMatrix] = None
+    ) -> Dict[str, int]:
         """
         Calcula los puntajes para cada método.
         
         Args:
             db: Sesión de base de datos
             user_answers: Lista de {'question_id': X, 'option_id': Y}
+            matrix: Tabla de puntuación ya cargada (si no, se construye)
         
         Returns:
             {'pomodoro': 15, 'feynman': 12, 'cornell': 10, 'flashcards': 8}
         """
-        scores = {'pomodoro': 0, 'feynman': 0, 'cornell': 0, 'flashcards': 0}
-        
-        for answer in user_answers:
-            # Obtener opción con su método y puntos
-            option = db.query(DiagnosticOption).filter(
-                DiagnosticOption.option_id == answer['option_id']
-            ).first()
-            
-            if option and option.method:
-                method_name = option.method.nombre.lower()
-                scores[method_name] = scores.get(method_name, 0) + option.points
+        if matrix is None:
+            matrix = ScoringMatrix.load(db)
         
-        return scores
+        return matrix.score(answer['option_id'] for answer in user_answers)
     
     @staticmethod
     def get_recommended_method(scores: Dict[str, int]) -> Tuple[str, Optional[str]]:
@@ -0,0 +1,115 @@
+import hashlib
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from app.utils.text_search import tokenize
+
+
+def card_content_hash(
+    question: str,
+    answer: str,
+    is_reversed: bool,
+    flashcard_color: Optional[str]
+) -> str:
+    """
+    Hash del contenido visible de una tarjeta.
+    Permite al cliente comparar su copia local sin descargar las tarjetas completas.
+    """
+    payload = "\x1f".join([
+        question or "",
+        answer or "",
+        "1" if is_reversed else "0",
+        flashcard_color or ""
+    ])
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+# ---------------------------------------------------------------
+# Huellas de contenido para detectar tarjetas (casi) duplicadas
+# ---------------------------------------------------------------
+
+SIMHASH_BITS = 64
+LSH_BANDS = 4
+LSH_BAND_BITS = SIMHASH_BITS // LSH_BANDS
+
+# Distancia de Hamming máxima para considerar dos tarjetas casi iguales.
+# Con 4 bandas de 16 bits, dos firmas a distancia <= 3 comparten al menos una banda.
+NEAR_DUPLICATE_DISTANCE = 3
+
+
+class CardFingerprint(NamedTuple):
+    content_hash: str
+    simhash: int          # Con signo, para guardarlo en una columna BIGINT
+    bands: Tuple[int, ...]
+
+
+def _feature_hash(feature: str) -> int:
+    return int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def simhash(tokens: List[str]) -> int:
+    """Firma SimHash de 64 bits (sin signo) a partir de palabras y pares de palabras"""
+    features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    if not features:
+        return 0
+
+    weights = [0] * SIMHASH_BITS
+    for feature in features:
+        h = _feature_hash(feature)
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += 1 if (h >> bit) & 1 else -1
+
+    return sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+
+
+def to_signed_64(value: int) -> int:
+    return value - (1 << 64) if value >= (1 << 63) else value
+
+
+def to_unsigned_64(value: int) -> int:
+    return value + (1 << 64) if value < 0 else value
+
+
+def lsh_bands(unsigned_simhash: int) -> Tuple[int, ...]:
+    """Divide la firma en bandas para buscar candidatos por igualdad (LSH)"""
+    mask = (1 << LSH_BAND_BITS) - 1
+    return tuple((unsigned_simhash >> (band * LSH_BAND_BITS)) & mask for band in range(LSH_BANDS))
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(to_unsigned_64(a) ^ to_unsigned_64(b)).count("1")
+
+
+def card_fingerprint(question: str, answer: str) -> CardFingerprint:
+    """
+    Huella normalizada de una tarjeta: hash exacto del contenido sin mayúsculas,
+    tildes ni puntuación, y firma SimHash para detectar variantes cercanas.
+    """
+    question_tokens = tokenize(question)
+    answer_tokens = tokenize(answer)
+
+    normalized = " ".join(question_tokens) + "\x1f" + " ".join(answer_tokens)
+    signature = simhash(question_tokens + answer_tokens)
+
+    return CardFingerprint(
+        content_hash=hashlib.sha1(normalized.encode("utf-8")).hexdigest(),
+        simhash=to_signed_64(signature),
+        bands=lsh_bands(signature)
+    )
+
+
+def fingerprint_columns(fingerprint: CardFingerprint) -> Dict[str, object]:
+    """Valores de columnas de la tabla flashcards para una huella"""
+    columns = {
+        "content_hash": fingerprint.content_hash,
+        "simhash": fingerprint.simhash
+    }
+    for band, value in enumerate(fingerprint.bands):
+        columns[f"lsh_band{band}"] = value
+    return columns
+
+
+def is_near_duplicate(a: CardFingerprint, content_hash: str, signature: int) -> bool:
+    """Compara una huella con el hash y la firma de otra tarjeta"""
+    if a.content_hash == content_hash:
+        return True
+    return signature is not None and hamming_distance(a.simhash, signature) <= NEAR_DUPLICATE_DISTANCE
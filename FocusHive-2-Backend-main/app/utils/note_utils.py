@@ -0,0 +1,51 @@
+from typing import Optional
+
+from app.utils.text_search import tokenize
+
+# Caracteres de vista previa en los listados de notas
+NOTE_PREVIEW_LENGTH = 200
+
+# Tamaño máximo (bytes UTF-8) de los términos indexados de una nota (columna TEXT)
+NOTE_SEARCH_TEXT_MAX_BYTES = 60000
+
+
+def note_preview(*texts: Optional[str], length: int = NOTE_PREVIEW_LENGTH) -> Optional[str]:
+    """Primeros `length` caracteres del primer texto no vacío"""
+    for text in texts:
+        if text and text.strip():
+            return text.strip()[:length]
+    return None
+
+
+def refresh_note_preview(doc) -> None:
+    """
+    Recalcula la vista previa guardada de una nota (CornellNote / FeynmanWork).
+    Se guarda aparte porque las secciones largas se almacenan comprimidas.
+    """
+    doc.preview = note_preview(*(getattr(doc, field) for field in doc.PREVIEW_FIELDS))
+
+
+def note_search_text(*texts: Optional[str], max_bytes: int = NOTE_SEARCH_TEXT_MAX_BYTES) -> Optional[str]:
+    """
+    Términos distintos de los textos, en orden de aparición, separados por
+    espacios. Es el texto plano que cubre el índice FULLTEXT en lugar de las
+    secciones comprimidas (para buscar basta con que cada término aparezca).
+    """
+    seen = set()
+    terms = []
+    size = 0
+    for text in texts:
+        for token in tokenize(text or ""):
+            if token in seen:
+                continue
+            size += len(token.encode("utf-8")) + 1
+            if size > max_bytes:
+                return " ".join(terms)
+            seen.add(token)
+            terms.append(token)
+    return " ".join(terms) or None
+
+
+def refresh_note_search_text(doc) -> None:
+    """Recalcula los términos indexados de una nota (CornellNote / FeynmanWork)"""
+    doc.search_text = note_search_text(*(getattr(doc, field) for field in doc.SEARCH_FIELDS))
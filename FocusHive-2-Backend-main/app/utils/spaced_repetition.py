@@ -0,0 +1,84 @@
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+# Calificaciones que usa el frontend y su equivalente en la escala SM-2 (0-5)
+GRADE_QUALITY = {
+    'hard': 2,    # No la recordó: la tarjeta vuelve a aprenderse
+    'medium': 4,  # La recordó con algo de esfuerzo
+    'easy': 5     # La recordó sin esfuerzo
+}
+
+MIN_EASE_FACTOR = 1.3
+DEFAULT_EASE_FACTOR = 2.5
+
+
+class SpacedRepetitionScheduler:
+    """Planificador de repasos basado en el algoritmo SM-2"""
+
+    @staticmethod
+    def schedule(
+        interval_days: int,
+        ease_factor: float,
+        repetitions: int,
+        lapses: int,
+        grade: str,
+        now: Optional[datetime] = None
+    ) -> Dict:
+        """
+        Calcula el nuevo estado de una tarjeta después de un repaso.
+
+        Args:
+            interval_days: Intervalo actual en días
+            ease_factor: Factor de facilidad actual
+            repetitions: Repasos correctos consecutivos
+            lapses: Veces que la tarjeta se olvidó
+            grade: 'hard', 'medium' o 'easy'
+            now: Momento del repaso (por defecto, ahora)
+
+        Returns:
+            {'interval_days', 'ease_factor', 'repetitions', 'lapses', 'due_at', 'last_reviewed_at'}
+        """
+        now = now or datetime.now()
+        quality = GRADE_QUALITY[grade]
+        ease_factor = ease_factor or DEFAULT_EASE_FACTOR
+        repetitions = repetitions or 0
+        lapses = lapses or 0
+
+        if quality < 3:
+            repetitions = 0
+            interval_days = 1
+            lapses += 1
+        else:
+            if repetitions == 0:
+                interval_days = 1
+            elif repetitions == 1:
+                interval_days = 6
+            else:
+                interval_days = max(1, round((interval_days or 1) * ease_factor))
+            repetitions += 1
+
+        ease_factor = ease_factor + (0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+        ease_factor = max(MIN_EASE_FACTOR, round(ease_factor, 2))
+
+        return {
+            'interval_days': interval_days,
+            'ease_factor': ease_factor,
+            'repetitions': repetitions,
+            'lapses': lapses,
+            'due_at': now + timedelta(days=interval_days),
+            'last_reviewed_at': now
+        }
+
+    @staticmethod
+    def apply_review(card, grade: str, now: Optional[datetime] = None) -> None:
+        """Aplica un repaso sobre una Flashcard (ORM) actualizando su estado de repaso"""
+        new_state = SpacedRepetitionScheduler.schedule(
+            card.interval_days,
+            card.ease_factor,
+            card.repetitions,
+            card.lapses,
+            grade,
+            now
+        )
+        for key, value in new_state.items():
+            setattr(card, key, value)
@@ -0,0 +1,99 @@
+import re
+from difflib import SequenceMatcher
+from typing import Dict, Iterable, List, Optional
+
+# Palabras y espacios: el diff trabaja por palabra para generar pocas operaciones
+DIFF_TOKEN_PATTERN = re.compile(r"\s+|\S+")
+
+
+# Unidades de `pos` y `count`: caracteres de Python o unidades UTF-16
+# (como String.length en JavaScript, donde un emoji ocupa 2)
+DELTA_UNITS = ("char", "utf16")
+
+
+def apply_text_delta(text: Optional[str], ops: Iterable, units: str = "char") -> str:
+    """
+    Aplica una lista de operaciones de edición sobre un texto.
+
+    Cada operación tiene `op` ('insert' | 'delete'), `pos` y, según el caso,
+    `text` (insert) o `count` (delete). Las posiciones se cuentan en `units`
+    y se aplican en orden: cada una se refiere al texto ya modificado por las
+    anteriores.
+
+    Raises:
+        ValueError: Si una operación es inválida, queda fuera del texto o
+            (en UTF-16) corta un carácter por la mitad
+    """
+    if units not in DELTA_UNITS:
+        raise ValueError(f"Unidades no soportadas: {units}")
+
+    # En UTF-16 se trabaja sobre los bytes codificados: cada unidad ocupa 2 bytes
+    utf16 = units == "utf16"
+    result = (text or "").encode("utf-16-le") if utf16 else (text or "")
+    width = 2 if utf16 else 1
+
+    for i, op in enumerate(ops):
+        pos = op.pos * width
+        if pos > len(result):
+            raise ValueError(f"Operación {i}: posición {op.pos} fuera del texto (longitud {len(result) // width})")
+
+        if op.op == "insert":
+            if not op.text:
+                raise ValueError(f"Operación {i}: 'insert' requiere 'text'")
+            inserted = op.text.encode("utf-16-le") if utf16 else op.text
+            result = result[:pos] + inserted + result[pos:]
+        else:
+            if not op.count:
+                raise ValueError(f"Operación {i}: 'delete' requiere 'count'")
+            end = pos + op.count * width
+            if end > len(result):
+                raise ValueError(f"Operación {i}: se intentan borrar caracteres fuera del texto")
+            result = result[:pos] + result[end:]
+
+    if not utf16:
+        return result
+    try:
+        return result.decode("utf-16-le")
+    except UnicodeDecodeError:
+        raise ValueError("Las operaciones cortan un carácter (par sustituto UTF-16) por la mitad")
+
+
+def diff_text(source: Optional[str], target: Optional[str]) -> List[Dict]:
+    """
+    Calcula las operaciones (mismo formato que `apply_text_delta`) que
+    transforman `source` en `target`.
+
+    Se recorta primero el prefijo y sufijo comunes; el resto se compara por
+    palabras, así un cambio local produce un delta del tamaño del cambio.
+    """
+    source = source or ""
+    target = target or ""
+    if source == target:
+        return []
+
+    limit = min(len(source), len(target))
+    start = 0
+    while start < limit and source[start] == target[start]:
+        start += 1
+    end = 0
+    while end < limit - start and source[-1 - end] == target[-1 - end]:
+        end += 1
+
+    a = DIFF_TOKEN_PATTERN.findall(source[start:len(source) - end])
+    b = DIFF_TOKEN_PATTERN.findall(target[start:len(target) - end])
+
+    ops = []
+    pos = start
+    matcher = SequenceMatcher(None, a, b, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            pos += sum(len(token) for token in a[i1:i2])
+            continue
+        if tag in ("delete", "replace"):
+            ops.append({"op": "delete", "pos": pos, "count": sum(len(token) for token in a[i1:i2])})
+        if tag in ("insert", "replace"):
+            inserted = "".join(b[j1:j2])
+            ops.append({"op": "insert", "pos": pos, "text": inserted})
+            pos += len(inserted)
+
+    return ops
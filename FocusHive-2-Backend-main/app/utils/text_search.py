@@ -0,0 +1,240 @@
+import heapq
+import html
+import math
+import re
+import unicodedata
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+# Parámetros de BM25
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def normalize_text(text: str) -> str:
+    """Pasa a minúsculas y elimina tildes para comparar sin distinguir acentos"""
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).lower()
+
+
+def tokenize(text: str) -> List[str]:
+    """Divide un texto en tokens normalizados"""
+    return TOKEN_PATTERN.findall(normalize_text(text))
+
+
+def mysql_boolean_query(query: str, min_token_size: int = 3) -> str:
+    """
+    Construye una consulta FULLTEXT en modo booleano: todos los términos
+    obligatorios y con coincidencia por prefijo (`+term*`).
+    Los términos más cortos que el mínimo indexado por MySQL se descartan.
+    """
+    return " ".join(f"+{token}*" for token in tokenize(query) if len(token) >= min_token_size)
+
+
+def find_term_spans(text: str, query: str, prefix: bool = True) -> List[Tuple[int, int]]:
+    """
+    Posiciones (inicio, fin) en el texto original de las palabras que
+    coinciden con algún término de la consulta (sin distinguir acentos).
+    """
+    terms = set(tokenize(query))
+    if not text or not terms:
+        return []
+
+    spans = []
+    for match in TOKEN_PATTERN.finditer(text):
+        token = normalize_text(match.group())
+        if token in terms or (prefix and any(token.startswith(term) for term in terms)):
+            spans.append(match.span())
+    return spans
+
+
+def trigrams(text: str, prefix: bool = False) -> List[str]:
+    """
+    Trigramas de cada palabra del texto, marcando el inicio con "^^" y el
+    final con "$" ("^^a", "^ab", "abc", ..., "yz$"). Se usan marcadores en
+    lugar de espacios porque MySQL ignora los espacios finales al comparar.
+
+    Args:
+        prefix: Omitir el trigrama final de cada palabra, para que la consulta
+            coincida también con palabras que solo empiezan así
+    """
+    grams = set()
+    for token in tokenize(text):
+        padded = f"^^{token}" if prefix else f"^^{token}$"
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return sorted(grams)
+
+
+def highlight_snippet(
+    text: str,
+    query: str,
+    width: int = 160,
+    prefix: bool = True,
+    tag: str = "mark"
+) -> Optional[str]:
+    """
+    Extrae un fragmento del texto alrededor de la primera coincidencia y marca
+    los términos encontrados con `<tag>`. El resto del texto se escapa como HTML.
+
+    Returns:
+        El fragmento resaltado, o None si el texto no contiene la consulta
+    """
+    spans = find_term_spans(text, query, prefix)
+    if not spans:
+        return None
+
+    first_start = spans[0][0]
+    start = max(0, first_start - width // 4)
+    end = min(len(text), start + width)
+    # Ajustar a límites de palabra para no cortar términos
+    if start > 0:
+        space = text.rfind(" ", 0, start)
+        start = space + 1 if space != -1 and first_start - space <= width // 2 else start
+    if end < len(text):
+        space = text.find(" ", end)
+        end = space if space != -1 and space - end <= 20 else end
+
+    parts = []
+    cursor = start
+    for span_start, span_end in spans:
+        if span_start < start:
+            continue
+        if span_end > end:
+            break
+        parts.append(html.escape(text[cursor:span_start]))
+        parts.append(f"<{tag}>{html.escape(text[span_start:span_end])}</{tag}>")
+        cursor = span_end
+    parts.append(html.escape(text[cursor:end]))
+
+    snippet = "".join(parts).replace("\n", " ").strip()
+    return f"{'…' if start > 0 else ''}{snippet}{'…' if end < len(text) else ''}"
+
+
+class InvertedIndex:
+    """
+    Índice invertido en memoria con búsqueda por prefijo y ranking BM25.
+
+    Se usa como sustituto local de los índices FULLTEXT de MySQL.
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, Dict[Hashable, float]] = defaultdict(dict)
+        self._doc_tokens: Dict[Hashable, Dict[str, float]] = {}
+        self._doc_lengths: Dict[Hashable, float] = {}
+        self._total_length = 0.0
+        self._sorted_terms: Optional[List[str]] = None
+
+    def __len__(self) -> int:
+        return len(self._doc_tokens)
+
+    def add(self, doc_id: Hashable, fields: Iterable[Tuple[Optional[str], float]]) -> None:
+        """
+        Indexa (o reindexa) un documento.
+
+        Args:
+            doc_id: Identificador del documento
+            fields: Pares (texto, peso) de cada campo a indexar
+        """
+        self.remove(doc_id)
+
+        weights: Counter = Counter()
+        for text, weight in fields:
+            for token in tokenize(text or ""):
+                weights[token] += weight
+
+        if not weights:
+            return
+
+        for token, weight in weights.items():
+            self._postings[token][doc_id] = weight
+        self._doc_tokens[doc_id] = dict(weights)
+        self._doc_lengths[doc_id] = sum(weights.values())
+        self._total_length += self._doc_lengths[doc_id]
+        self._sorted_terms = None
+
+    def remove(self, doc_id: Hashable) -> None:
+        """Elimina un documento del índice (si existe)"""
+        tokens = self._doc_tokens.pop(doc_id, None)
+        if tokens is None:
+            return
+
+        for token in tokens:
+            postings = self._postings.get(token)
+            if postings is not None:
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self._postings[token]
+        self._total_length -= self._doc_lengths.pop(doc_id, 0.0)
+        self._sorted_terms = None
+
+    def _expand(self, term: str, prefix: bool) -> List[str]:
+        """Términos del índice que coinciden con `term` (exacto o por prefijo)"""
+        if not prefix:
+            return [term] if term in self._postings else []
+
+        if self._sorted_terms is None:
+            self._sorted_terms = sorted(self._postings)
+
+        matches = []
+        i = bisect_left(self._sorted_terms, term)
+        while i < len(self._sorted_terms) and self._sorted_terms[i].startswith(term):
+            matches.append(self._sorted_terms[i])
+            i += 1
+        return matches
+
+    def search(
+        self,
+        query: str,
+        limit: int = 20,
+        prefix: bool = True,
+        doc_filter: Optional[Callable[[Hashable], bool]] = None
+    ) -> List[Tuple[Hashable, float]]:
+        """
+        Busca documentos que contengan todos los términos de la consulta.
+
+        Args:
+            query: Texto a buscar
+            limit: Máximo de resultados
+            prefix: Si los términos pueden coincidir por prefijo
+            doc_filter: Filtro opcional sobre doc_id (por ejemplo, por colección)
+
+        Returns:
+            Lista de (doc_id, score) ordenada por relevancia
+        """
+        terms = tokenize(query)
+        if not terms or not self._doc_tokens:
+            return []
+
+        total_docs = len(self._doc_tokens)
+        avg_length = self._total_length / total_docs
+        scores: Optional[Dict[Hashable, float]] = None
+
+        for term in terms:
+            term_scores: Dict[Hashable, float] = {}
+            for match in self._expand(term, prefix):
+                postings = self._postings[match]
+                idf = math.log(1 + (total_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, tf in postings.items():
+                    norm = tf + BM25_K1 * (1 - BM25_B + BM25_B * self._doc_lengths[doc_id] / avg_length)
+                    score = idf * tf * (BM25_K1 + 1) / norm
+                    term_scores[doc_id] = max(term_scores.get(doc_id, 0.0), score)
+
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {
+                    doc_id: scores[doc_id] + score
+                    for doc_id, score in term_scores.items()
+                    if doc_id in scores
+                }
+            if not scores:
+                return []
+
+        results = scores.items()
+        if doc_filter is not None:
+            results = [(doc_id, score) for doc_id, score in results if doc_filter(doc_id)]
+
+        return heapq.nlargest(limit, results, key=lambda item: item[1])
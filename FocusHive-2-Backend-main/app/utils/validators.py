@@ -1,6 +1,6 @@
 from fastapi import HTTPException, status
 from sqlalchemy.orm import Session
-from app.models.user import Usuario
+from app.services.user_availability_service import UserAvailabilityService
 import re
 
 class UserValidator:
@@ -19,14 +19,7 @@ class UserValidator:
         Returns:
             True si está disponible, lanza excepción si no
         """
-        query = db.query(Usuario).filter(Usuario.username == username)
-        
-        if exclude_user_id:
-            query = query.filter(Usuario.user_id != exclude_user_id)
-        
-        existing_user = query.first()
-        
-        if existing_user:
+        if not UserAvailabilityService.is_available(db, "username", username, exclude_user_id):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"El username '{username}' ya está en uso"
@@ -47,14 +40,7 @@ class UserValidator:
         Returns:
             True si está disponible, lanza excepción si no
         """
-        query = db.query(Usuario).filter(Usuario.email == email)
-        
-        if exclude_user_id:
-            query = query.filter(Usuario.user_id != exclude_user_id)
-        
-        existing_email = query.first()
-        
-        if existing_email:
+        if not UserAvailabilityService.is_available(db, "email", email, exclude_user_id):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"El email '{email}' ya está registrado"
@@ -2,16 +2,24 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.v1 import auth, users, diagnostic, dashboard, flashcards, sessions, feynman, cornell, flashcard_sessions  # ✅ AGREGADO
 from app.config import get_settings
-from app.database.connection import engine, Base
+from app.database.connection import engine, Base, SessionLocal
+from app.database.migrations import run_migrations
 
 # Importar modelos para que SQLAlchemy los reconozca
 from app.models.user import Usuario
+from app.models.user_search import UserSearchGram
+from app.models.account_deletion import AccountDeletion
 from app.models.orm_models import Post, CardCollection, Flashcard, Like
 from app.models.feynman import FeynmanWork
+from app.models.feynman_revision import FeynmanRevision
 from app.models.cornell import CornellNote
 from app.models.flashcard_session import FlashcardStudySession  # ✅ AGREGADO
-from app.api.v1 import tracking
+from app.models.flashcard_review import FlashcardReview
+from app.models.flashcard_sync import FlashcardSyncState, FlashcardTombstone
+from app.models.flashcard_session_rollup import FlashcardSessionRollup, FlashcardRollupState
+from app.api.v1 import tracking, method_search
 from app.models.tracking_session import TrackingSession
+from app.models.tracking_archive import TrackingSessionArchive
 from app.models.user_tracking_prefs import UserTrackingPrefs
 
 settings=get_settings()
@@ -24,6 +32,8 @@ app = FastAPI(
 
 # Crear tablas automáticamente al iniciar
 Base.metadata.create_all(bind=engine)
+# create_all no modifica tablas existentes: agregar columnas e índices nuevos
+run_migrations(engine)
 
 #Configurar CORS para el frontend
 app.add_middleware(
@@ -45,6 +55,23 @@ app.include_router(feynman.router, prefix="/api/v1")
 app.include_router(cornell.router, prefix="/api/v1")
 app.include_router(flashcard_sessions.router, prefix="/api/v1")  # ✅ AGREGADO
 app.include_router(tracking.router, prefix="/api/v1")
+app.include_router(method_search.router, prefix="/api/v1")
+
+@app.on_event("startup")
+def start_live_session_sweeper():
+    """Cierra periódicamente las sesiones en curso abandonadas"""
+    from app.services.live_session_service import LiveSessionService
+    LiveSessionService.start_sweeper()
+
+@app.on_event("startup")
+def load_availability_filters():
+    """Construye los filtros de usernames y emails ocupados"""
+    from app.services.user_availability_service import UserAvailabilityService
+    db = SessionLocal()
+    try:
+        UserAvailabilityService.rebuild(db)
+    finally:
+        db.close()
 
 @app.get("/")
 async def root():